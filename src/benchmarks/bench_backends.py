@@ -0,0 +1,95 @@
+"""
+Benchmark the FMU backends of FMUSimulator: fmpy vs direct ctypes.
+
+Each backend runs in a fresh process, because the SystemC kernel linked in
+the FMU can only be elaborated once per process. Run from the ``src`` folder
+after building an FMU:
+
+    python -m benchmarks.bench_backends --fmu_path ALU.fmu --steps 100000
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+from simulator.fmu_simulator import BACKENDS, FMUSimulator
+
+
+def measure_backend(
+    fmu_path: str, backend: str, steps: int, step_size: float
+) -> Dict[str, float]:
+    """Run ``steps`` set/doStep/get cycles with the given backend."""
+    simulator = FMUSimulator(
+        fmu_path=fmu_path,
+        stop_time=steps * step_size,
+        step_size=step_size,
+        log_enabled=False,
+        backend=backend,
+    )
+    simulator.setup_model()
+    simulator.initialize_fmu()
+
+    io = simulator.io
+    fmu = simulator.fmu
+    outputs = [None] * len(io.outputs)
+
+    start = time.perf_counter()
+    current_time = 0.0
+    for _ in range(steps):
+        # Force every input group to be sent, as on a step where all inputs change
+        for group in io.input_groups:
+            group.dirty = True
+        io.flush()
+        fmu.doStep(
+            currentCommunicationPoint=current_time,
+            communicationStepSize=step_size,
+        )
+        io.read(outputs)
+        current_time += step_size
+    elapsed = time.perf_counter() - start
+
+    fmu.terminate()
+    fmu.freeInstance()
+    return {"elapsed": elapsed, "steps_per_sec": steps / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fmu_path", type=str, required=True, help="FMU file path")
+    parser.add_argument(
+        "--steps", type=int, default=100000, help="Number of simulation steps"
+    )
+    parser.add_argument(
+        "--step_size", type=float, default=1e-9, help="Simulation step size"
+    )
+    parser.add_argument(
+        "--backends",
+        type=str,
+        nargs="+",
+        default=list(BACKENDS),
+        help="Backends to compare",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[backend] = executor.submit(
+                measure_backend, args.fmu_path, backend, args.steps, args.step_size
+            ).result()
+
+    reference = results[args.backends[0]]["steps_per_sec"]
+    print(f"{'backend':>8} {'elapsed [s]':>12} {'steps/sec':>12} {'relative':>10}")
+    for backend, result in results.items():
+        print(
+            f"{backend:>8} {result['elapsed']:>12.4f} "
+            f"{result['steps_per_sec']:>12.0f} "
+            f"{result['steps_per_sec'] / reference:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
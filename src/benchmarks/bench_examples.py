@@ -0,0 +1,433 @@
+"""
+Benchmark the bundled systemc_module examples and gate regressions.
+
+Each example is generated, compiled and loaded, then simulated at several
+step counts in a fresh process (one SystemC kernel per process). The suite
+records per example the generation time, the compile time, the FMU load time
+(extraction, parsing, instantiation and elaboration), the steps per second at
+each step count and the peak RSS of the simulating process, and writes them
+as JSON. Given a baseline file, it compares every metric against it and
+exits with status 1 if one got worse than its threshold. Run from the ``src``
+folder:
+
+    python -m benchmarks.bench_examples --output baseline.json
+    python -m benchmarks.bench_examples --baseline baseline.json \
+        --output current.json --max_slowdown 0.1 --max_throughput_drop 0.1
+
+Building rewrites the generated sources in ``src`` as main.py does, so the
+examples are built one after the other. The interrupt section of the stimuli
+files is ignored.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import time
+import traceback
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from compile_fmu.compile_fmu import (
+    generate_build_script_bash,
+    generate_build_script_cmake,
+    run_build_script_bash,
+    run_build_script_cmake,
+)
+from generators.generate_fmi3_code import generate_all_modules
+from main import generate_xml_struct
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+EXAMPLES_DIR = "systemc_module"
+
+# Metrics where a higher value is better; every other metric is a cost
+HIGHER_IS_BETTER = ("steps_per_s",)
+
+
+def find_examples(names: Optional[List[str]] = None) -> List[str]:
+    """Return the example folders holding a config.yaml, optionally filtered."""
+    examples = sorted(
+        name
+        for name in os.listdir(EXAMPLES_DIR)
+        if os.path.isfile(os.path.join(EXAMPLES_DIR, name, "config.yaml"))
+    )
+    if names:
+        unknown = set(names) - set(examples)
+        if unknown:
+            raise ValueError(f"Unknown examples {sorted(unknown)}")
+        examples = [name for name in examples if name in names]
+    return examples
+
+
+def _fmu_name(config: Dict[str, Any]) -> str:
+    if config["type"] == "rtl":
+        return config["rtl"]["systemc_top_level_module_name"]
+    return config["tlm"]["tlm_top_level_module_name"]
+
+
+def _compile_type(config: Dict[str, Any]) -> str:
+    """Build system of a config, "bash" unless its compile section says so."""
+    compile_type = (config.get("compile") or {}).get("type", "bash")
+    if compile_type not in ("bash", "cmake"):
+        raise ValueError(f"Invalid compile type {compile_type}")
+    return compile_type
+
+
+def _generate_build_script(config: Dict[str, Any]) -> None:
+    """Write build.sh or CMakeLists.txt the way main.py does."""
+    if config["type"] == "rtl":
+        modules_folder = config["rtl"]["systemc_modules_folder"]
+    else:
+        modules_folder = config["tlm"]["tlm_modules_folder"]
+    generate = (
+        generate_build_script_cmake
+        if _compile_type(config) == "cmake"
+        else generate_build_script_bash
+    )
+    generate(
+        fmu_name=_fmu_name(config),
+        fmi_version=config["fmi_config"]["fmiVersion"],
+        modules_folder=modules_folder,
+    )
+
+
+def _run_build_script(config: Dict[str, Any]) -> bool:
+    if _compile_type(config) == "cmake":
+        return run_build_script_cmake()
+    return run_build_script_bash()
+
+
+def _build(conn, name: str, fmu_dir: str) -> None:
+    """Child process: generate and compile one example."""
+    try:
+        with open(os.path.join(EXAMPLES_DIR, name, "config.yaml")) as f:
+            config = yaml.safe_load(f)
+        log_path = os.path.join(fmu_dir, f"{name}.log")
+        with open(log_path, "w") as log, contextlib.redirect_stdout(
+            log
+        ), contextlib.redirect_stderr(log):
+            start = time.perf_counter()
+            generate_xml_struct(config=config)
+            generate_all_modules(config=config)
+            _generate_build_script(config)
+            generated = time.perf_counter()
+            built = _run_build_script(config)
+            compiled = time.perf_counter()
+        if not built:
+            raise RuntimeError(f"Build of {name} failed, see {log_path}")
+        shutil.move(f"{_fmu_name(config)}.fmu", os.path.join(fmu_dir, f"{name}.fmu"))
+    except Exception:
+        conn.send(("failed", traceback.format_exc()))
+        return
+    conn.send(
+        ("done", {"generate_s": generated - start, "compile_s": compiled - generated})
+    )
+
+
+def _measure(
+    conn,
+    fmu_path: str,
+    stimuli: Dict[str, Any],
+    settings: Dict[str, Any],
+    step_counts: List[int],
+    repeat: int,
+) -> None:
+    """Child process: load the FMU, then run it at every step count."""
+    try:
+        start = time.perf_counter()
+        simulator = FMUSimulator(
+            fmu_path=fmu_path, log_enabled=False, cache=False, **settings
+        )
+        simulator.setup_model()
+        simulator.initialize_fmu()
+        load_s = time.perf_counter() - start
+        simulator.set_stimuli(stimuli)
+
+        steps_per_s = {}
+        fresh = True
+        for steps in step_counts:
+            best = 0.0
+            for _ in range(repeat):
+                # Same instance for every run: fmi3Reset, no new elaboration
+                if not fresh:
+                    simulator.reset()
+                fresh = False
+                start = time.perf_counter()
+                simulator.run(
+                    NumpyRecorder(output="arrays"),
+                    stop_time=steps * simulator.step_size,
+                )
+                best = max(best, steps / (time.perf_counter() - start))
+            steps_per_s[str(steps)] = best
+        simulator.close()
+    except Exception:
+        conn.send(("failed", traceback.format_exc()))
+        return
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    conn.send(
+        (
+            "done",
+            {
+                "load_s": load_s,
+                "steps_per_s": steps_per_s,
+                "peak_rss_kb": peak_rss_kb,
+            },
+        )
+    )
+
+
+def _run_in_process(target, args: tuple, timeout: float) -> Dict[str, Any]:
+    """Run ``target(conn, *args)`` in a spawned process and return its result."""
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=target, args=(child_conn, *args), daemon=True)
+    process.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(timeout):
+            raise RuntimeError(f"{target.__name__} took over {timeout} s")
+        kind, value = parent_conn.recv()
+    except EOFError:
+        kind, value = "failed", "The child process died"
+    finally:
+        process.kill()
+        process.join()
+        parent_conn.close()
+    if kind != "done":
+        raise RuntimeError(value)
+    return value
+
+
+def build_example(name: str, fmu_dir: str, timeout: float = 1800.0) -> Dict[str, Any]:
+    """
+    Generate and compile one example into ``<fmu_dir>/<name>.fmu``.
+
+    The code generators keep state between calls, so each example is built
+    in a fresh process. The build output goes to ``<fmu_dir>/<name>.log``.
+
+    Returns:
+        ``generate_s`` and ``compile_s``
+    """
+    return _run_in_process(_build, (name, fmu_dir), timeout)
+
+
+def measure_example(
+    fmu_path: str,
+    stimuli_path: str,
+    settings: Dict[str, Any],
+    step_counts: List[int],
+    repeat: int = 1,
+    timeout: float = 600.0,
+) -> Dict[str, Any]:
+    """
+    Load and run one FMU in a spawned process, so it gets its own SystemC
+    kernel.
+
+    Returns:
+        ``load_s``, ``steps_per_s`` by step count and ``peak_rss_kb``
+    """
+    with open(stimuli_path) as f:
+        stimuli = {
+            k: v for k, v in yaml.safe_load(f).items() if k.lower() != "interrupt"
+        }
+    return _run_in_process(
+        _measure, (fmu_path, stimuli, settings, step_counts, repeat), timeout
+    )
+
+
+def _flatten(result: Dict[str, Any]) -> Dict[str, float]:
+    metrics = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            for steps, rate in value.items():
+                metrics[f"{key}[{steps}]"] = rate
+        elif isinstance(value, (int, float)):
+            metrics[key] = value
+    return metrics
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    thresholds: Dict[str, float],
+) -> List[str]:
+    """
+    Print every metric next to its baseline value and list the regressions.
+
+    Args:
+        results: ``examples`` section of a results file
+        baseline: ``examples`` section of the baseline file
+        thresholds: Allowed relative change per metric family: ``time`` for
+            durations, ``throughput`` for steps per second and ``rss``
+
+    Returns:
+        One line per regression
+    """
+    regressions = []
+    print(f"{'example':<28}{'metric':<22}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if "error" in result and "error" not in base:
+            regressions.append(f"{name}: {result['error'].splitlines()[-1]}")
+            continue
+        current = _flatten(result)
+        for metric, old in _flatten(base).items():
+            new = current.get(metric)
+            if new is None or old == 0:
+                continue
+            change = new / old - 1
+            if metric.startswith(HIGHER_IS_BETTER):
+                regressed = change < -thresholds["throughput"]
+            elif metric == "peak_rss_kb":
+                regressed = change > thresholds["rss"]
+            else:
+                regressed = change > thresholds["time"]
+            flag = "  REGRESSION" if regressed else ""
+            print(
+                f"{name:<28}{metric:<22}{old:>12.4g}{new:>12.4g}"
+                f"{change:>+9.1%}{flag}"
+            )
+            if regressed:
+                regressions.append(f"{name}: {metric} {old:.4g} -> {new:.4g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--examples",
+        type=str,
+        default=None,
+        help="Comma-separated example folders (default all)",
+    )
+    parser.add_argument(
+        "--steps",
+        type=str,
+        default="1000,10000,100000",
+        help="Comma-separated step counts",
+    )
+    parser.add_argument(
+        "--step_size",
+        type=float,
+        default=0.05e-9,
+        help="Simulation step size (half the examples' clock period)",
+    )
+    parser.add_argument(
+        "--resolution", type=str, default="SC_PS", help="Master time resolution"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per step count, best kept"
+    )
+    parser.add_argument(
+        "--fmu_dir",
+        type=str,
+        default="bench_fmus",
+        help="Folder for the built FMUs and build logs",
+    )
+    parser.add_argument(
+        "--no_build",
+        action="store_true",
+        help="Reuse the FMUs already in --fmu_dir instead of building",
+    )
+    parser.add_argument(
+        "--output", type=str, default=None, help="Write the results to this JSON"
+    )
+    parser.add_argument(
+        "--baseline", type=str, default=None, help="Compare with this results JSON"
+    )
+    parser.add_argument(
+        "--max_slowdown",
+        type=float,
+        default=0.10,
+        help="Allowed relative increase of generation, compile and load times",
+    )
+    parser.add_argument(
+        "--max_throughput_drop",
+        type=float,
+        default=0.10,
+        help="Allowed relative decrease of steps per second",
+    )
+    parser.add_argument(
+        "--max_rss_growth",
+        type=float,
+        default=0.20,
+        help="Allowed relative increase of the peak RSS",
+    )
+    args = parser.parse_args()
+
+    examples = find_examples(args.examples.split(",") if args.examples else None)
+    step_counts = [int(steps) for steps in args.steps.split(",")]
+    settings = {"step_size": args.step_size, "resolution": args.resolution}
+    os.makedirs(args.fmu_dir, exist_ok=True)
+
+    results: Dict[str, Any] = {}
+    for name in examples:
+        result: Dict[str, Any] = {}
+        try:
+            if not args.no_build:
+                result.update(build_example(name, args.fmu_dir))
+            result.update(
+                measure_example(
+                    os.path.join(args.fmu_dir, f"{name}.fmu"),
+                    os.path.join(EXAMPLES_DIR, name, "stimuli.yaml"),
+                    settings,
+                    step_counts,
+                    args.repeat,
+                )
+            )
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        results[name] = result
+        if "error" in result:
+            print(f"{name}: failed, {result['error'].strip().splitlines()[-1]}")
+        else:
+            rates = ", ".join(
+                f"{steps}: {rate:.0f}" for steps, rate in result["steps_per_s"].items()
+            )
+            print(
+                f"{name}: load {result['load_s']:.3f} s, steps/s {rates}, "
+                f"peak RSS {result['peak_rss_kb'] / 1024:.1f} MB"
+            )
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "settings": {**settings, "steps": step_counts, "repeat": args.repeat},
+        "examples": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(
+            results,
+            baseline["examples"],
+            {
+                "time": args.max_slowdown,
+                "throughput": args.max_throughput_drop,
+                "rss": args.max_rss_growth,
+            },
+        )
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
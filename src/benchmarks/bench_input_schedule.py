@@ -0,0 +1,85 @@
+"""
+Benchmark input schedule lookup: legacy linear scan vs compiled cursor.
+
+Run from the ``src`` folder:
+
+    python -m benchmarks.bench_input_schedule --points 100 1000 10000 --steps 20000
+"""
+
+import argparse
+import time
+from typing import Any, Dict
+
+from simulator.input_schedule import InputSchedule
+
+
+def legacy_lookup(schedule: Dict[float, Any], current_time: float) -> Any:
+    """Lookup used by the simulation loop before schedules were compiled."""
+    applicable_times = [t for t in schedule.keys() if t <= current_time]
+    if applicable_times:
+        return schedule[max(applicable_times)]
+    return None
+
+
+def make_schedule(points: int, stop_time: float) -> Dict[float, Any]:
+    interval = stop_time / points
+    return {i * interval: i % 256 for i in range(points)}
+
+
+def run_legacy(schedule: Dict[float, Any], steps: int, step_size: float) -> float:
+    start = time.perf_counter()
+    current_time = 0.0
+    for _ in range(steps):
+        legacy_lookup(schedule, current_time)
+        current_time += step_size
+    return time.perf_counter() - start
+
+
+def run_compiled(schedule: Dict[float, Any], steps: int, step_size: float) -> float:
+    start = time.perf_counter()
+    compiled = InputSchedule(schedule)
+    current_time = 0.0
+    for _ in range(steps):
+        compiled.value_at(current_time)
+        current_time += step_size
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--points",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000],
+        help="Number of change points per schedule",
+    )
+    parser.add_argument(
+        "--steps", type=int, default=20000, help="Number of simulation steps"
+    )
+    parser.add_argument(
+        "--step_size", type=float, default=1e-9, help="Simulation step size"
+    )
+    args = parser.parse_args()
+
+    stop_time = args.steps * args.step_size
+    print(f"{'points':>8} {'legacy [s]':>12} {'compiled [s]':>14} {'speedup':>10}")
+    for points in args.points:
+        schedule = make_schedule(points, stop_time)
+
+        # Both lookups must agree on every step
+        compiled = InputSchedule(schedule)
+        current_time = 0.0
+        for _ in range(0, args.steps, max(1, args.steps // 100)):
+            assert compiled.value_at(current_time) == legacy_lookup(
+                schedule, current_time
+            )
+            current_time += args.step_size * max(1, args.steps // 100)
+
+        legacy = run_legacy(schedule, args.steps, args.step_size)
+        fast = run_compiled(schedule, args.steps, args.step_size)
+        print(f"{points:>8} {legacy:>12.4f} {fast:>14.4f} {legacy / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
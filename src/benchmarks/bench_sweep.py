@@ -0,0 +1,63 @@
+"""
+Benchmark the scaling of the sweep runner with the number of worker processes.
+
+Runs the same stimuli ``--runs`` times with 1, 2, 4, ... workers up to the
+number of available CPUs and prints the throughput. Run from the ``src``
+folder after building an FMU:
+
+    python -m benchmarks.bench_sweep --fmu_path ALU.fmu \
+        --stimuli_path systemc_module/alu-rtl-clocked/stimuli.yaml --runs 32
+"""
+
+import argparse
+import os
+
+from simulator.sweep import run_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fmu_path", type=str, required=True, help="FMU file path")
+    parser.add_argument(
+        "--stimuli_path", type=str, required=True, help="Path to stimuli file"
+    )
+    parser.add_argument("--runs", type=int, default=32, help="Runs per sweep")
+    parser.add_argument(
+        "--stop_time", type=float, default=1e-6, help="Simulation stop time"
+    )
+    parser.add_argument(
+        "--step_size", type=float, default=1e-9, help="Simulation step size"
+    )
+    args = parser.parse_args()
+
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= cpus:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cpus:
+        workers.append(cpus)
+
+    reference = None
+    print(f"{'workers':>8} {'elapsed [s]':>12} {'runs/sec':>10} {'speedup':>9}")
+    for n in workers:
+        with run_sweep(
+            args.fmu_path,
+            args.stimuli_path,
+            variants=[{}] * args.runs,
+            max_workers=n,
+            stop_time=args.stop_time,
+            step_size=args.step_size,
+        ) as results:
+            elapsed = results.elapsed
+        reference = reference or elapsed
+        print(
+            f"{n:>8} {elapsed:>12.3f} {args.runs / elapsed:>10.1f} "
+            f"{reference / elapsed:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark the round trip of a step request: pipe vs shared-memory ring.
+
+An echo worker stands in for an out-of-process FMU: it receives a step
+request with an input vector, copies the inputs to its outputs and answers.
+The pipe baseline pickles the input bytes both ways, as the "pipe" transport
+of ParallelCoSimulation does; the ShmChannel only passes a command through
+its ring while the vectors stay in shared memory. Run from the ``src``
+folder:
+
+    python -m benchmarks.bench_transport --steps 100000 --inputs 16
+
+With ``--fmu_path`` the same comparison is also made on a real FMU, through
+a ParallelCoSimulation of that single FMU.
+"""
+
+import argparse
+import ctypes
+import multiprocessing
+import time
+from typing import Dict
+
+import numpy as np
+
+from simulator.parallel_cosimulation import TRANSPORTS, ParallelCoSimulation
+from simulator.shm_transport import OP_STEP, ShmChannel, shm_supported
+
+
+def _echo_pipe(conn) -> None:
+    while True:
+        message = conn.recv()
+        if message is None:
+            return
+        conn.send(message[3])
+
+
+def _echo_shm(spec: Dict) -> None:
+    channel = ShmChannel.attach(spec)
+    inputs, outputs = channel.input_views[0], channel.output_views[0]
+    alive = multiprocessing.parent_process().is_alive
+    while True:
+        opcode, _, _, _ = channel.receive_command(alive)
+        if opcode != OP_STEP:
+            break
+        outputs[:] = inputs
+        channel.send_response(alive=alive)
+    del inputs, outputs
+    channel.close()
+
+
+def measure_pipe(steps: int, size: int) -> float:
+    """Mean round trip in microseconds over a pipe."""
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=_echo_pipe, args=(child_conn,), daemon=True)
+    process.start()
+    values = (ctypes.c_double * size)()
+    outputs = (ctypes.c_double * size)()
+    # Warm up
+    parent_conn.send(("step", 0.0, 1.0, bytes(values)))
+    parent_conn.recv()
+    start = time.perf_counter()
+    for step in range(steps):
+        values[0] = step
+        parent_conn.send(("step", float(step), 1.0, bytes(values)))
+        ctypes.memmove(outputs, parent_conn.recv(), ctypes.sizeof(outputs))
+    elapsed = time.perf_counter() - start
+    parent_conn.send(None)
+    process.join()
+    assert outputs[0] == steps - 1
+    return elapsed / steps * 1e6
+
+
+def measure_shm(steps: int, size: int) -> float:
+    """Mean round trip in microseconds over a ShmChannel."""
+    context = multiprocessing.get_context("spawn")
+    channel = ShmChannel.create([("Float64", size)], [("Float64", size)])
+    process = context.Process(target=_echo_shm, args=(channel.spec,), daemon=True)
+    process.start()
+    inputs = channel.input_views[0]
+    outputs = np.empty(size)
+    alive = process.is_alive
+    channel.send_command(OP_STEP, alive=alive)
+    channel.receive_response(alive=alive)
+    start = time.perf_counter()
+    for step in range(steps):
+        inputs[0] = step
+        channel.send_command(OP_STEP, float(step), 1.0, 1, alive=alive)
+        channel.receive_response(alive=alive)
+        outputs[:] = channel.output_views[0]
+    elapsed = time.perf_counter() - start
+    channel.send_command(0, alive=alive)
+    process.join()
+    assert outputs[0] == steps - 1
+    del inputs
+    channel.unlink()
+    return elapsed / steps * 1e6
+
+
+def measure_fmu(fmu_path: str, transport: str, steps: int) -> float:
+    """Mean time per co-simulation step of one FMU, in microseconds."""
+    cosimulation = ParallelCoSimulation(
+        {"fmu": {"path": fmu_path, "step_size": 1.0}},
+        stop_time=float(steps),
+        resolution=1.0,
+        transport=transport,
+    )
+    cosimulation.setup()
+    try:
+        start = time.perf_counter()
+        cosimulation.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        cosimulation.close()
+    return elapsed / steps * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=100000, help="Round trips")
+    parser.add_argument(
+        "--inputs", type=int, default=16, help="Float64 values sent per step"
+    )
+    parser.add_argument(
+        "--fmu_path", type=str, default=None, help="Also compare on this FMU"
+    )
+    args = parser.parse_args()
+
+    pipe = measure_pipe(args.steps, args.inputs)
+    print(f"{'transport':>10} {'round trip [us]':>16}")
+    print(f"{'pipe':>10} {pipe:>16.2f}")
+    if shm_supported():
+        shm = measure_shm(args.steps, args.inputs)
+        print(f"{'shm':>10} {shm:>16.2f}  ({pipe / shm:.1f}x)")
+    else:
+        print(f"{'shm':>10} {'unsupported':>16}")
+
+    if args.fmu_path:
+        print(f"\n{'transport':>10} {'FMU step [us]':>16}")
+        for transport in TRANSPORTS if shm_supported() else ("pipe",):
+            elapsed = measure_fmu(args.fmu_path, transport, args.steps)
+            print(f"{transport:>10} {elapsed:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
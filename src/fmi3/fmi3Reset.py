@@ -1,21 +1,158 @@
 from fmi3.base_fmi3_module import BaseFMI3Module
+import re
+import xml.etree.ElementTree as ET
 
 
 class fmi3Reset(BaseFMI3Module):
-    def __init__(self):
+    def __init__(self, struct_file_path=None, xml_file_path=None):
         template = """
-    fmi3Status fmi3Reset(fmi3Instance instance) 
-    {
-        return fmi3OK;
-    }
-        """
-        super().__init__(template)
+// Calls module->fmi_reset(), where the SystemC module clears its internal
+// state; returns false for a module that does not define it
+template <typename T>
+auto fmi3ResetModule(T *module, int) -> decltype(module->fmi_reset(), bool()) {{
+    module->fmi_reset();
+    return true;
+}}
+
+template <typename T>
+bool fmi3ResetModule(T *, long) {{
+    return false;
+}}
+
+fmi3Status fmi3Reset(fmi3Instance instance) {{
+    {custom_code}
+    return fmi3OK;
+}}
+"""
+        self.xml_file_path = xml_file_path
+        self.struct_file_path = struct_file_path
+        if not self.struct_file_path:
+            super().__init__(template)
+        else:
+            super().__init__(
+                template=template,
+                includes=["struct.h"],
+                struct_file_path=struct_file_path,
+                xml_file_path=xml_file_path,
+            )
 
     def generate(self, config: dict):
+        if not self.struct_file_path:
+            # Return standard template with empty custom code
+            self.template = self.template.format(custom_code="")
+            return self.format_code(style="LLVM")
+        try:
+            with open(self.struct_file_path, "r") as f:
+                struct_content = f.read()
+        except Exception as e:
+            raise Exception(f"Error reading struct file: {e}")
+
+        variables = self.parse_struct(struct_content)
+        struct_name = self.get_struct_name(struct_content)
+        start_values = self.parse_xml(self.xml_file_path)
+
+        if config["type"] == "rtl":
+            custom_code = self.generate_custom_code(
+                variables=variables, start_values=start_values, struct_name=struct_name
+            )
+        elif config["type"] == "tlm":
+            custom_code = self.generate_custom_code_tlm(
+                variables=variables, start_values=start_values, struct_name=struct_name
+            )
+        self.template = self.template.format(custom_code=custom_code)
         return self.format_code(style="LLVM")
 
+    def parse_struct(self, struct_content):
+        variables = []
+        lines = struct_content.split("\n")
+
+        # Pattern to match variable declarations including pointers
+        variable_pattern = r"(?:(\w+(?:<[\w<>:]+>)?)\s+)?\*?\s*(\w+);"
+
+        for line in lines:
+            # Stop when we reach signals declaration
+            if "signals declaration" in line or "s_" in line:
+                break
+
+            # Skip comments and empty lines
+            if line.strip().startswith("//") or not line.strip():
+                continue
+
+            matches = re.findall(variable_pattern, line)
+            for _, variable_name in matches:
+                if variable_name:  # Ensure we don't add empty matches
+                    variables.append(variable_name)
+
+        return variables
+
+    def get_struct_name(self, struct_content):
+        struct_pattern = r"struct\s+(\w+)"
+        match = re.search(struct_pattern, struct_content)
+        return match.group(1)
+
+    def parse_xml(self, xml_path):
+        """Return the start value of each variable declared with one"""
+        try:
+            tree = ET.parse(xml_path)
+            root = tree.getroot()
+            start_values = {}
+            for var in root.find("ModelVariables"):
+                name = var.get("name")
+                start = var.get("start")
+                if name and start is not None:
+                    start_values[name] = start
+            return start_values
+        except Exception as e:
+            raise Exception(f"Error parsing XML file: {e}")
+
+    def generate_module_reset(self, module_name):
+        """Reset the module state, failing if the module cannot do it"""
+        custom_code = f"if (!fmi3ResetModule(fmu->{module_name}, 0)) {{\n"
+        custom_code += "    return fmi3Error;\n"
+        custom_code += "}\n\n"
+        return custom_code
+
+    def generate_custom_code(self, variables, start_values, struct_name):
+        custom_code = ""
+        custom_code += f"{struct_name} *fmu = ({struct_name} *)instance;\n\n"
+
+        # Remove "current_time" from variables
+        variables.remove("current_time")
+        variables.remove("time")
+
+        systemc_module_name: str = variables[-1]
+        variables.remove(systemc_module_name)
+
+        custom_code += self.generate_module_reset(systemc_module_name)
+
+        # Every variable, outputs included, goes back to its start value (or
+        # zero) on the FMU and on its signal, as after instantiation; the
+        # signals update and the processes run in the first doStep
+        custom_code += "fmu->time = 0;\n"
+        for variable in variables:
+            custom_code += f"fmu->{variable} = {start_values.get(variable, 0)};\n"
+            custom_code += f"fmu->s_{variable}.write(fmu->{variable});\n"
+        custom_code += "fmu->current_time = SC_ZERO_TIME;\n"
+        return custom_code
+
+    def generate_custom_code_tlm(self, variables, start_values, struct_name):
+        custom_code = ""
+        custom_code += f"{struct_name} *fmu = ({struct_name} *)instance;\n\n"
+
+        # Remove "current_time" from variables
+        variables.remove("current_time")
+        tlm_top_module_name: str = variables[-1]
+        variables.remove(tlm_top_module_name)
+
+        custom_code += self.generate_module_reset(tlm_top_module_name)
+
+        for variable in variables:
+            custom_code += f"fmu->{variable} = {start_values.get(variable, 0)};\n"
+        custom_code += "fmu->current_time = SC_ZERO_TIME;\n"
+        return custom_code
+
 
 if __name__ == "__main__":
     """Test the generator"""
-    generator = fmi3Reset()
+    generator = fmi3Reset(struct_file_path="prova_struct.h")
     print(generator.generate())
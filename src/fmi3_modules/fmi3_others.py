@@ -48,7 +48,9 @@ other_modules: List[BaseFMI3Module] = [
     ),
     fmi3InstantiateModelExchange(),
     fmi3InstantiateScheduledExecution(),
-    fmi3Reset(),
+    fmi3Reset(
+        struct_file_path="include/struct.h", xml_file_path="modelDescription.xml"
+    ),
     fmi3SerializeFMUState(),
     fmi3SerializedFMUStateSize(),
     fmi3Terminate(),
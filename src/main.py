@@ -1,5 +1,21 @@
 import argparse
-from simulator.fmu_simulator import FMUSimulator
+import logging
+from simulator.fmu_simulator import (
+    FMUSimulator,
+    LOG_LEVELS,
+    STEPPING_MODES,
+    stimuli_times,
+)
+from simulator.recorders import (
+    CSVRecorder,
+    NumpyRecorder,
+    StringRecorder,
+    TeeRecorder,
+)
+from simulator.interrupts import evaluate_trace
+from simulator.fmu_cache import FMUCache
+from simulator.time_base import resolution_for
+from simulator.isr_dispatch import DISPATCH_MODES, InterruptDispatcher, InterruptEvent
 import yaml
 from generators.xml_generator import (
     generate_fmi_xml,
@@ -17,6 +33,8 @@ from compile_fmu.compile_fmu import (
 )
 import sys
 
+logger = logging.getLogger(__name__)
+
 
 def isr_zero():
     print("[ZERO] Interrupt handled")
@@ -35,40 +53,109 @@ def load_stimuli(file_path: str) -> dict:
         return yaml.safe_load(f)
 
 
-def simulate_fmu(fmu_path: str, stop_time: float, step_size: float, stimuli_path: str):
+def simulate_fmu(
+    fmu_path: str,
+    stop_time: float,
+    step_size: float,
+    stimuli_path: str,
+    log_level: str = "full",
+    log_every: int = 1000,
+    output_path: str = None,
+    stepping: str = "fixed",
+    output_interval: float = None,
+    resolution: str = "SC_PS",
+    isr_dispatch: str = "sync",
+    isr_queue_size: int = 1024,
+    isr_drop: bool = False,
+    interrupt_mode: str = "online",
+    fmu_cache_dir: str = None,
+    use_fmu_cache: bool = False,
+    remote: str = None,
+    profile_path: str = None,
+):
+    stimuli = load_stimuli(stimuli_path)
+    inputs = {k: v for k, v in stimuli.items() if k.lower() != "interrupt"}
+    # Refine the master tick until the step size and every stimuli time are
+    # whole numbers of it; the FMU itself runs on the SystemC default 1 ps
+    resolution = resolution_for(
+        [stop_time, step_size, output_interval, *stimuli_times(inputs)], resolution
+    )
     simulator = FMUSimulator(
         fmu_path=fmu_path,
         stop_time=stop_time,
         step_size=step_size,
+        log_level=log_level,
+        log_every=log_every,
+        stepping=stepping,
+        output_interval=output_interval,
+        resolution=resolution,
+        dispatcher=InterruptDispatcher(
+            mode=isr_dispatch, maxsize=isr_queue_size, blocking=not isr_drop
+        ),
+        cache=FMUCache(fmu_cache_dir) if use_fmu_cache or fmu_cache_dir else False,
+        backend="remote" if remote else "fmpy",
+        remote=remote,
+        profile=profile_path is not None,
     )
+    # ISRs the stimuli file can refer to by name; others by dotted import path
+    for isr in (isr_zero, isr_carry, isr_result):
+        simulator.handler_registry.register(isr.__name__, isr)
 
     simulator.setup_model()
     simulator.initialize_fmu()
 
-    # Load and set input schedules from stimuli file
-    stimuli = load_stimuli(stimuli_path)
+    # Set input schedules from stimuli file
+    offline_conditions = {}
     for signal, schedule in stimuli.items():
-        if "clk" in signal.lower():
-            period = stimuli[signal]["period"]
-            schedule = {}
-            time = 0
-            while time < stop_time:
-                schedule[time] = 0
-                time += period / 2
-                schedule[time] = 1
-                time += period / 2
-        if signal.lower() != "interrupt":
-            simulator.set_input_schedule(signal, schedule)
-        else:
+        if signal.lower() == "interrupt" and interrupt_mode == "offline":
+            # Evaluated over the recorded trace once the run is over
+            offline_conditions.update(schedule)
+        elif signal.lower() == "interrupt":
             for interrupt, condition in stimuli[signal].items():
                 simulator.register_interrupt(
-                    name=interrupt, condition=condition, handler=eval(condition["isr"])
+                    name=interrupt, condition=condition, handler=condition.get("isr")
                 )
-
-    csv_output = simulator.run_simulation()
+        else:
+            simulator.set_stimuli({signal: schedule})
+
+    # Record typed columns for .npz outputs, stream CSV rows for any other
+    # output file, and return the CSV string if no output file is given
+    if output_path and output_path.endswith(".npz"):
+        recorder = NumpyRecorder(path=output_path, output="arrays")
+    elif output_path:
+        recorder = CSVRecorder(path=output_path)
+    else:
+        recorder = None
+    if offline_conditions:
+        trace = NumpyRecorder(output="arrays")
+        recorder = TeeRecorder(recorder or StringRecorder(), trace)
+    csv_output = simulator.run_simulation(recorder=recorder)
+
+    if profile_path:
+        simulator.profiler.to_json(profile_path)
+    if offline_conditions:
+        run_offline_interrupts(simulator, offline_conditions, trace.arrays)
     return csv_output
 
 
+def run_offline_interrupts(simulator: FMUSimulator, conditions: dict, arrays: dict):
+    """Evaluate interrupts over the recorded trace, then call the ISRs in order."""
+    events = evaluate_trace(conditions, arrays)
+    time = arrays["Time"]
+    ordered = sorted(
+        (t, name) for name, times in events.items() for t in times.tolist()
+    )
+    for name, times in events.items():
+        logger.info("Interrupt %s triggered %d times", name, len(times))
+    for t, name in ordered:
+        isr = conditions[name].get("isr")
+        if isr:
+            step = int(time.searchsorted(t))
+            simulator.dispatcher.dispatch(
+                simulator.handler_registry.resolve(isr), InterruptEvent(name, t, step)
+            )
+
+
 def generate_xml_struct(config: dict):
 
     if config["type"] == "rtl":
@@ -105,6 +192,13 @@ def generate_xml_struct(config: dict):
 
 
 def main():
+    """
+    Generate, build and simulate the FMU described by the command line.
+
+    Returns:
+        The path of the results file (``--output_path``, output.csv by
+        default), or the CSV string if ``--output_path`` is empty
+    """
     parser = argparse.ArgumentParser()
     parser.add_argument("--fmu_path", type=str, required=False, help="FMU folder path")
     parser.add_argument(
@@ -127,8 +221,108 @@ def main():
         required=False,
         help="Path to config file",
     )
+    parser.add_argument(
+        "--log_level",
+        type=str,
+        default="full",
+        choices=LOG_LEVELS,
+        help="Simulation log level",
+    )
+    parser.add_argument(
+        "--log_every",
+        type=int,
+        default=1000,
+        help="Steps between progress lines with --log_level summary",
+    )
+    parser.add_argument(
+        "--log_file",
+        type=str,
+        default=None,
+        required=False,
+        help="Write the simulation log to this file instead of the terminal",
+    )
+    parser.add_argument(
+        "--output_path",
+        type=str,
+        default="output.csv",
+        required=False,
+        help="Simulation results file: CSV, gzip-compressed CSV if it ends with "
+        ".gz, or typed NumPy columns if it ends with .npz",
+    )
+    parser.add_argument(
+        "--stepping",
+        type=str,
+        default="fixed",
+        choices=STEPPING_MODES,
+        help="Fixed step size or event-driven variable steps",
+    )
+    parser.add_argument(
+        "--output_interval",
+        type=float,
+        default=None,
+        required=False,
+        help="Record results on this fixed time grid only",
+    )
+    parser.add_argument(
+        "--isr_dispatch",
+        type=str,
+        default="sync",
+        choices=DISPATCH_MODES,
+        help="Run interrupt handlers inline or on a worker thread",
+    )
+    parser.add_argument(
+        "--isr_queue_size",
+        type=int,
+        default=1024,
+        help="Capacity of the interrupt queue with --isr_dispatch thread",
+    )
+    parser.add_argument(
+        "--isr_drop",
+        action="store_true",
+        help="Drop interrupts when the queue is full instead of waiting",
+    )
+    parser.add_argument(
+        "--interrupt_mode",
+        type=str,
+        default="online",
+        choices=("online", "offline"),
+        help="Check interrupts during the run, or over the recorded trace after it",
+    )
+    parser.add_argument(
+        "--fmu_cache_dir",
+        type=str,
+        default=None,
+        required=False,
+        help="Cache of extracted FMUs, implies --fmu_cache",
+    )
+    parser.add_argument(
+        "--fmu_cache",
+        action="store_true",
+        help="Keep the extracted FMU in a cache ($SYSTEMC_FMI_CACHE or "
+        "~/.cache/systemc-fmi) instead of a temporary folder",
+    )
+    parser.add_argument(
+        "--remote",
+        type=str,
+        default=None,
+        required=False,
+        help="Run the FMU on the worker daemon at token@host:port, or at "
+        "host:port with the token in $SYSTEMC_FMI_TOKEN (python -m simulator.remote)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        required=False,
+        help="Time each phase of the step loop and write the histograms as "
+        "JSON to this file",
+    )
     args = parser.parse_args()
 
+    logging.basicConfig(
+        filename=args.log_file, level=logging.INFO, format="%(message)s"
+    )
+
     with open(args.config_file_path, "r") as stream:
         try:
             config = yaml.safe_load(stream)
@@ -199,17 +393,33 @@ def main():
         if not run_build_script_bash():
             sys.exit(1)
 
-    csv_output = simulate_fmu(
+    # Master time base starts from the resolution of the generated FMU and is
+    # refined by simulate_fmu if the stimuli need finer ticks
+    default_experiment = config["fmi_config"].get("DefaultExperiment", {})
+    resolution = default_experiment.get("resolution", "SC_PS")
+
+    output = simulate_fmu(
         fmu_path=args.fmu_path,
         stop_time=args.stop_time,
         step_size=args.step_size,
         stimuli_path=args.stimuli_path,
+        log_level=args.log_level,
+        log_every=args.log_every,
+        output_path=args.output_path,
+        stepping=args.stepping,
+        output_interval=args.output_interval,
+        resolution=resolution,
+        isr_dispatch=args.isr_dispatch,
+        isr_queue_size=args.isr_queue_size,
+        isr_drop=args.isr_drop,
+        interrupt_mode=args.interrupt_mode,
+        fmu_cache_dir=args.fmu_cache_dir,
+        use_fmu_cache=args.fmu_cache,
+        remote=args.remote,
+        profile_path=args.profile,
     )
 
-    with open("output.csv", "w") as file:
-        file.write(csv_output)
-
-    return csv_output
+    return output
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder
+
+# Simulator hosted by this process, in the executor's worker
+_simulator: Optional[FMUSimulator] = None
+
+
+def _host_init(fmu_path: str, simulator_kwargs: Dict[str, Any]) -> None:
+    global _simulator
+    if _simulator is not None:
+        raise RuntimeError(
+            "This process already hosts a simulator (SystemC allows one per "
+            "process), use process=True"
+        )
+    simulator = FMUSimulator(fmu_path=fmu_path, log_enabled=False, **simulator_kwargs)
+    simulator.setup_model()
+    simulator.initialize_fmu()
+    _simulator = simulator
+
+
+def _host_call(method: str, *args: Any) -> Any:
+    return getattr(_simulator, method)(*args)
+
+
+def _host_attribute(name: str) -> Any:
+    return getattr(_simulator, name)
+
+
+def _host_advance(steps: Optional[int]) -> Optional[Dict[str, np.ndarray]]:
+    """Run ``steps`` communication steps (all remaining if None) from where the
+    instance is, returning the recorded columns, or None at the stop time."""
+    simulator = _simulator
+    to_ticks = simulator.time_base.to_ticks
+    # Compare ticks: the float times may differ in their last bits
+    if to_ticks(simulator.current_time) >= to_ticks(simulator.stop_time):
+        return None
+    stop_time = simulator.stop_time
+    if steps is not None:
+        stop_time = min(stop_time, simulator.current_time + steps * simulator.step_size)
+    return simulator.run(
+        NumpyRecorder(output="arrays"),
+        start_time=simulator.current_time,
+        stop_time=stop_time,
+    )
+
+
+def _host_close() -> None:
+    global _simulator
+    simulator, _simulator = _simulator, None
+    if simulator is not None:
+        simulator.close()
+
+
+class AsyncFMUSimulator:
+    """
+    asyncio front end of an FMUSimulator.
+
+    Every call into the FMU (doStep, the batched set/get, reset) runs on a
+    single-worker executor that owns the instance, so the event loop is never
+    blocked and calls are served in order. The simulation advances in chunks
+    of steps; ``chunks()`` and ``rows()`` only fetch the next chunk when the
+    consumer has room for it, which is the backpressure toward slow readers.
+
+    With ``process=True`` the FMU lives in its own spawned worker process, so
+    many simulations (each with its own SystemC kernel) can be driven from one
+    event loop::
+
+        async with AsyncFMUSimulator("ALU.fmu", process=True, stop_time=1e-6,
+                                     step_size=1e-9) as simulator:
+            await simulator.set_stimuli(stimuli)
+            async for row in simulator.rows():
+                ...
+
+    Without it the FMU runs on a thread of this process, which then cannot
+    host another simulator.
+    """
+
+    def __init__(self, fmu_path: str, process: bool = False, **simulator_kwargs: Any):
+        """
+        Args:
+            fmu_path: Path to the FMU file
+            process: Host the FMU in a worker process instead of a thread
+            **simulator_kwargs: FMUSimulator arguments (stop_time, step_size, ...)
+        """
+        self.fmu_path = fmu_path
+        self.process = process
+        self.simulator_kwargs = simulator_kwargs
+        self.executor: Optional[Executor] = None
+
+    async def _submit(self, function, *args: Any) -> Any:
+        if self.executor is None:
+            raise RuntimeError("Simulator not started, call start() first")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def start(self) -> None:
+        """Set up and instantiate the FMU."""
+        if self.process:
+            self.executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            await self._submit(_host_init, self.fmu_path, self.simulator_kwargs)
+        except BaseException:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            raise
+
+    async def set_stimuli(self, stimuli: Dict[str, Any]) -> None:
+        """Set the input schedules and generators, see FMUSimulator.set_stimuli()."""
+        await self._submit(_host_call, "set_stimuli", stimuli)
+
+    async def register_interrupt(
+        self,
+        name: str,
+        condition: Dict[str, Any],
+        handler: Optional[Union[str, Callable]] = None,
+    ) -> None:
+        """
+        Register an interrupt, see FMUSimulator.register_interrupt().
+
+        Handlers run next to the FMU, in its thread or process; with
+        ``process=True`` pass them by dotted import path. Edge conditions keep
+        their previous sample from one step() or chunk to the next.
+        """
+        await self._submit(_host_call, "register_interrupt", name, condition, handler)
+
+    async def current_time(self) -> float:
+        """Time the FMU instance has reached."""
+        return await self._submit(_host_attribute, "current_time")
+
+    async def step(self, steps: int = 1) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Advance the simulation by a number of communication steps.
+
+        Returns:
+            The columns recorded during these steps, or None once the stop
+            time has been reached
+        """
+        return await self._submit(_host_advance, steps)
+
+    async def run(self) -> Optional[Dict[str, np.ndarray]]:
+        """Run until the stop time and return the columns recorded."""
+        return await self._submit(_host_advance, None)
+
+    async def reset(self) -> None:
+        """Bring the FMU back to its initial state, see FMUSimulator.reset()."""
+        await self._submit(_host_call, "reset")
+
+    async def chunks(
+        self, chunk_steps: int = 1000, prefetch: int = 1
+    ) -> AsyncIterator[Dict[str, np.ndarray]]:
+        """
+        Iterate over the result columns, ``chunk_steps`` steps at a time.
+
+        Args:
+            chunk_steps: Communication steps simulated per chunk
+            prefetch: Chunks simulated ahead of the consumer
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+
+        async def produce() -> None:
+            try:
+                while True:
+                    chunk = await self.step(chunk_steps)
+                    await queue.put(chunk)
+                    if chunk is None:
+                        return
+            except Exception as e:
+                await queue.put(e)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+    async def rows(
+        self, chunk_steps: int = 1000, prefetch: int = 1
+    ) -> AsyncIterator[Tuple[Any, ...]]:
+        """Iterate over the result rows: time, inputs, then outputs."""
+        async for chunk in self.chunks(chunk_steps, prefetch):
+            for row in zip(*(column.tolist() for column in chunk.values())):
+                yield row
+
+    async def close(self) -> None:
+        """Free the FMU and stop the executor."""
+        if self.executor is None:
+            return
+        try:
+            await self._submit(_host_close)
+        finally:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    async def __aenter__(self) -> "AsyncFMUSimulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
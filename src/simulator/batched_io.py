@@ -0,0 +1,230 @@
+from fmpy.fmi3 import (
+    fmi3ValueReference,
+    fmi3Boolean,
+    fmi3UInt8,
+    fmi3UInt16,
+    fmi3UInt32,
+    fmi3UInt64,
+    fmi3Int8,
+    fmi3Int16,
+    fmi3Int32,
+    fmi3Int64,
+    fmi3Float32,
+    fmi3Float64,
+)
+import numpy as np
+from fmpy.fmi1 import FMICallException
+from fmpy.fmi3 import fmi3Warning
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def to_bool(value: Any) -> bool:
+    """Convert a value (possibly an XML start string such as "false") to bool."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
+
+
+def parse_start(var_type: str, start: Any) -> Any:
+    """Convert a start value read from modelDescription.xml to a Python value."""
+    if not isinstance(start, str) or var_type not in FMI3_CASTS:
+        return start
+    if var_type == "Boolean":
+        return to_bool(start)
+    if var_type.startswith("Float"):
+        return float(start)
+    return int(start)
+
+
+# ctypes element type of each supported FMI 3.0 variable type
+FMI3_CTYPES: Dict[str, Any] = {
+    "Boolean": fmi3Boolean,
+    "UInt8": fmi3UInt8,
+    "UInt16": fmi3UInt16,
+    "UInt32": fmi3UInt32,
+    "UInt64": fmi3UInt64,
+    "Int8": fmi3Int8,
+    "Int16": fmi3Int16,
+    "Int32": fmi3Int32,
+    "Int64": fmi3Int64,
+    "Float32": fmi3Float32,
+    "Float64": fmi3Float64,
+}
+
+# NumPy dtype used to record each supported FMI 3.0 variable type
+FMI3_NUMPY_DTYPES: Dict[str, Any] = {
+    "Boolean": np.bool_,
+    "UInt8": np.uint8,
+    "UInt16": np.uint16,
+    "UInt32": np.uint32,
+    "UInt64": np.uint64,
+    "Int8": np.int8,
+    "Int16": np.int16,
+    "Int32": np.int32,
+    "Int64": np.int64,
+    "Float32": np.float32,
+    "Float64": np.float64,
+}
+
+# Python conversion applied before a value is written to the FMU
+FMI3_CASTS: Dict[str, Callable[[Any], Any]] = {
+    "Boolean": to_bool,
+    "UInt8": int,
+    "UInt16": int,
+    "UInt32": int,
+    "UInt64": int,
+    "Int8": int,
+    "Int16": int,
+    "Int32": int,
+    "Int64": int,
+    "Float32": float,
+    "Float64": float,
+}
+
+
+class TypeGroup:
+    """Variables of a single FMI type with their preallocated ctypes buffers."""
+
+    def __init__(self, var_type: str, names: List[str], vrs: List[int]):
+        if var_type not in FMI3_CTYPES:
+            raise ValueError(f"Unsupported variable type: {var_type}")
+        self.var_type = var_type
+        self.names = names
+        self.size = len(vrs)
+        self.vrs = (fmi3ValueReference * self.size)(*vrs)
+        self.values = (FMI3_CTYPES[var_type] * self.size)()
+        self.cast = FMI3_CASTS[var_type]
+        # Position of each variable in the caller's input/output vector
+        self.positions: List[int] = []
+        self.function = None  # Bound fmi3Set<Type>/fmi3Get<Type> function
+        self.function_name = None
+        self.dirty = False
+
+
+class BatchedIO:
+    """
+    Type-grouped batched access to the inputs and outputs of an FMU.
+
+    Value references are grouped by FMI type once, into preallocated ctypes
+    arrays. Each step then issues at most one ``fmi3Set<Type>`` call per input
+    type that changed and one ``fmi3Get<Type>`` call per output type, and the
+    output vector is filled in place.
+    """
+
+    def __init__(
+        self,
+        variable_info: Dict[str, Dict[str, Any]],
+        vrs: Dict[str, int],
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+    ):
+        self.inputs: List[str] = list(inputs)
+        self.outputs: List[str] = list(outputs)
+        self.input_index: Dict[str, int] = {n: i for i, n in enumerate(self.inputs)}
+        self.output_index: Dict[str, int] = {n: i for i, n in enumerate(self.outputs)}
+
+        self.input_groups = self._group(self.inputs, variable_info, vrs)
+        self.output_groups = self._group(self.outputs, variable_info, vrs)
+
+        # (group, slot) of each input, indexed like self.inputs
+        self.input_slots: List[Tuple[TypeGroup, int]] = [None] * len(self.inputs)
+        for group in self.input_groups:
+            for slot, position in enumerate(group.positions):
+                self.input_slots[position] = (group, slot)
+                start = variable_info[group.names[slot]]["start"]
+                if start is not None:
+                    group.values[slot] = group.cast(start)
+
+        self.component = None
+
+    @staticmethod
+    def _group(
+        names: List[str],
+        variable_info: Dict[str, Dict[str, Any]],
+        vrs: Dict[str, int],
+    ) -> List[TypeGroup]:
+        by_type: Dict[str, List[int]] = {}
+        for position, name in enumerate(names):
+            by_type.setdefault(variable_info[name]["type"], []).append(position)
+
+        groups = []
+        for var_type, positions in by_type.items():
+            group = TypeGroup(
+                var_type=var_type,
+                names=[names[p] for p in positions],
+                vrs=[vrs[names[p]] for p in positions],
+            )
+            group.positions = positions
+            groups.append(group)
+        return groups
+
+    def bind(self, fmu) -> None:
+        """
+        Bind the groups to the FMI functions of an instantiated FMU.
+
+        The bound functions must return the ``fmi3Status`` code; fmpy's wrappers
+        raise on errors themselves, the ctypes backend leaves it to this class.
+
+        Args:
+            fmu: Instantiated FMU exposing ``component`` and ``fmi3Set<Type>``/
+                ``fmi3Get<Type>`` functions (e.g. an fmpy ``FMU3Slave``)
+        """
+        self.component = fmu.component
+        for group in self.input_groups:
+            group.function_name = f"fmi3Set{group.var_type}"
+            group.function = getattr(fmu, group.function_name)
+            # The FMU's state was re-initialized, write the whole buffer again
+            group.dirty = True
+        for group in self.output_groups:
+            group.function_name = f"fmi3Get{group.var_type}"
+            group.function = getattr(fmu, group.function_name)
+
+    def write(self, index: int, value: Any) -> None:
+        """Store a value for input ``index``; it is sent on the next flush()."""
+        group, slot = self.input_slots[index]
+        group.values[slot] = group.cast(value)
+        group.dirty = True
+
+    def flush(self) -> None:
+        """Send every input type group that changed since the last flush."""
+        component = self.component
+        for group in self.input_groups:
+            if group.dirty:
+                status = group.function(
+                    component, group.vrs, group.size, group.values, group.size
+                )
+                if status > fmi3Warning:
+                    raise FMICallException(function=group.function_name, status=status)
+                group.dirty = False
+
+    def fetch(self) -> None:
+        """Read all outputs into the group buffers only, without unpacking."""
+        component = self.component
+        for group in self.output_groups:
+            status = group.function(
+                component, group.vrs, group.size, group.values, group.size
+            )
+            if status > fmi3Warning:
+                raise FMICallException(function=group.function_name, status=status)
+
+    def read(self, out: List[Any]) -> List[Any]:
+        """
+        Read all outputs into ``out`` in place.
+
+        Args:
+            out: Output vector indexed like ``self.outputs``
+
+        Returns:
+            The same ``out`` list
+        """
+        component = self.component
+        for group in self.output_groups:
+            status = group.function(
+                component, group.vrs, group.size, group.values, group.size
+            )
+            if status > fmi3Warning:
+                raise FMICallException(function=group.function_name, status=status)
+            values = group.values
+            for slot, position in enumerate(group.positions):
+                out[position] = values[slot]
+        return out
@@ -0,0 +1,374 @@
+import logging
+import math
+import time as timer
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import yaml
+
+from simulator.batched_io import TypeGroup
+from simulator.fmu_simulator import FMUSimulator
+from simulator.input_schedule import InputTimeline
+from simulator.recorders import Recorder, StringRecorder
+from simulator.time_base import TimeBase
+
+logger = logging.getLogger(__name__)
+
+# Order in which the FMUs of a communication point see each other's outputs
+ORDERINGS = ("jacobi", "gauss-seidel")
+
+
+def split_endpoint(endpoint: str) -> Tuple[str, str]:
+    """Split ``"<fmu>.<variable>"`` into the FMU name and the variable name."""
+    fmu, _, variable = endpoint.partition(".")
+    if not fmu or not variable:
+        raise ValueError(f"Invalid endpoint {endpoint}, expected <fmu>.<variable>")
+    return fmu, variable
+
+
+class Transfer:
+    """
+    Copies connected outputs of one type group into one input type group.
+
+    Both sides are NumPy views over the ctypes buffers that BatchedIO passes
+    to fmi3Get<Type>/fmi3Set<Type>, so a transfer is one fancy-indexed copy.
+    """
+
+    __slots__ = ("source", "target", "source_slots", "target_slots", "group")
+
+    def __init__(
+        self,
+        source_group: TypeGroup,
+        target_group: TypeGroup,
+        source_slots: List[int],
+        target_slots: List[int],
+    ):
+        self.source = np.ctypeslib.as_array(source_group.values)
+        self.target = np.ctypeslib.as_array(target_group.values)
+        self.source_slots = np.array(source_slots, dtype=np.intp)
+        self.target_slots = np.array(target_slots, dtype=np.intp)
+        self.group = target_group
+
+    def apply(self) -> None:
+        self.target[self.target_slots] = self.source[self.source_slots]
+        self.group.dirty = True
+
+
+class CoSimulation:
+    """
+    Master stepping several FMI 3.0 co-simulation FMUs wired together.
+
+    Each FMU is loaded through its own FMUSimulator (so the FMU cache and the
+    backends apply) and communicates at its own step size on the integer
+    master time base. At every communication point of an FMU its outputs are
+    fetched, its inputs are set from the connected outputs and from its
+    stimuli, then it steps. With "jacobi" ordering every FMU sees the outputs
+    of the others as of their last communication point; with "gauss-seidel"
+    the FMUs step one after the other in declaration order, and each one sees
+    the outputs the previous ones have just produced.
+
+    Connections are resolved once into Transfer plans between type group
+    buffers, so the loop does no name lookups. Rows hold every FMU output on
+    the grid of the greatest common divisor of the step sizes, each as of the
+    last communication point of its FMU.
+
+    FMUs generated by this tool that link a shared SystemC library cannot
+    share a process; only one of them can be loaded per master.
+    """
+
+    def __init__(
+        self,
+        fmus: Dict[str, Dict[str, Any]],
+        connections: Sequence[Sequence[str]] = (),
+        stop_time: float = 10.0,
+        resolution: Union[str, float] = "SC_PS",
+        stimuli: Optional[Dict[str, Any]] = None,
+        ordering: str = "jacobi",
+    ):
+        """
+        Args:
+            fmus: FMU name to its settings: ``path``, ``step_size`` and
+                optionally other FMUSimulator arguments (backend, cache, ...)
+            connections: ``[source, target]`` pairs of ``"<fmu>.<variable>"``
+                endpoints, from an output to an input
+            stop_time: Simulation stop time
+            resolution: Tick of the integer master time base, see TimeBase
+            stimuli: ``"<fmu>.<input>"`` to schedule or generator description,
+                for inputs that are not connected
+            ordering: One of ORDERINGS
+        """
+        if not fmus:
+            raise ValueError("At least one FMU is required")
+        if ordering not in ORDERINGS:
+            raise ValueError(
+                f"Unknown ordering {ordering}, expected one of {list(ORDERINGS)}"
+            )
+        self.ordering = ordering
+        self.fmu_settings = fmus
+        self.connections = [tuple(connection) for connection in connections]
+        self.stop_time = stop_time
+        self.start_time = 0.0
+        self.resolution = resolution
+        self.time_base = TimeBase(resolution)
+        self.stimuli = stimuli or {}
+        self.names: List[str] = list(fmus)
+        self.simulators: List[FMUSimulator] = []
+
+    @classmethod
+    def from_yaml(cls, path: str) -> "CoSimulation":
+        """
+        Create a master from a YAML description::
+
+            stop_time: 1.0e-6
+            resolution: SC_PS
+            ordering: jacobi
+            fmus:
+              alu: {path: ALU.fmu, step_size: 1.0e-9}
+              acc: {path: ACC.fmu, step_size: 2.0e-9}
+            connections:
+              - [alu.result, acc.in]
+            stimuli:
+              alu.a: {0.0: 1, 5.0e-8: 2}
+        """
+        with open(path, "r") as f:
+            description = yaml.safe_load(f)
+        return cls(
+            fmus=description["fmus"],
+            connections=description.get("connections", []),
+            stop_time=description.get("stop_time", 10.0),
+            resolution=description.get("resolution", "SC_PS"),
+            stimuli=description.get("stimuli"),
+            ordering=description.get("ordering", "jacobi"),
+        )
+
+    def setup(self) -> None:
+        """Load and instantiate every FMU, then resolve the connection graph."""
+        for name in self.names:
+            settings = dict(self.fmu_settings[name])
+            if "path" not in settings or "step_size" not in settings:
+                raise ValueError(f"FMU {name} needs a path and a step_size")
+            simulator = FMUSimulator(
+                fmu_path=settings.pop("path"),
+                stop_time=self.stop_time,
+                log_enabled=False,
+                resolution=self.resolution,
+                **settings,
+            )
+            simulator.setup_model()
+            self.simulators.append(simulator)
+            self._instantiate(len(self.simulators) - 1, self.fmu_settings[name])
+
+        driven = set()
+        for source, target in self.connections:
+            self._endpoint(source, "output")
+            self._endpoint(target, "input")
+            if target in driven:
+                raise ValueError(f"Input {target} is connected more than once")
+            driven.add(target)
+
+        for endpoint, schedule in self.stimuli.items():
+            fmu, variable = self._endpoint(endpoint, "input")
+            if endpoint in driven:
+                raise ValueError(f"Input {endpoint} is both connected and stimulated")
+            self.simulators[fmu].set_stimuli({variable: schedule})
+
+        self.transfers = self._plan_transfers()
+
+    def _instantiate(self, index: int, settings: Dict[str, Any]) -> None:
+        """Instantiate the FMU of a loaded simulator."""
+        self.simulators[index].initialize_fmu()
+
+    def _exchange(self, active: List[int]) -> None:
+        """Make the outputs of the active FMUs at this point visible."""
+        if self.ordering == "jacobi":
+            for k in active:
+                self.simulators[k].io.fetch()
+
+    def _step(self, k: int, time: float, step_size: float) -> None:
+        """Send the inputs of an FMU and step it."""
+        simulator = self.simulators[k]
+        simulator.io.flush()
+        simulator.fmu.doStep(
+            currentCommunicationPoint=time, communicationStepSize=step_size
+        )
+        if self.ordering == "gauss-seidel":
+            simulator.io.fetch()
+
+    def _begin(self) -> None:
+        """Make the initial outputs visible before the first step."""
+        for simulator in self.simulators:
+            simulator.io.fetch()
+
+    def _finish(self) -> None:
+        """Called once the last step has been issued."""
+
+    def _endpoint(self, endpoint: str, causality: str) -> Tuple[int, str]:
+        """Return the FMU index and variable of an endpoint, checked."""
+        fmu, variable = split_endpoint(endpoint)
+        if fmu not in self.names:
+            raise ValueError(f"Unknown FMU {fmu} in {endpoint}")
+        index = self.names.index(fmu)
+        info = self.simulators[index].variable_info.get(variable)
+        if info is None:
+            raise ValueError(f"Variable {variable} not found in FMU {fmu}")
+        if info["causality"] != causality:
+            raise ValueError(f"{endpoint} is not an {causality} variable")
+        return index, variable
+
+    def _plan_transfers(self) -> List[List[Transfer]]:
+        """Group the connections into one Transfer per FMU and group pair."""
+        pairs: List[Dict[Tuple[int, int, int], Tuple[list, list]]] = [
+            {} for _ in self.simulators
+        ]
+        for source, target in self.connections:
+            source_fmu, source_variable = self._endpoint(source, "output")
+            target_fmu, target_variable = self._endpoint(target, "input")
+            source_io = self.simulators[source_fmu].io
+            target_io = self.simulators[target_fmu].io
+            source_group, source_slot = self._output_slot(
+                source_io, source_io.output_index[source_variable]
+            )
+            target_group, target_slot = target_io.input_slots[
+                target_io.input_index[target_variable]
+            ]
+            key = (
+                source_fmu,
+                source_io.output_groups.index(source_group),
+                target_io.input_groups.index(target_group),
+            )
+            slots = pairs[target_fmu].setdefault(key, ([], []))
+            slots[0].append(source_slot)
+            slots[1].append(target_slot)
+
+        transfers: List[List[Transfer]] = []
+        for target_fmu, plan in enumerate(pairs):
+            target_io = self.simulators[target_fmu].io
+            transfers.append(
+                [
+                    Transfer(
+                        self.simulators[source_fmu].io.output_groups[source_group],
+                        target_io.input_groups[target_group],
+                        source_slots,
+                        target_slots,
+                    )
+                    for (source_fmu, source_group, target_group), (
+                        source_slots,
+                        target_slots,
+                    ) in plan.items()
+                ]
+            )
+        return transfers
+
+    @staticmethod
+    def _output_slot(io, position: int) -> Tuple[TypeGroup, int]:
+        for group in io.output_groups:
+            if position in group.positions:
+                return group, group.positions.index(position)
+        raise ValueError(f"No output at position {position}")
+
+    def run(self, recorder: Optional[Recorder] = None):
+        """
+        Run all the FMUs from start to stop time.
+
+        Args:
+            recorder: Sink receiving one row per master step, with a
+                ``<fmu>.<output>`` column per output. Defaults to a
+                StringRecorder, which returns the whole CSV as a string.
+
+        Returns:
+            The value returned by ``recorder.close()``
+        """
+        to_ticks = self.time_base.to_ticks
+        to_seconds = self.time_base.to_seconds
+        start_ticks = to_ticks(self.start_time)
+        stop_ticks = to_ticks(self.stop_time)
+
+        count = len(self.simulators)
+        ios = [simulator.io for simulator in self.simulators]
+        periods = [to_ticks(simulator.step_size) for simulator in self.simulators]
+        period_seconds = [to_seconds(period) for period in periods]
+        master_ticks = math.gcd(*periods)
+        transfers = self.transfers
+
+        # Stimuli of the inputs that are not connected
+        stimuli = []
+        for simulator in self.simulators:
+            schedules = list(simulator.input_schedules.items())
+            for _, schedule in schedules:
+                schedule.reset()
+            stimuli.append(
+                (
+                    InputTimeline(schedule for _, schedule in schedules),
+                    [(simulator.io.input_index[n], s) for n, s in schedules],
+                )
+            )
+
+        # Output buffer slots of each FMU, with their column
+        columns = ["Time"]
+        types = ["Float64"]
+        record_slots: List[List[Tuple[Any, int, int]]] = []
+        for name, simulator in zip(self.names, self.simulators):
+            slots = []
+            for position, output in enumerate(simulator.io.outputs):
+                group, slot = self._output_slot(simulator.io, position)
+                slots.append((group.values, slot, len(columns) - 1))
+                columns.append(f"{name}.{output}")
+                types.append(simulator.variable_info[output]["type"])
+            record_slots.append(slots)
+        output_values: List[Any] = [None] * (len(columns) - 1)
+        if recorder is None:
+            recorder = StringRecorder()
+        recorder.open(columns=columns, types=types)
+
+        next_ticks = [start_ticks] * count
+        time = start_ticks
+        steps = 0
+        wall_start = timer.perf_counter()
+        exchange = self._exchange
+        step = self._step
+        self._begin()
+        try:
+            while time < stop_ticks:
+                current_time = to_seconds(time)
+                active = [k for k in range(count) if next_ticks[k] == time]
+
+                # Outputs of the FMUs at a communication point. The others
+                # keep the row values of their last one: with gauss-seidel
+                # their buffers already hold the outputs of their next one
+                exchange(active)
+                for k in active:
+                    for values, slot, column in record_slots[k]:
+                        output_values[column] = values[slot]
+                recorder.record(current_time, [], output_values)
+
+                # Inputs from the connected outputs and from the stimuli
+                for k in active:
+                    for transfer in transfers[k]:
+                        transfer.apply()
+                    timeline, schedules = stimuli[k]
+                    if timeline.advance(time):
+                        for index, schedule in schedules:
+                            value = schedule.value_at(time)
+                            if value is not None:
+                                ios[k].write(index, value)
+                    step(k, current_time, period_seconds[k])
+                    next_ticks[k] = time + periods[k]
+                    steps += 1
+                time += master_ticks
+        finally:
+            self._finish()
+            result = recorder.close()
+
+        logger.info(
+            "Co-simulation of %d FMUs: %d steps in %.3f s",
+            count,
+            steps,
+            timer.perf_counter() - wall_start,
+        )
+        return result
+
+    def close(self) -> None:
+        """Terminate and free every FMU instance."""
+        for simulator in self.simulators:
+            simulator.close()
+        self.simulators = []
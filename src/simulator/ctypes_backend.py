@@ -0,0 +1,314 @@
+from ctypes import CDLL, POINTER, byref, c_size_t
+from fmpy import freeLibrary, platform_tuple, sharedLibraryExtension
+from fmpy.fmi1 import FMICallException
+from fmpy.fmi3 import (
+    fmi3Boolean,
+    fmi3Float64,
+    fmi3Instance,
+    fmi3InstanceEnvironment,
+    fmi3IntermediateUpdateCallback,
+    fmi3LogMessageCallback,
+    fmi3Status,
+    fmi3String,
+    fmi3ValueReference,
+    fmi3Warning,
+    printLogMessage,
+)
+from typing import Any, List, Sequence, Tuple
+import os
+from simulator.batched_io import FMI3_CTYPES
+
+
+class CTypesFMU3Slave:
+    """
+    Lightweight FMI 3.0 Co-Simulation backend built directly on ctypes.
+
+    The extracted shared library is loaded once and the ``fmi3DoStep``,
+    ``fmi3Get<Type>`` and ``fmi3Set<Type>`` symbols are bound with fixed
+    argtypes. The typed ``fmi3Get<Type>``/``fmi3Set<Type>`` attributes are the
+    raw foreign functions returning the ``fmi3Status`` code, so the batched
+    I/O layer can check the status with a single comparison; ``doStep`` reuses
+    persistent output buffers.
+
+    The public methods mirror the subset of fmpy's ``FMU3Slave`` used by
+    ``FMUSimulator``, so both backends are interchangeable.
+    """
+
+    def __init__(
+        self,
+        guid: str,
+        unzipDirectory: str,
+        modelIdentifier: str,
+        instanceName: str = None,
+    ):
+        self.guid = guid
+        self.unzipDirectory = unzipDirectory
+        self.modelIdentifier = modelIdentifier
+        self.instanceName = instanceName if instanceName else modelIdentifier
+        self.component = None
+
+        library_dir = os.path.abspath(
+            os.path.join(unzipDirectory, "binaries", platform_tuple)
+        )
+        library_path = os.path.join(
+            library_dir, modelIdentifier + sharedLibraryExtension
+        )
+        if not os.path.isfile(library_path):
+            raise Exception(f"Cannot find shared library {library_path}.")
+
+        # Some shared libraries resolve their dependencies relative to the cwd
+        work_dir = os.getcwd()
+        os.chdir(library_dir)
+        try:
+            self.dll = CDLL(library_path)
+        except Exception as e:
+            raise Exception(f"Failed to load shared library {library_path}. {e}")
+        finally:
+            os.chdir(work_dir)
+
+        self._bind(
+            "fmi3InstantiateCoSimulation",
+            [
+                fmi3String,
+                fmi3String,
+                fmi3String,
+                fmi3Boolean,
+                fmi3Boolean,
+                fmi3Boolean,
+                fmi3Boolean,
+                POINTER(fmi3ValueReference),
+                c_size_t,
+                fmi3InstanceEnvironment,
+                fmi3LogMessageCallback,
+                fmi3IntermediateUpdateCallback,
+            ],
+            fmi3Instance,
+        )
+        self._bind(
+            "fmi3EnterInitializationMode",
+            [
+                fmi3Instance,
+                fmi3Boolean,
+                fmi3Float64,
+                fmi3Float64,
+                fmi3Boolean,
+                fmi3Float64,
+            ],
+        )
+        self._bind("fmi3ExitInitializationMode", [fmi3Instance])
+        self._bind(
+            "fmi3DoStep",
+            [
+                fmi3Instance,
+                fmi3Float64,
+                fmi3Float64,
+                fmi3Boolean,
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Float64),
+            ],
+        )
+        self._bind("fmi3EnterEventMode", [fmi3Instance])
+        self._bind("fmi3EnterStepMode", [fmi3Instance])
+        self._bind(
+            "fmi3UpdateDiscreteStates",
+            [
+                fmi3Instance,
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Boolean),
+                POINTER(fmi3Float64),
+            ],
+        )
+        self._bind("fmi3Terminate", [fmi3Instance])
+        self._bind("fmi3Reset", [fmi3Instance])
+        self._bind("fmi3FreeInstance", [fmi3Instance], None)
+
+        for var_type, ctype in FMI3_CTYPES.items():
+            argtypes = [
+                fmi3Instance,
+                POINTER(fmi3ValueReference),
+                c_size_t,
+                POINTER(ctype),
+                c_size_t,
+            ]
+            self._bind(f"fmi3Set{var_type}", argtypes)
+            self._bind(f"fmi3Get{var_type}", argtypes)
+
+        # Persistent doStep output buffers and references to them
+        self._event_handling_needed = fmi3Boolean()
+        self._terminate_simulation = fmi3Boolean()
+        self._early_return = fmi3Boolean()
+        self._last_successful_time = fmi3Float64()
+        self._step_refs = (
+            byref(self._event_handling_needed),
+            byref(self._terminate_simulation),
+            byref(self._early_return),
+            byref(self._last_successful_time),
+        )
+
+    def _bind(self, fname: str, argtypes: List[Any], restype=fmi3Status) -> None:
+        """Bind an exported FMI function with fixed argument and return types."""
+        f = getattr(self.dll, fname)
+        f.argtypes = argtypes
+        f.restype = restype
+        setattr(self, fname, f)
+
+    @staticmethod
+    def _check(fname: str, status: int) -> int:
+        if status > fmi3Warning:
+            raise FMICallException(function=fname, status=status)
+        return status
+
+    # Creation, initialization and destruction
+
+    def instantiate(
+        self,
+        visible=False,
+        loggingOn=False,
+        eventModeUsed=False,
+        earlyReturnAllowed=False,
+        logMessage=None,
+        intermediateUpdate=None,
+    ) -> None:
+        # Keep the callbacks alive as long as the instance
+        self.logMessage = fmi3LogMessageCallback(
+            printLogMessage if logMessage is None else logMessage
+        )
+        if intermediateUpdate is None:
+            self.intermediateUpdate = fmi3IntermediateUpdateCallback()
+        else:
+            self.intermediateUpdate = fmi3IntermediateUpdateCallback(intermediateUpdate)
+
+        resource_path = os.path.join(self.unzipDirectory, "resources") + os.path.sep
+
+        self.component = self.fmi3InstantiateCoSimulation(
+            self.instanceName.encode("utf-8"),
+            self.guid.encode("utf-8"),
+            resource_path.encode("utf-8"),
+            visible,
+            loggingOn,
+            eventModeUsed,
+            earlyReturnAllowed,
+            None,
+            0,
+            None,
+            self.logMessage,
+            self.intermediateUpdate,
+        )
+        if not self.component:
+            raise Exception("Failed to instantiate FMU")
+
+    def enterInitializationMode(self, tolerance=None, startTime=0.0, stopTime=None):
+        self._check(
+            "fmi3EnterInitializationMode",
+            self.fmi3EnterInitializationMode(
+                self.component,
+                tolerance is not None,
+                0.0 if tolerance is None else tolerance,
+                startTime,
+                stopTime is not None,
+                0.0 if stopTime is None else stopTime,
+            ),
+        )
+
+    def exitInitializationMode(self):
+        return self._check(
+            "fmi3ExitInitializationMode",
+            self.fmi3ExitInitializationMode(self.component),
+        )
+
+    def terminate(self):
+        return self._check("fmi3Terminate", self.fmi3Terminate(self.component))
+
+    def reset(self):
+        return self._check("fmi3Reset", self.fmi3Reset(self.component))
+
+    def freeInstance(self):
+        self.fmi3FreeInstance(self.component)
+        self.component = None
+        freeLibrary(self.dll._handle)
+
+    # Simulating the FMU
+
+    def doStep(
+        self,
+        currentCommunicationPoint: float,
+        communicationStepSize: float,
+        noSetFMUStatePriorToCurrentPoint: bool = True,
+    ) -> Tuple[bool, bool, bool, float]:
+        status = self.fmi3DoStep(
+            self.component,
+            currentCommunicationPoint,
+            communicationStepSize,
+            noSetFMUStatePriorToCurrentPoint,
+            *self._step_refs,
+        )
+        if status > fmi3Warning:
+            raise FMICallException(function="fmi3DoStep", status=status)
+        return (
+            self._event_handling_needed.value,
+            self._terminate_simulation.value,
+            self._early_return.value,
+            self._last_successful_time.value,
+        )
+
+    # Event handling
+
+    def enterEventMode(self):
+        return self._check(
+            "fmi3EnterEventMode", self.fmi3EnterEventMode(self.component)
+        )
+
+    def enterStepMode(self):
+        return self._check("fmi3EnterStepMode", self.fmi3EnterStepMode(self.component))
+
+    def updateDiscreteStates(self) -> Tuple[bool, bool, bool, bool, bool, float]:
+        flags = [fmi3Boolean() for _ in range(5)]
+        next_event_time = fmi3Float64()
+        self._check(
+            "fmi3UpdateDiscreteStates",
+            self.fmi3UpdateDiscreteStates(
+                self.component, *[byref(f) for f in flags], byref(next_event_time)
+            ),
+        )
+        return (*[f.value for f in flags], next_event_time.value)
+
+    # Getting and setting single values (outside the hot loop)
+
+    def _set(self, var_type: str, vr: Sequence[int], values: Sequence[Any]) -> None:
+        n = len(vr)
+        self._check(
+            f"fmi3Set{var_type}",
+            getattr(self, f"fmi3Set{var_type}")(
+                self.component,
+                (fmi3ValueReference * n)(*vr),
+                n,
+                (FMI3_CTYPES[var_type] * len(values))(*values),
+                len(values),
+            ),
+        )
+
+    def _get(self, var_type: str, vr: Sequence[int]) -> List[Any]:
+        n = len(vr)
+        values = (FMI3_CTYPES[var_type] * n)()
+        self._check(
+            f"fmi3Get{var_type}",
+            getattr(self, f"fmi3Get{var_type}")(
+                self.component, (fmi3ValueReference * n)(*vr), n, values, n
+            ),
+        )
+        return list(values)
+
+    def __getattr__(self, name: str):
+        # setBoolean(...), getUInt8(...), ... like fmpy's typed accessors
+        if name[:3] in ("set", "get") and name[3:] in FMI3_CTYPES:
+            accessor = self._set if name[:3] == "set" else self._get
+            var_type = name[3:]
+            return lambda *args: accessor(var_type, *args)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
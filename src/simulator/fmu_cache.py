@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Iterator, Optional, Tuple
+from fmpy import extract, read_model_description
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Cache location if neither an argument nor SYSTEMC_FMI_CACHE is given
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "systemc-fmi")
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _tree_size(path: str) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            size += os.path.getsize(os.path.join(root, name))
+    return size
+
+
+class FMUCache:
+    """
+    On-disk cache of extracted FMUs and parsed model descriptions.
+
+    Entries are keyed by the SHA-256 of the FMU file, so a rebuilt FMU gets a
+    new entry while copies of the same file share one. Each entry holds the
+    extracted tree and the pickled ModelDescription; an FMU seen before is set
+    up with a hash check, without unzipping or parsing XML.
+
+    Entries are created under an exclusive file lock and moved into place
+    atomically, so concurrent processes can share the cache. When the total
+    size exceeds ``max_bytes`` the least recently used entries are evicted,
+    except those pinned by a running instance: acquire() holds a shared lock
+    on the entry until release(), and eviction skips every entry it cannot
+    lock exclusively.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 2 << 30):
+        """
+        Args:
+            directory: Cache folder, defaults to $SYSTEMC_FMI_CACHE or
+                ~/.cache/systemc-fmi
+            max_bytes: Size above which least recently used entries are evicted
+        """
+        self.directory = os.path.abspath(
+            directory or os.environ.get("SYSTEMC_FMI_CACHE", DEFAULT_CACHE_DIR)
+        )
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock_path = os.path.join(self.directory, ".lock")
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the cache-wide lock, shared with other processes."""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, fmu_path: str) -> Tuple[Any, str]:
+        """
+        Return the model description and extracted folder of an FMU.
+
+        The entry is not pinned, so it may be evicted once another process
+        needs the space; use acquire() to load the extracted binary.
+
+        Args:
+            fmu_path: Path to the FMU file
+
+        Returns:
+            Tuple of the parsed ModelDescription and the path of the extracted
+            FMU tree
+        """
+        model_description, unzipdir, pin = self.acquire(fmu_path)
+        self.release(pin)
+        return model_description, unzipdir
+
+    def acquire(self, fmu_path: str) -> Tuple[Any, str, Optional[IO]]:
+        """
+        Return the model description and extracted folder of an FMU, pinned.
+
+        Args:
+            fmu_path: Path to the FMU file
+
+        Returns:
+            Tuple of the parsed ModelDescription, the path of the extracted FMU
+            tree and the pin keeping the entry from being evicted, to be passed
+            to release() once the instance is freed
+        """
+        key = hash_file(fmu_path)
+        entry = self.entry_path(key)
+        description_path = os.path.join(entry, "model_description.pkl")
+        unzipdir = os.path.join(entry, "fmu")
+
+        with self.lock():
+            if os.path.isfile(description_path):
+                # Mark as recently used
+                os.utime(entry)
+                with open(description_path, "rb") as f:
+                    return pickle.load(f), unzipdir, self._pin(key)
+
+            logger.info("Caching %s in %s", fmu_path, entry)
+            staging = tempfile.mkdtemp(prefix=f".{key}.", dir=self.directory)
+            try:
+                model_description = read_model_description(fmu_path)
+                extract(fmu_path, unzipdir=os.path.join(staging, "fmu"))
+                with open(os.path.join(staging, "model_description.pkl"), "wb") as f:
+                    pickle.dump(model_description, f)
+                with open(os.path.join(staging, "size"), "w") as f:
+                    f.write(str(_tree_size(staging)))
+                # A half-written entry is never visible to other processes
+                shutil.rmtree(entry, ignore_errors=True)
+                os.rename(staging, entry)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            pin = self._pin(key)
+            self._evict(keep=key)
+        return model_description, unzipdir, pin
+
+    def _pin(self, key: str) -> Optional[IO]:
+        """Take a shared lock on an entry (cache lock held)."""
+        if fcntl is None:
+            return None
+        pin = open(os.path.join(self.entry_path(key), "pin"), "a")
+        fcntl.flock(pin, fcntl.LOCK_SH)
+        return pin
+
+    @staticmethod
+    def release(pin: Optional[IO]) -> None:
+        """Unpin an entry returned by acquire()."""
+        if pin is not None:
+            pin.close()
+
+    def _remove(self, key: str) -> bool:
+        """Remove an entry unless it is pinned (cache lock held)."""
+        entry = self.entry_path(key)
+        if fcntl is None:
+            shutil.rmtree(entry, ignore_errors=True)
+            return True
+        with open(os.path.join(entry, "pin"), "a") as pin:
+            try:
+                fcntl.flock(pin, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+            shutil.rmtree(entry, ignore_errors=True)
+        return True
+
+    def entries(self) -> Iterator[Tuple[str, float, int]]:
+        """Yield ``(key, last_used, size_in_bytes)`` for every complete entry."""
+        for key in os.listdir(self.directory):
+            entry = self.entry_path(key)
+            size_path = os.path.join(entry, "size")
+            if key.startswith(".") or not os.path.isfile(size_path):
+                continue
+            with open(size_path) as f:
+                size = int(f.read() or 0)
+            yield key, os.path.getmtime(entry), size
+
+    def _evict(self, keep: str) -> None:
+        """Evict least recently used entries until the cache fits (lock held)."""
+        entries = sorted(self.entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            if not self._remove(key):
+                logger.info("Not evicting %s from the FMU cache: in use", key)
+                continue
+            logger.info("Evicted %s from the FMU cache", key)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every entry not in use."""
+        with self.lock():
+            for key, _, _ in list(self.entries()):
+                self._remove(key)
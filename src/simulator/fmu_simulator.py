@@ -1,8 +1,83 @@
 from fmpy import read_model_description, extract
 from fmpy.fmi3 import FMU3Slave
 import os
-import argparse
-from typing import Dict, Any, Callable, List, Optional
+import shutil
+import logging
+import pickle
+import time as timer
+from multiprocessing import Pipe
+from multiprocessing.connection import wait
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from simulator.input_schedule import InputSchedule, InputTimeline
+from simulator.batched_io import BatchedIO, FMI3_CASTS, parse_start
+from simulator.ctypes_backend import CTypesFMU3Slave
+from simulator.fmu_cache import FMUCache
+from simulator.recorders import Recorder, StringRecorder
+from simulator.remote import RemoteFMU3Slave
+from simulator.interrupts import Predicate, compile_condition
+from simulator.isr_dispatch import HandlerRegistry, InterruptDispatcher, InterruptEvent
+from simulator.profiling import (
+    PHASE_GET,
+    PHASE_INTERRUPTS,
+    PHASE_RECORD,
+    PHASE_SCHEDULE,
+    PHASE_SET,
+    PHASE_STEP,
+    StepProfiler,
+)
+from simulator.signal_generators import (
+    TIME_PARAMETERS,
+    SignalGenerator,
+    create_generator,
+)
+from simulator.time_base import TimeBase
+
+logger = logging.getLogger(__name__)
+
+# Verbosity of the simulation loop, from quietest to most verbose
+LOG_LEVELS = ("silent", "summary", "full")
+
+# How the master chooses the next communication point
+STEPPING_MODES = ("fixed", "event")
+
+# FMU backends selectable per run
+BACKENDS = {
+    "fmpy": FMU3Slave,
+    "ctypes": CTypesFMU3Slave,
+    "remote": RemoteFMU3Slave,
+}
+
+
+def _generator_spec(signal: str, schedule: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the generator description of a stimuli entry, None for a schedule."""
+    if "generator" in schedule:
+        return schedule
+    if "clk" in signal.lower() and "period" in schedule:
+        # Legacy clock syntax: low for the first half period, then high
+        period = schedule["period"]
+        return {"generator": "clock", "period": period, "phase": period / 2}
+    return None
+
+
+def stimuli_times(stimuli: Dict[str, Any]) -> List[float]:
+    """
+    Return every time a stimuli set places on the master time base.
+
+    Args:
+        stimuli: Input name to schedule or generator description, as taken by
+            FMUSimulator.set_stimuli
+
+    Returns:
+        Schedule change points and generator durations, in seconds
+    """
+    times = []
+    for signal, schedule in stimuli.items():
+        spec = _generator_spec(signal, schedule)
+        if spec is None:
+            times.extend(schedule)
+        else:
+            times.extend(value for key, value in spec.items() if key in TIME_PARAMETERS)
+    return times
 
 
 class FMUSimulator:
@@ -12,29 +87,119 @@ class FMUSimulator:
         stop_time: float = 10.0,
         step_size: float = 0.1,
         log_enabled: bool = True,
+        backend: str = "fmpy",
+        log_level: str = "full",
+        log_every: int = 1000,
+        stepping: str = "fixed",
+        output_interval: Optional[float] = None,
+        resolution: Union[str, float] = "SC_PS",
+        dispatcher: Optional[InterruptDispatcher] = None,
+        cache: Union[bool, FMUCache] = False,
+        remote: Optional[str] = None,
+        profile: bool = False,
     ):
+        """
+        Args:
+            fmu_path: Path to the FMU file, relative to the working directory
+            stop_time: Simulation stop time
+            step_size: Communication step size
+            log_enabled: If False, the simulator logs nothing (same as "silent")
+            backend: FMU backend, one of BACKENDS
+            log_level: Simulation loop verbosity, one of LOG_LEVELS: "silent"
+                logs nothing, "summary" logs progress every ``log_every`` steps,
+                "full" logs every input and output at every step
+            log_every: Number of steps between two progress lines in "summary"
+            stepping: "fixed" calls doStep every ``step_size``; "event" steps
+                straight to the next input change, output grid point or
+                FMU-reported event time with a variable step size
+            output_interval: If set, rows are only recorded on this fixed grid
+                instead of at every communication point
+            resolution: Tick of the integer master time base, a SystemC unit
+                such as "SC_NS" (see the config's DefaultExperiment) or seconds
+            dispatcher: Delivers triggered interrupts to their handlers;
+                defaults to running them synchronously in the stepping loop
+            cache: FMUCache holding extracted FMUs and parsed model
+                descriptions, True for the default cache ($SYSTEMC_FMI_CACHE or
+                ~/.cache/systemc-fmi), or False (default) to extract into a
+                temporary folder removed by close()
+            remote: ``"token@host:port"`` of the worker daemon hosting the FMU
+                with the "remote" backend, or ``"host:port"`` with the token in
+                $SYSTEMC_FMI_TOKEN (see simulator.remote)
+            profile: Time every phase of each step into the histograms of
+                ``profiler`` (a StepProfiler, reset by each run)
+        """
+        if log_level not in LOG_LEVELS:
+            raise ValueError(
+                f"Unknown log level {log_level}, expected one of {list(LOG_LEVELS)}"
+            )
+        if stepping not in STEPPING_MODES:
+            raise ValueError(
+                f"Unknown stepping {stepping}, expected one of {list(STEPPING_MODES)}"
+            )
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend}, expected one of {list(BACKENDS)}"
+            )
+        if backend == "remote" and not remote:
+            raise ValueError("The remote backend needs the address of a worker")
         self.fmu_path = fmu_path
         self.start_time = 0.0
         self.stop_time = stop_time
         self.step_size = step_size
         self.log_enabled = log_enabled
+        self.log_level = log_level if log_enabled else "silent"
+        self.log_every = max(1, log_every)
+        self.backend = backend
+        self.remote = remote
+        self.profiler = StepProfiler() if profile else None
+        self.stepping = stepping
+        self.output_interval = output_interval
+        self.event_mode_used = False
+        self.early_return_allowed = False
+        # Next event time reported by the FMU, in seconds, if it defines one
+        self.next_event_time: Optional[float] = None
+        self.time_base = TimeBase(resolution)
+        if self.time_base.to_ticks(step_size) < 1:
+            raise ValueError(
+                f"Step size {step_size} is below the time resolution {resolution}"
+            )
         self.fmu_filepath = os.path.join(os.getcwd(), fmu_path)
+        self.cache = FMUCache() if cache is True else cache or None
+        self.unzipdir: Optional[str] = None  # Extracted FMU, set by setup_model()
+        self.cache_pin = None  # Keeps the cache entry in use until close()
         self.rows = []
         self.vrs = {}
         self.variable_info = {}
-        self.input_schedules = {}  # Dictionary to store input schedules
+        # Compiled input schedules and procedural generators, by input name
+        self.input_schedules: Dict[str, Union[InputSchedule, SignalGenerator]] = {}
+        self.applied_inputs: Dict[str, Any] = {}  # Last value written to each input
+        self.current_time = self.start_time  # Time the FMU instance has reached
         self.interrupt_handlers = {}  # Dictionary to store interrupt handlers
+        self.handler_registry = HandlerRegistry()  # Handlers resolvable by name
+        self.dispatcher = (
+            dispatcher if dispatcher is not None else InterruptDispatcher()
+        )
         self.interrupt_conditions = {}  # Dictionary to store interrupt conditions
+        self.interrupt_predicates: Dict[str, Predicate] = {}  # Compiled conditions
+        # Inputs watched by interrupts, after the outputs in the watched vector
+        self.watched_inputs: List[str] = []
 
     def log(self, message: str) -> None:
         if self.log_enabled:
-            print(message)
+            logger.info(message)
 
     def setup_model(self) -> bool:
         if not os.path.exists(self.fmu_filepath):
             raise FileNotFoundError(f"FMU file not found: {self.fmu_filepath}")
 
-        self.model_description = read_model_description(self.fmu_filepath)
+        if self.cache is not None:
+            # Extracted tree and parsed description are reused across runs
+            self.model_description, self.unzipdir, self.cache_pin = self.cache.acquire(
+                self.fmu_filepath
+            )
+        else:
+            self.model_description = read_model_description(self.fmu_filepath)
+            self.unzipdir = extract(self.fmu_filepath)
 
         # Collect variable information
         for variable in self.model_description.modelVariables:
@@ -43,122 +208,138 @@ class FMUSimulator:
                 "type": variable.type,
                 "causality": variable.causality,
                 "variability": variable.variability,
-                "start": getattr(variable, "start", None),
+                "start": parse_start(variable.type, getattr(variable, "start", None)),
                 "initial": getattr(variable, "initial", None),
             }
 
-        # Extract the FMU
-        self.unzipdir = extract(self.fmu_filepath)
+        # Group inputs and outputs by type into preallocated buffers
+        self.io = BatchedIO(
+            variable_info=self.variable_info,
+            vrs=self.vrs,
+            inputs=[
+                name
+                for name, info in self.variable_info.items()
+                if info["causality"] == "input"
+            ],
+            outputs=[
+                name
+                for name, info in self.variable_info.items()
+                if info["causality"] == "output"
+            ],
+        )
         return True
 
     def initialize_fmu(self) -> bool:
         try:
-            self.fmu = FMU3Slave(
+            backend_kwargs = {}
+            if self.backend == "remote":
+                backend_kwargs = {"address": self.remote, "fmu_path": self.fmu_filepath}
+            self.fmu = BACKENDS[self.backend](
                 guid=self.model_description.guid,
                 unzipDirectory=self.unzipdir,
                 modelIdentifier=self.model_description.coSimulation.modelIdentifier,
                 instanceName="instance",
+                **backend_kwargs,
             )
-            self.fmu.instantiate()
-            self.fmu.enterInitializationMode()
-
-            # Set initial values from model description
-            for var_name, info in self.variable_info.items():
-                if info["initial"] == "exact" and info["start"] is not None:
-                    if info["type"] == "Boolean":
-                        self.fmu.setBoolean([self.vrs[var_name]], [bool(info["start"])])
-                    elif info["type"] == "UInt8":
-                        self.fmu.setUInt8([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "UInt16":
-                        self.fmu.setUInt16([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "UInt32":
-                        self.fmu.setUInt32([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "UInt64":
-                        self.fmu.setUInt64([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "Int8":
-                        self.fmu.setInt8([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "Int16":
-                        self.fmu.setInt16([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "Int32":
-                        self.fmu.setInt32([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "Int64":
-                        self.fmu.setInt64([self.vrs[var_name]], [int(info["start"])])
-                    elif info["type"] == "Float32":
-                        self.fmu.setFloat32(
-                            [self.vrs[var_name]], [float(info["start"])]
-                        )
-                    elif info["type"] == "Float64":
-                        self.fmu.setFloat64(
-                            [self.vrs[var_name]], [float(info["start"])]
-                        )
-                    elif info["type"] == "Boolean":
-                        self.fmu.setBoolean([self.vrs[var_name]], [bool(info["start"])])
-                    else:
-                        raise ValueError(f"Unsupported variable type: {info['type']}")
-
-            self.fmu.exitInitializationMode()
+            co_simulation = self.model_description.coSimulation
+            if self.stepping == "event":
+                if not co_simulation.canHandleVariableCommunicationStepSize:
+                    raise ValueError(
+                        "Event-driven stepping needs an FMU that can handle a "
+                        "variable communication step size"
+                    )
+                # Let the FMU report events (and next event times) if it can,
+                # and stop a step early at an event: the variable step loop
+                # resumes from the time it returns
+                self.event_mode_used = co_simulation.hasEventMode
+                self.early_return_allowed = True
+            self.fmu.instantiate(
+                eventModeUsed=self.event_mode_used,
+                earlyReturnAllowed=self.early_return_allowed,
+            )
+            self._initialize_instance()
             return True
         except Exception as e:
             raise Exception(f"Error initializing FMU: {e}")
 
+    def _initialize_instance(self) -> None:
+        """Run initialization mode on an instantiated (or reset) FMU."""
+        self.fmu.enterInitializationMode()
+
+        # Set initial values from model description
+        for var_name, info in self.variable_info.items():
+            if info["initial"] == "exact" and info["start"] is not None:
+                self.set_variable(var_name, info["start"])
+
+        self.fmu.exitInitializationMode()
+        self.next_event_time = None
+        if self.event_mode_used:
+            # With event mode the FMU leaves initialization in event mode:
+            # settle the discrete states before the first step
+            _, terminate_simulation = self._update_discrete_states()
+            if terminate_simulation:
+                raise RuntimeError("The FMU requested termination at initialization")
+        self.io.bind(self.fmu)
+        self.applied_inputs = {}
+        for predicate in self.interrupt_predicates.values():
+            predicate.reset()
+        self.current_time = self.start_time
+
+    def reset(self) -> None:
+        """
+        Bring the FMU back to its initial state with fmi3Reset.
+
+        The instance (and the elaborated SystemC design) is kept, so the next
+        run starts without instantiating the FMU again. Input schedules and
+        interrupts stay registered. The generated fmi3Reset fails unless the
+        top SystemC module defines ``fmi_reset()`` to clear its own state.
+        """
+        try:
+            self.fmu.reset()
+            self._initialize_instance()
+        except Exception as e:
+            raise Exception(f"Error resetting FMU: {e}")
+
+    def close(self) -> None:
+        """Terminate and free the FMU instance."""
+        self.fmu.terminate()
+        self.fmu.freeInstance()
+        self.release_files()
+
+    def release_files(self) -> None:
+        """
+        Delete the extracted FMU, or unpin its cache entry.
+
+        close() calls it; call it directly for a simulator that was loaded
+        with setup_model() but never instantiated.
+        """
+        if self.cache is None:
+            if self.unzipdir is not None:
+                shutil.rmtree(self.unzipdir, ignore_errors=True)
+        else:
+            self.cache.release(self.cache_pin)
+            self.cache_pin = None
+        self.unzipdir = None
+
     def set_variable(self, name: str, value: Any) -> None:
         try:
             var_type = self.variable_info[name]["type"]
-            if var_type == "Boolean":
-                self.fmu.setBoolean([self.vrs[name]], [bool(value)])
-            elif var_type == "UInt8":
-                self.fmu.setUInt8([self.vrs[name]], [int(value)])
-            elif var_type == "UInt16":
-                self.fmu.setUInt16([self.vrs[name]], [int(value)])
-            elif var_type == "UInt32":
-                self.fmu.setUInt32([self.vrs[name]], [int(value)])
-            elif var_type == "UInt64":
-                self.fmu.setUInt64([self.vrs[name]], [int(value)])
-            elif var_type == "Int8":
-                self.fmu.setInt8([self.vrs[name]], [int(value)])
-            elif var_type == "Int16":
-                self.fmu.setInt16([self.vrs[name]], [int(value)])
-            elif var_type == "Int32":
-                self.fmu.setInt32([self.vrs[name]], [int(value)])
-            elif var_type == "Int64":
-                self.fmu.setInt64([self.vrs[name]], [int(value)])
-            elif var_type == "Float32":
-                self.fmu.setFloat32([self.vrs[name]], [float(value)])
-            elif var_type == "Float64":
-                self.fmu.setFloat64([self.vrs[name]], [float(value)])
-            else:
+            if var_type not in FMI3_CASTS:
                 raise ValueError(f"Unsupported variable type: {var_type}")
+            value = FMI3_CASTS[var_type](value)
+            getattr(self.fmu, f"set{var_type}")([self.vrs[name]], [value])
+            # Keep the batched input buffers in sync with the FMU
+            if name in self.io.input_index:
+                self.io.write(self.io.input_index[name], value)
         except Exception as e:
             raise Exception(f"Error setting variable {name}: {e}")
 
     def get_variable(self, name: str) -> Any:
         try:
             var_type = self.variable_info[name]["type"]
-            if var_type == "Boolean":
-                return self.fmu.getBoolean([self.vrs[name]])[0]
-            elif var_type == "UInt8":
-                return self.fmu.getUInt8([self.vrs[name]])[0]
-            elif var_type == "UInt16":
-                return self.fmu.getUInt16([self.vrs[name]])[0]
-            elif var_type == "UInt32":
-                return self.fmu.getUInt32([self.vrs[name]])[0]
-            elif var_type == "UInt64":
-                return self.fmu.getUInt64([self.vrs[name]])[0]
-            elif var_type == "Int8":
-                return self.fmu.getInt8([self.vrs[name]])[0]
-            elif var_type == "Int16":
-                return self.fmu.getInt16([self.vrs[name]])[0]
-            elif var_type == "Int32":
-                return self.fmu.getInt32([self.vrs[name]])[0]
-            elif var_type == "Int64":
-                return self.fmu.getInt64([self.vrs[name]])[0]
-            elif var_type == "Float32":
-                return self.fmu.getFloat32([self.vrs[name]])[0]
-            elif var_type == "Float64":
-                return self.fmu.getFloat64([self.vrs[name]])[0]
-            else:
+            if var_type not in FMI3_CASTS:
                 raise ValueError(f"Unsupported variable type: {var_type}")
-            # Add other types as needed
+            return getattr(self.fmu, f"get{var_type}")([self.vrs[name]])[0]
         except Exception as e:
             raise Exception(f"Error getting variable {name}: {e}")
 
@@ -167,146 +348,584 @@ class FMUSimulator:
     ) -> None:
         """
         Set a schedule of values for an input variable.
+
+        The schedule is converted to integer ticks and compiled once into
+        sorted time/value arrays, so the simulation loop can look up the
+        current value with a moving cursor.
+
         Args:
             variable_name: Name of the input variable
-            schedule: Dictionary mapping time points to values
+            schedule: Dictionary mapping time points (in seconds) to values
         """
         if variable_name not in self.variable_info:
             raise ValueError(f"Variable {variable_name} not found in model")
         if self.variable_info[variable_name]["causality"] != "input":
             raise ValueError(f"Variable {variable_name} is not an input variable")
 
-        if 0.0 not in schedule:
-            schedule[0.0] = self.variable_info[variable_name]["start"]
-        self.input_schedules[variable_name] = schedule
+        to_ticks = self.time_base.to_ticks
+        tick_schedule = {}
+        times = {}
+        for t, value in sorted(schedule.items()):
+            ticks = to_ticks(t)
+            if ticks in tick_schedule:
+                raise ValueError(
+                    f"Schedule of {variable_name}: times {times[ticks]} and {t} "
+                    f"fall on the same {self.time_base.resolution} tick"
+                )
+            tick_schedule[ticks] = value
+            times[ticks] = t
+        if 0 not in tick_schedule:
+            tick_schedule[0] = self.variable_info[variable_name]["start"]
+        self.input_schedules[variable_name] = InputSchedule(tick_schedule)
+
+    def set_input_generator(self, variable_name: str, spec: Dict[str, Any]) -> None:
+        """
+        Drive an input variable with a procedural signal generator.
+
+        The generator is evaluated lazily, so unlike a schedule its memory use
+        does not grow with the simulation length.
+
+        Args:
+            variable_name: Name of the input variable
+            spec: Generator description, e.g. ``{"generator": "clock",
+                "period": 1e-9, "duty": 0.5}`` (durations in seconds)
+        """
+        if variable_name not in self.variable_info:
+            raise ValueError(f"Variable {variable_name} not found in model")
+        if self.variable_info[variable_name]["causality"] != "input":
+            raise ValueError(f"Variable {variable_name} is not an input variable")
+
+        self.input_schedules[variable_name] = create_generator(
+            spec, self.time_base.to_ticks
+        )
 
     def register_interrupt(
-        self, name: str, condition: Dict[str, Any], handler: Optional[str] = None
+        self,
+        name: str,
+        condition: Dict[str, Any],
+        handler: Optional[Union[str, Callable]] = None,
     ) -> None:
         """
         Register an interrupt condition and its handler.
 
+        The condition is compiled once into a predicate over the output vector
+        (see ``simulator.interrupts.compile_condition``), so the model must
+        be set up first. Conditions on inputs see the value last written to
+        the FMU, appended to the output vector.
+
         Args:
-            name: Name of the interrupt
+            name: Name of the interrupt, also the watched output by default
             condition: Dictionary containing condition details (variable name and expected value)
-            handler: Name of the handler function (ISR) to call when interrupt is triggered
+            handler: Handler function (ISR) to call when interrupt is triggered,
+                or its name in ``self.handler_registry`` or dotted import path
         """
         self.interrupt_conditions[name] = condition
+        self.interrupt_predicates[name] = compile_condition(
+            condition, name, self._watched_index
+        )
+        if isinstance(handler, str):
+            handler = self.handler_registry.resolve(handler)
         if handler:
             self.interrupt_handlers[name] = handler
 
-    def check_interrupts(self) -> List[str]:
+    def _watched_index(self, name: str) -> int:
+        if name in self.io.output_index:
+            return self.io.output_index[name]
+        if name not in self.io.input_index:
+            raise ValueError(
+                f"Interrupts can only watch input and output variables, "
+                f"{name} is neither"
+            )
+        if name not in self.watched_inputs:
+            self.watched_inputs.append(name)
+        return len(self.io.outputs) + self.watched_inputs.index(name)
+
+    def _watched_values(self, outputs: List[Any], values: List[Any]) -> List[Any]:
+        """Fill ``values`` with ``outputs`` then the watched input buffers."""
+        n_outputs = len(outputs)
+        values[:n_outputs] = outputs
+        input_slots = self.io.input_slots
+        input_index = self.io.input_index
+        for i, name in enumerate(self.watched_inputs):
+            group, slot = input_slots[input_index[name]]
+            values[n_outputs + i] = group.values[slot]
+        return values
+
+    def check_interrupts(self, values: Optional[List[Any]] = None) -> List[str]:
         """
         Check if any registered interrupts are triggered.
 
+        Args:
+            values: Output values of the current step, in the order of
+                ``self.io.outputs``; read from the FMU if not given
+
         Returns:
             List[str]: List of triggered interrupt names
         """
-        triggered: List[str] = []
-
-        # Initialize previous values dict if it doesn't exist
-        if not hasattr(self, "prev_values"):
-            self.prev_values: Dict[str, Any] = {}
-
-        for int_name, condition in self.interrupt_conditions.items():
-            var_name: str = int_name  # By default, interrupt name is the variable name
-            expected_value: Any = condition.get("value")
-            # If the variable exists in the model
-            if var_name in self.variable_info:
-                current_value: Any = self.get_variable(name=var_name)
-
-                # Initialize previous value if not already present
-                if var_name not in self.prev_values:
-                    self.prev_values[var_name] = current_value
-
-                # Handle edge detection
-                if expected_value == "posedge":
-                    # Positive edge detection (transition from 0 to 1)
-                    if self.prev_values[var_name] == 0 and current_value == 1:
-                        triggered.append(int_name)
-                elif expected_value == "negedge":
-                    # Negative edge detection (transition from 1 to 0)
-                    if self.prev_values[var_name] == 1 and current_value == 0:
-                        triggered.append(int_name)
-                # Handle regular value comparison
-                elif current_value == expected_value:
-                    triggered.append(int_name)
-
-                # Update previous value for next comparison
-                self.prev_values[var_name] = current_value
-
-        return triggered
-
-    def run_simulation(self):
-        time = self.start_time
-        csv_data = [
-            "Time,"
-            + ",".join(self.input_schedules.keys())
-            + ","
-            + ",".join(
-                [
-                    var_name
-                    for var_name, info in self.variable_info.items()
-                    if info["causality"] == "output"
-                ]
+        if values is None:
+            values = [None] * len(self.io.outputs)
+            self.io.read(values)
+        if self.watched_inputs:
+            values = self._watched_values(
+                values, [None] * (len(values) + len(self.watched_inputs))
             )
+        return [
+            name
+            for name, predicate in self.interrupt_predicates.items()
+            if predicate.check(values)
         ]
 
-        # Print header
-        print("\n=== Starting Simulation ===")
-        print("Time step size:", self.step_size)
-        print("Stop time:", self.stop_time)
-        print("=============================\n")
-
-        while time < self.stop_time:
-            current_time = time
-            row_values = [f"{current_time}"]
-
-            # Print time step header
-            print(f"\n=== Time: {current_time} ===")
-
-            # Set and display inputs based on schedules
-            print("Inputs:")
-            for var_name, schedule in self.input_schedules.items():
-                applicable_times = [t for t in schedule.keys() if t <= current_time]
-                value = None
-                if applicable_times:
-                    latest_time = max(applicable_times)
-                    value = schedule[latest_time]
-                    self.set_variable(var_name, value)
-                    print(f"  {var_name}: {value}")
-                row_values.append(str(value) if value is not None else "")
-
-            # Get and display outputs
-            print("Outputs:")
-            for var_name, info in self.variable_info.items():
-                if info["causality"] == "output":
-                    value = self.get_variable(var_name)
-                    print(f"  {var_name}: {value}")
-                    row_values.append(str(value))
-
-            # Add row to CSV data
-            csv_data.append(",".join(row_values))
-
-            time += self.step_size
-
-            # Check for interrupts after the step
-            triggered_interrupts = self.check_interrupts()
-            if triggered_interrupts:
-                for interrupt in triggered_interrupts:
-                    handler = self.interrupt_handlers.get(interrupt)
-                    if handler:
-                        handler()
-
-            # Perform simulation step
-            self.fmu.doStep(
-                currentCommunicationPoint=current_time,
-                communicationStepSize=self.step_size,
+    def handle_event(self) -> Tuple[Optional[float], bool]:
+        """
+        Run event mode after doStep signalled that event handling is needed.
+
+        Returns:
+            Tuple of the next event time reported by the FMU (None if it does
+            not define one) and whether the FMU requested termination
+        """
+        self.fmu.enterEventMode()
+        return self._update_discrete_states()
+
+    def _update_discrete_states(self) -> Tuple[Optional[float], bool]:
+        """
+        Iterate updateDiscreteStates in event mode, then enter step mode.
+
+        Also keeps the next event time in ``next_event_time``.
+
+        Returns:
+            See handle_event()
+        """
+        while True:
+            (
+                discrete_states_need_update,
+                terminate_simulation,
+                _,
+                _,
+                next_event_time_defined,
+                next_event_time,
+            ) = self.fmu.updateDiscreteStates()
+            if terminate_simulation or not discrete_states_need_update:
+                break
+        self.fmu.enterStepMode()
+        self.next_event_time = next_event_time if next_event_time_defined else None
+        return self.next_event_time, terminate_simulation
+
+    def set_stimuli(self, stimuli: Dict[str, Any]) -> None:
+        """
+        Set the input schedules and generators of a stimuli set.
+
+        Args:
+            stimuli: Input name to ``{time: value}`` schedule or generator
+                description, as in the stimuli file (without INTERRUPT)
+        """
+        for signal, schedule in stimuli.items():
+            spec = _generator_spec(signal, schedule)
+            if spec is None:
+                self.set_input_schedule(signal, schedule)
+            else:
+                self.set_input_generator(signal, spec)
+
+    def run_simulation(self, recorder: Optional[Recorder] = None):
+        """
+        Run the simulation from start to stop time, then free the FMU.
+
+        Args:
+            recorder: Sink receiving one row per step. Defaults to a
+                StringRecorder, which returns the whole CSV as a string.
+
+        Returns:
+            The value returned by ``recorder.close()``
+        """
+        result = self.run(recorder)
+        self.close()
+        return result
+
+    def run_vectors(
+        self,
+        vectors: Iterable[Dict[str, Any]],
+        recorder_factory: Optional[Callable[[], Recorder]] = None,
+    ) -> Iterator[Any]:
+        """
+        Run several stimuli sets back to back on one FMU instance.
+
+        The FMU is reset with fmi3Reset between two sets instead of being
+        freed and instantiated again, which skips the SystemC elaboration.
+        The FMU is freed once all the sets have run.
+
+        Args:
+            vectors: Stimuli sets, see set_stimuli()
+            recorder_factory: Creates the recorder of each run, defaults to a
+                StringRecorder
+
+        Yields:
+            The result of each run, in order
+        """
+        try:
+            for i, stimuli in enumerate(vectors):
+                if i > 0:
+                    self.reset()
+                self.input_schedules = {}
+                self.set_stimuli(stimuli)
+                yield self.run(recorder_factory() if recorder_factory else None)
+        finally:
+            self.close()
+
+    def _hold_inputs(self, stimuli: Dict[str, Any], time: float) -> Dict[str, Any]:
+        """Make the schedules of a stimuli set start from the inputs applied."""
+        held = dict(stimuli)
+        for signal, schedule in stimuli.items():
+            if (
+                signal in self.applied_inputs
+                and "generator" not in schedule
+                and "period" not in schedule
+                and all(t > time for t in schedule)
+            ):
+                held[signal] = {time: self.applied_inputs[signal], **schedule}
+        return held
+
+    def fork(
+        self,
+        suffixes: Iterable[Dict[str, Any]],
+        recorder_factory: Optional[Callable[[], Recorder]] = None,
+        max_children: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Continue the simulation with several stimuli suffixes in forked children.
+
+        Run the common prefix first with ``run(stop_time=...)``, then call
+        fork(): each suffix runs in an ``os.fork()`` child that starts from a
+        copy-on-write image of the warmed-up FMU and SystemC kernel, resumes
+        at ``current_time`` until the stop time and sends its result back over
+        a pipe. The parent instance is left untouched at the fork point, so
+        fork() can be called again with other suffixes.
+
+        A suffix replaces the schedules of the signals it names, which keep
+        their value from the fork point until their first change; the other
+        signals keep their prefix schedules. Interrupt predicates carry their
+        state over the fork point, so an edge across it fires in the child. This needs ``os.fork`` (Linux),
+        and a SystemC built without pthread-based processes.
+
+        Args:
+            suffixes: Stimuli sets applied from the fork point, see set_stimuli()
+            recorder_factory: Creates the recorder of each child, defaults to a
+                StringRecorder; its result must be picklable
+            max_children: Number of children running at once, defaults to the
+                number of CPUs
+
+        Returns:
+            The result of each suffix, in order
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("fork() needs a platform with os.fork")
+        if self.backend == "remote":
+            raise RuntimeError("fork() needs an FMU instance in this process")
+        suffixes = list(suffixes)
+        max_children = max_children or os.cpu_count() or 1
+        start_time = self.current_time
+        results: List[Any] = [None] * len(suffixes)
+        errors: Dict[int, BaseException] = {}
+        running: Dict[Any, Tuple[int, int]] = {}  # reader: (suffix, pid)
+        pending = iter(enumerate(suffixes))
+
+        while True:
+            while len(running) < max_children:
+                item = next(pending, None)
+                if item is None:
+                    break
+                i, suffix = item
+                reader, writer = Pipe(duplex=False)
+                pid = os.fork()
+                if pid == 0:
+                    # Child: never return into the caller's stack
+                    status = 0
+                    try:
+                        reader.close()
+                        self.set_stimuli(self._hold_inputs(suffix, start_time))
+                        recorder = recorder_factory() if recorder_factory else None
+                        writer.send(("done", self.run(recorder, start_time)))
+                    except BaseException as e:
+                        status = 1
+                        try:
+                            pickle.dumps(e)
+                        except Exception:
+                            e = RuntimeError(f"{type(e).__name__}: {e}")
+                        writer.send(("error", e))
+                    finally:
+                        os._exit(status)
+                writer.close()
+                running[reader] = (i, pid)
+            if not running:
+                break
+
+            for reader in wait(list(running)):
+                i, pid = running.pop(reader)
+                try:
+                    kind, value = reader.recv()
+                except EOFError:
+                    kind, value = "error", RuntimeError("Child exited without result")
+                reader.close()
+                os.waitpid(pid, 0)
+                if kind == "done":
+                    results[i] = value
+                else:
+                    errors[i] = value
+
+        if errors:
+            i = min(errors)
+            raise RuntimeError(f"Fork child of suffix {i} failed: {errors[i]}") from (
+                errors[i]
             )
+        return results
 
-        print("\n=== Simulation Complete ===")
-        self.fmu.terminate()
-        self.fmu.freeInstance()
+    def run(
+        self,
+        recorder: Optional[Recorder] = None,
+        start_time: Optional[float] = None,
+        stop_time: Optional[float] = None,
+    ):
+        """
+        Run the simulation from start to stop time, keeping the FMU instance.
+
+        Use reset() to run again on the same instance, and close() to free it.
 
-        # Return CSV-like data as a string
-        return "\n".join(csv_data)
+        Args:
+            recorder: Sink receiving one row per step. Defaults to a
+                StringRecorder, which returns the whole CSV as a string.
+            start_time: Resume from this time instead of the start time; the
+                FMU must already be there (see ``current_time``), inputs keep
+                the values applied so far until their schedule changes, and
+                edge interrupts compare with the last sample of the previous
+                run
+            stop_time: Stop at this time instead of the configured stop time
+
+        Returns:
+            The value returned by ``recorder.close()``
+        """
+        # Master time is an integer number of ticks, converted to seconds only
+        # at the FMI boundary and in the recorded rows
+        to_ticks = self.time_base.to_ticks
+        to_seconds = self.time_base.to_seconds
+        resume = start_time is not None
+        origin_ticks = to_ticks(self.start_time)
+        start_ticks = to_ticks(start_time) if resume else origin_ticks
+        stop_ticks = to_ticks(self.stop_time if stop_time is None else stop_time)
+        step_ticks = to_ticks(self.step_size)
+        time = start_ticks
+        if recorder is None:
+            recorder = StringRecorder()
+        columns = ["Time", *self.input_schedules.keys(), *self.io.outputs]
+        recorder.open(
+            columns=columns,
+            types=["Float64"]
+            + [self.variable_info[name]["type"] for name in columns[1:]],
+        )
+
+        # Decide once what the loop logs; per-step text is only built if needed
+        log_active = self.log_level != "silent" and logger.isEnabledFor(logging.INFO)
+        log_steps = log_active and self.log_level == "full"
+        log_summary = log_active and self.log_level == "summary"
+        log_every = self.log_every
+        step = 0
+
+        if log_active:
+            logger.info(
+                "\n=== Starting Simulation ===\n"
+                "Time step size: %s\n"
+                "Stop time: %s\n"
+                "=============================\n",
+                self.step_size,
+                to_seconds(stop_ticks),
+            )
+        wall_start = timer.perf_counter()
+
+        # Merge all input schedules into a single change-point timeline
+        schedules = list(self.input_schedules.items())
+        for _, schedule in schedules:
+            schedule.reset()
+        timeline = InputTimeline(schedule for _, schedule in schedules)
+        if not resume:
+            self.applied_inputs = {}
+        input_values = [self.applied_inputs.get(name) for name, _ in schedules]
+        input_indices = [self.io.input_index[name] for name, _ in schedules]
+        output_values: List[Any] = [None] * len(self.io.outputs)
+
+        predicates = list(self.interrupt_predicates.items())
+        if not resume:
+            for _, predicate in predicates:
+                predicate.reset()
+        # Predicates on inputs check outputs and inputs copied into one vector
+        watched_values = (
+            [None] * (len(output_values) + len(self.watched_inputs))
+            if self.watched_inputs
+            else None
+        )
+        handlers = self.interrupt_handlers
+        dispatcher = self.dispatcher
+        dispatcher.reset_counters()
+
+        event_driven = self.stepping == "event"
+        output_ticks = (
+            None if self.output_interval is None else to_ticks(self.output_interval)
+        )
+        # The output grid stays anchored on the start time when resuming
+        output_count = 0
+        if output_ticks is not None:
+            output_count = -(-(start_ticks - origin_ticks) // output_ticks)
+        next_output_ticks = origin_ticks + output_count * (output_ticks or 0)
+        # First event time reported at initialization or by the last run
+        next_event_ticks = (
+            None
+            if self.next_event_time is None
+            else to_ticks(self.next_event_time, exact=False)
+        )
+
+        # Per-phase timing; with profiling off each lap is one skipped branch
+        profiler = self.profiler
+        profile = profiler is not None
+        if profile:
+            profiler.reset()
+            lap = profiler.lap
+            profiler.start()
+
+        dispatcher.start()
+        try:
+            while time < stop_ticks:
+                current_ticks = time
+                current_time = to_seconds(current_ticks)
+
+                # Set inputs only when a change point was passed, and only those
+                # whose value differs from the one already applied
+                if timeline.advance(current_ticks):
+                    for i, (var_name, schedule) in enumerate(schedules):
+                        value = schedule.value_at(current_ticks)
+                        if value is None:
+                            continue
+                        input_values[i] = value
+                        if var_name in self.applied_inputs and (
+                            self.applied_inputs[var_name] == value
+                        ):
+                            continue
+                        self.io.write(input_indices[i], value)
+                        self.applied_inputs[var_name] = value
+                    if profile:
+                        lap(PHASE_SCHEDULE)
+                    # One fmi3Set<Type> call per input type that changed
+                    self.io.flush()
+                    if profile:
+                        lap(PHASE_SET)
+                elif profile:
+                    lap(PHASE_SCHEDULE)
+
+                # Get outputs, one fmi3Get<Type> call per output type, only
+                # when a row, the step log or an interrupt check needs them
+                record = output_ticks is None or current_ticks >= next_output_ticks
+                if record or predicates or log_steps:
+                    self.io.read(output_values)
+                    if profile:
+                        lap(PHASE_GET)
+                if record:
+                    recorder.record(current_time, input_values, output_values)
+                    if output_ticks is not None:
+                        output_count += 1
+                        next_output_ticks = origin_ticks + output_count * output_ticks
+
+                if log_steps:
+                    lines = [f"\n=== Time: {current_time} ===", "Inputs:"]
+                    for (var_name, _), value in zip(schedules, input_values):
+                        if value is not None:
+                            lines.append(f"  {var_name}: {value}")
+                    lines.append("Outputs:")
+                    for var_name, value in zip(self.io.outputs, output_values):
+                        lines.append(f"  {var_name}: {value}")
+                    logger.info("\n".join(lines))
+                elif log_summary and step % log_every == 0:
+                    elapsed = timer.perf_counter() - wall_start
+                    logger.info(
+                        "step %d, time %s / %s, %.0f steps/s",
+                        step,
+                        current_time,
+                        to_seconds(stop_ticks),
+                        step / elapsed if elapsed > 0 else 0.0,
+                    )
+                step += 1
+
+                if event_driven:
+                    # Step straight to the next point where something happens
+                    next_ticks = stop_ticks
+                    change_ticks = timeline.next_change_time()
+                    if change_ticks is not None and change_ticks < next_ticks:
+                        next_ticks = change_ticks
+                    if output_ticks is not None and next_output_ticks < next_ticks:
+                        next_ticks = next_output_ticks
+                    if (
+                        next_event_ticks is not None
+                        and current_ticks < next_event_ticks < next_ticks
+                    ):
+                        next_ticks = next_event_ticks
+                    delta_ticks = next_ticks - current_ticks
+                else:
+                    delta_ticks = step_ticks
+                time += delta_ticks
+                if profile:
+                    lap(PHASE_RECORD)
+
+                # Check for interrupts on the outputs already read for this step
+                if predicates:
+                    values = output_values
+                    if watched_values is not None:
+                        values = self._watched_values(output_values, watched_values)
+                    for name, predicate in predicates:
+                        if predicate.check(values):
+                            handler = handlers.get(name)
+                            if handler:
+                                dispatcher.dispatch(
+                                    handler,
+                                    InterruptEvent(name, current_time, step - 1),
+                                )
+                    if profile:
+                        lap(PHASE_INTERRUPTS)
+
+                # Perform simulation step
+                (
+                    event_handling_needed,
+                    terminate_simulation,
+                    early_return,
+                    last_successful_time,
+                ) = self.fmu.doStep(
+                    currentCommunicationPoint=current_time,
+                    communicationStepSize=to_seconds(delta_ticks),
+                )
+                if event_driven:
+                    if early_return:
+                        time = to_ticks(last_successful_time, exact=False)
+                    if event_handling_needed and self.event_mode_used:
+                        next_event_time, terminate_simulation = self.handle_event()
+                        next_event_ticks = (
+                            None
+                            if next_event_time is None
+                            else to_ticks(next_event_time, exact=False)
+                        )
+                    if terminate_simulation:
+                        break
+                if profile:
+                    lap(PHASE_STEP)
+        finally:
+            self.current_time = to_seconds(time)
+            # Rows recorded so far are kept even if the run fails
+            result = recorder.close()
+            # Deliver the interrupts still queued before reporting
+            dispatcher.stop()
+
+        if log_active:
+            elapsed = timer.perf_counter() - wall_start
+            logger.info(
+                "\n=== Simulation Complete ===\n%d steps in %.3f s", step, elapsed
+            )
+            if profile:
+                logger.info("Time per phase [us]:\n%s", profiler.format_table())
+        if dispatcher.dropped:
+            logger.warning(
+                "%d interrupt events dropped, the handler queue was full",
+                dispatcher.dropped,
+            )
+        return result
@@ -0,0 +1,124 @@
+from bisect import bisect_right
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class InputSchedule:
+    """Piecewise-constant input signal compiled from a ``{time: value}`` schedule.
+
+    The schedule is sorted once into parallel ``times``/``values`` lists. Lookups
+    move a cursor forward as simulation time advances, so a monotonic run costs
+    amortized O(1) per step; any jump (forwards past several change points or
+    backwards) falls back to a bisection.
+    """
+
+    def __init__(self, schedule: Dict[float, Any]):
+        items = sorted(schedule.items())
+        self.times: List[float] = [t for t, _ in items]
+        self.values: List[Any] = [v for _, v in items]
+        self.cursor: int = -1
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def reset(self) -> None:
+        """Rewind the cursor to before the first change point."""
+        self.cursor = -1
+
+    def value_at(self, time: float) -> Optional[Any]:
+        """
+        Return the value applicable at ``time``.
+
+        Args:
+            time: Simulation time to look up
+
+        Returns:
+            The value of the latest change point not after ``time``, or None if
+            the schedule has not started yet
+        """
+        times = self.times
+        cursor = self.cursor
+        n = len(times)
+
+        if cursor < 0 or times[cursor] <= time:
+            nxt = cursor + 1
+            if nxt >= n or times[nxt] > time:
+                # Still inside the current segment
+                pass
+            elif nxt + 1 >= n or times[nxt + 1] > time:
+                # Moved into the next segment
+                cursor = nxt
+            else:
+                cursor = bisect_right(times, time) - 1
+        else:
+            # Time went backwards
+            cursor = bisect_right(times, time) - 1
+
+        self.cursor = cursor
+        return self.values[cursor] if cursor >= 0 else None
+
+    def next_change(self, time: Optional[float] = None) -> Optional[float]:
+        """
+        Return the first change point after ``time``.
+
+        Args:
+            time: Simulation time, or None for the first change point overall
+
+        Returns:
+            The change point, or None if the schedule does not change anymore
+        """
+        if time is None:
+            return self.times[0] if self.times else None
+        nxt = bisect_right(self.times, time)
+        return self.times[nxt] if nxt < len(self.times) else None
+
+
+class InputTimeline:
+    """Global change-point timeline merged from several input sources.
+
+    The simulation loop asks the timeline whether any input changes at the
+    current step; steps between change points can then skip the setter phase
+    entirely.
+
+    Sources are InputSchedule objects or procedural signal generators; both
+    answer ``next_change(time)``. Only the next change point of each source is
+    kept in a heap, so the timeline uses O(1) memory per source however long
+    the run is.
+    """
+
+    def __init__(self, schedules: Iterable[Any]):
+        self.sources: List[Any] = list(schedules)
+        self.reset()
+
+    def reset(self) -> None:
+        """Rewind the timeline to before the first change point."""
+        self.heap: List[Tuple[float, int]] = []
+        for i, source in enumerate(self.sources):
+            first = source.next_change(None)
+            if first is not None:
+                self.heap.append((first, i))
+        heapq.heapify(self.heap)
+
+    def advance(self, time: float) -> bool:
+        """
+        Move the timeline up to ``time``.
+
+        Args:
+            time: Current simulation time (must not decrease between calls)
+
+        Returns:
+            True if at least one change point was passed since the previous call
+        """
+        heap = self.heap
+        if not heap or heap[0][0] > time:
+            return False
+        while heap and heap[0][0] <= time:
+            _, i = heapq.heappop(heap)
+            nxt = self.sources[i].next_change(time)
+            if nxt is not None:
+                heapq.heappush(heap, (nxt, i))
+        return True
+
+    def next_change_time(self) -> Optional[float]:
+        """Return the next change point after the current position, if any."""
+        return self.heap[0][0] if self.heap else None
@@ -0,0 +1,282 @@
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Edge keywords accepted as interrupt "value"
+EDGES = ("posedge", "negedge", "anyedge")
+
+
+class Predicate:
+    """
+    Interrupt condition compiled against the output vector of a step.
+
+    Predicates hold the index of the output they watch, so checking them costs
+    a list lookup and a comparison: no FMI call and no string handling per
+    step. Stateful predicates (edges) remember the previous sample until
+    ``reset()``.
+
+    The same predicates evaluate a whole recorded trace at once with
+    ``evaluate()``, where each output is a NumPy column instead of a value.
+    """
+
+    def reset(self) -> None:
+        """Forget the previous samples, before a new run."""
+
+    def check(self, values: Sequence[Any]) -> bool:
+        """
+        Evaluate the predicate on the output values of the current step.
+
+        Args:
+            values: Output values, in the order of ``BatchedIO.outputs``
+
+        Returns:
+            True if the interrupt is triggered
+        """
+        raise NotImplementedError
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the predicate on every step of a recorded trace.
+
+        Args:
+            columns: One array per output, indexed like the values of check()
+
+        Returns:
+            Boolean array, True at the steps where the interrupt is triggered
+        """
+        raise NotImplementedError
+
+
+class LevelPredicate(Predicate):
+    """Triggered at every step where the output equals ``value``."""
+
+    def __init__(self, index: int, value: Any):
+        self.index = index
+        self.value = value
+
+    def check(self, values: Sequence[Any]) -> bool:
+        return values[self.index] == self.value
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        return np.asarray(columns[self.index] == self.value)
+
+
+class EdgePredicate(Predicate):
+    """
+    Triggered when the output goes from 0 to 1 (posedge), from 1 to 0
+    (negedge) or either (anyedge).
+
+    As in the original check, only these exact transitions are edges:
+    booleans compare equal to 0 and 1, but an integer going from 1 to 2 or
+    from 0 to 5 triggers nothing.
+    """
+
+    def __init__(self, index: int, edge: str = "posedge"):
+        if edge not in EDGES:
+            raise ValueError(f"Unknown edge {edge}, expected one of {list(EDGES)}")
+        self.index = index
+        self.edge = edge
+        self.rising = edge != "negedge"
+        self.falling = edge != "posedge"
+        self.previous: Any = None
+
+    def reset(self) -> None:
+        self.previous = None
+
+    def check(self, values: Sequence[Any]) -> bool:
+        current = values[self.index]
+        previous = self.previous
+        self.previous = current
+        if previous is None:
+            return False
+        if self.rising and previous == 0 and current == 1:
+            return True
+        return self.falling and previous == 1 and current == 0
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        column = np.asarray(columns[self.index])
+        low = column == 0
+        high = column == 1
+        triggered = np.zeros(len(column), dtype=bool)
+        if self.rising:
+            triggered[1:] |= high[1:] & low[:-1]
+        if self.falling:
+            triggered[1:] |= low[1:] & high[:-1]
+        return triggered
+
+
+class RangePredicate(Predicate):
+    """Triggered while ``low <= output <= high``; either bound may be omitted."""
+
+    def __init__(self, index: int, low: Any = None, high: Any = None):
+        if low is None and high is None:
+            raise ValueError("A range needs at least one of min and max")
+        self.index = index
+        self.low = low
+        self.high = high
+
+    def check(self, values: Sequence[Any]) -> bool:
+        value = values[self.index]
+        if self.low is not None and value < self.low:
+            return False
+        if self.high is not None and value > self.high:
+            return False
+        return True
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        column = columns[self.index]
+        triggered = np.ones(len(column), dtype=bool)
+        if self.low is not None:
+            triggered &= column >= self.low
+        if self.high is not None:
+            triggered &= column <= self.high
+        return triggered
+
+
+class MaskPredicate(Predicate):
+    """
+    Triggered while ``output & mask == value``.
+
+    ``value`` defaults to ``mask``, i.e. all the masked bits are set.
+    """
+
+    def __init__(self, index: int, mask: int, value: Optional[int] = None):
+        self.index = index
+        self.mask = int(mask)
+        self.value = self.mask if value is None else int(value)
+
+    def check(self, values: Sequence[Any]) -> bool:
+        return int(values[self.index]) & self.mask == self.value
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        return columns[self.index].astype(np.int64) & self.mask == self.value
+
+
+class AllPredicate(Predicate):
+    """Triggered when all the child predicates are."""
+
+    def __init__(self, predicates: List[Predicate]):
+        self.predicates = predicates
+
+    def reset(self) -> None:
+        for predicate in self.predicates:
+            predicate.reset()
+
+    def check(self, values: Sequence[Any]) -> bool:
+        # Evaluate every child, so edge predicates see every sample
+        triggered = True
+        for predicate in self.predicates:
+            if not predicate.check(values):
+                triggered = False
+        return triggered
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        return np.logical_and.reduce([p.evaluate(columns) for p in self.predicates])
+
+
+class AnyPredicate(AllPredicate):
+    """Triggered when at least one of the child predicates is."""
+
+    def check(self, values: Sequence[Any]) -> bool:
+        triggered = False
+        for predicate in self.predicates:
+            if predicate.check(values):
+                triggered = True
+        return triggered
+
+    def evaluate(self, columns: Sequence[np.ndarray]) -> np.ndarray:
+        return np.logical_or.reduce([p.evaluate(columns) for p in self.predicates])
+
+
+def compile_condition(
+    condition: Dict[str, Any], variable: str, index_of: Callable[[str], int]
+) -> Predicate:
+    """
+    Compile an interrupt condition from the stimuli file into a predicate.
+
+    Supported conditions (``variable`` overrides the watched variable, which
+    defaults to the interrupt name):
+
+    - ``value: posedge | negedge | anyedge``: output going from 0 to 1, 1 to 0
+      or either
+    - ``value: <v>``: output equal to ``v``
+    - ``min: <low>`` and/or ``max: <high>``: output inside the range
+    - ``mask: <m>`` with optional ``value: <v>``: ``output & m == v``
+    - ``all: [<condition>, ...]`` / ``any: [<condition>, ...]``: combinations
+
+    Args:
+        condition: Condition dictionary
+        variable: Output watched when the condition does not name one
+        index_of: Returns the index of a variable in the checked vector
+
+    Returns:
+        The compiled predicate
+    """
+    variable = condition.get("variable", variable)
+    if "all" in condition or "any" in condition:
+        kind = "all" if "all" in condition else "any"
+        predicates = [
+            compile_condition(child, variable, index_of) for child in condition[kind]
+        ]
+        if not predicates:
+            raise ValueError(f"Empty {kind} condition for {variable}")
+        return AllPredicate(predicates) if kind == "all" else AnyPredicate(predicates)
+
+    index = index_of(variable)
+    value = condition.get("value")
+    if "mask" in condition:
+        return MaskPredicate(index, condition["mask"], value)
+    if "min" in condition or "max" in condition:
+        return RangePredicate(index, condition.get("min"), condition.get("max"))
+    if value in EDGES:
+        return EdgePredicate(index, value)
+    if "value" not in condition:
+        raise ValueError(f"Interrupt condition on {variable} has no value")
+    return LevelPredicate(index, value)
+
+
+def evaluate_trace(
+    conditions: Dict[str, Dict[str, Any]],
+    trace: Any,
+    time_column: str = "Time",
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate interrupt conditions offline over a recorded trace.
+
+    Conditions use the same format as the ``INTERRUPT`` section of the stimuli
+    file and are evaluated with vectorized NumPy operations, so the
+    simulation loop does not need to check them at all. The result matches
+    the online check when the trace holds one row per communication step.
+
+    Args:
+        conditions: Interrupt name to condition dictionary
+        trace: Recorded columns by name, e.g. ``NumpyRecorder.arrays``, a
+            loaded ``.npz`` archive or a pandas DataFrame
+        time_column: Name of the time column (or index of a DataFrame)
+
+    Returns:
+        Interrupt name to the array of times at which it triggers
+    """
+    if hasattr(trace, "index") and time_column not in trace:
+        # DataFrame recorded by NumpyRecorder, indexed by time
+        time = np.asarray(trace.index)
+    else:
+        time = np.asarray(trace[time_column])
+    names: List[str] = []
+    columns: List[np.ndarray] = []
+
+    def index_of(name: str) -> int:
+        if name not in names:
+            if name not in trace:
+                raise ValueError(f"Variable {name} not found in the trace")
+            names.append(name)
+            columns.append(np.asarray(trace[name]))
+        return names.index(name)
+
+    predicates = {
+        name: compile_condition(condition, name, index_of)
+        for name, condition in conditions.items()
+    }
+    return {
+        name: time[predicate.evaluate(columns)]
+        for name, predicate in predicates.items()
+    }
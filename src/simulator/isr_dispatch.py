@@ -0,0 +1,204 @@
+import importlib
+import inspect
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How interrupt handlers are run
+DISPATCH_MODES = ("sync", "thread")
+
+
+@dataclass
+class InterruptEvent:
+    name: str  # Interrupt name
+    time: float  # Simulation time of the step that triggered it, in seconds
+    step: int  # Index of that step
+
+
+class HandlerRegistry:
+    """
+    Named interrupt handlers (ISRs).
+
+    Stimuli files refer to handlers by name: either a name registered here or
+    a dotted path such as ``my_package.isrs.on_overflow`` that is imported on
+    first use. This replaces evaluating the ``isr`` field as Python code.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable] = {}
+
+    def register(self, name: str, handler: Callable) -> Callable:
+        """Register ``handler`` under ``name`` and return it."""
+        if not callable(handler):
+            raise ValueError(f"Handler {name} is not callable")
+        self.handlers[name] = handler
+        return handler
+
+    def resolve(self, name: str) -> Callable:
+        """
+        Return the handler registered as ``name`` or importable from it.
+
+        Args:
+            name: Registered name or dotted ``module.attribute`` path
+
+        Returns:
+            The handler
+        """
+        if name in self.handlers:
+            return self.handlers[name]
+        module_name, _, attribute = name.rpartition(".")
+        if not module_name:
+            raise ValueError(f"Unknown interrupt handler {name}")
+        try:
+            handler = getattr(importlib.import_module(module_name), attribute)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Cannot import interrupt handler {name}: {e}")
+        return self.register(name, handler)
+
+
+def _takes_event(handler: Callable) -> bool:
+    """Whether ``handler`` accepts the event, or is a legacy no-argument ISR."""
+    try:
+        parameters = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(
+        p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.VAR_POSITIONAL)
+        for p in parameters
+    )
+
+
+class InterruptDispatcher:
+    """
+    Delivers triggered interrupts to their handlers.
+
+    In "sync" mode handlers run inline in the stepping loop, as before. In
+    "thread" mode events are put on a bounded queue served by a worker thread,
+    so a slow handler no longer stalls the simulation. When the queue is full,
+    blocking delivery waits for room (back-pressure on the simulation) while
+    non-blocking delivery drops the event and counts it.
+
+    Handlers receive the InterruptEvent if they accept an argument, and are
+    called without arguments otherwise.
+    """
+
+    def __init__(self, mode: str = "sync", maxsize: int = 1024, blocking: bool = True):
+        """
+        Args:
+            mode: One of DISPATCH_MODES
+            maxsize: Capacity of the event queue in "thread" mode
+            blocking: Wait for room in a full queue instead of dropping events
+        """
+        if mode not in DISPATCH_MODES:
+            raise ValueError(
+                f"Unknown dispatch mode {mode}, expected one of {list(DISPATCH_MODES)}"
+            )
+        if maxsize < 1:
+            raise ValueError(f"Queue size must be at least 1, got {maxsize}")
+        self.mode = mode
+        self.maxsize = maxsize
+        self.blocking = blocking
+        self.queue: Optional[queue.Queue] = None
+        self.worker: Optional[threading.Thread] = None
+        self._takes_event: Dict[Callable, bool] = {}
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.dispatched = 0  # Events accepted for delivery
+        self.handled = 0  # Handler calls that returned
+        self.failed = 0  # Handler calls that raised
+        self.dropped = 0  # Events dropped because the queue was full
+        self.max_depth = 0  # Highest queue depth seen
+
+    @property
+    def depth(self) -> int:
+        """Number of events waiting in the queue."""
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the dispatch counters."""
+        return {
+            "dispatched": self.dispatched,
+            "handled": self.handled,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+        }
+
+    def start(self) -> None:
+        """Start the worker thread (no-op in "sync" mode)."""
+        if self.mode == "thread" and self.worker is None:
+            self.queue = queue.Queue(maxsize=self.maxsize)
+            self.worker = threading.Thread(
+                target=self._serve, name="isr-dispatcher", daemon=True
+            )
+            self.worker.start()
+
+    def stop(self) -> None:
+        """Deliver the queued events and stop the worker thread."""
+        if self.worker is not None:
+            self.queue.put(None)
+            self.worker.join()
+            self.worker = None
+            self.queue = None
+
+    def dispatch(self, handler: Callable, event: InterruptEvent) -> bool:
+        """
+        Deliver ``event`` to ``handler``.
+
+        Returns:
+            False if the event was dropped because the queue was full
+        """
+        if self.queue is None:
+            self.dispatched += 1
+            self._call(handler, event)
+            return True
+        item = (handler, event)
+        if self.blocking:
+            self.queue.put(item)
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                return False
+        self.dispatched += 1
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _call(self, handler: Callable, event: InterruptEvent) -> None:
+        takes_event = self._takes_event.get(handler)
+        if takes_event is None:
+            takes_event = self._takes_event[handler] = _takes_event(handler)
+        try:
+            if takes_event:
+                handler(event)
+            else:
+                handler()
+            self.handled += 1
+        except Exception:
+            self.failed += 1
+            if self.queue is None:
+                raise
+            logger.exception("Interrupt handler for %s failed", event.name)
+
+    def _serve(self) -> None:
+        while True:
+            item: Optional[Tuple[Callable, InterruptEvent]] = self.queue.get()
+            if item is None:
+                break
+            self._call(*item)
+
+    def __enter__(self) -> "InterruptDispatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,327 @@
+import ctypes
+import logging
+import multiprocessing
+import pickle
+import platform
+import traceback
+from typing import Any, Dict, List, Optional
+
+from simulator.cosimulation import CoSimulation
+from simulator.fmu_simulator import FMUSimulator
+from simulator.shm_transport import (
+    OP_CLOSE,
+    OP_STEP,
+    STATUS_ERROR,
+    STATUS_OK,
+    ShmChannel,
+    shm_supported,
+)
+
+logger = logging.getLogger(__name__)
+
+# How step requests and outputs travel between the master and the workers
+TRANSPORTS = ("pipe", "shm")
+
+
+def _picklable(error: Exception) -> Exception:
+    try:
+        pickle.dumps(error)
+    except Exception:
+        error = RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+def _share(groups: List[Any], arrays: List[Any], copy: bool = False) -> None:
+    """Make type groups use shared arrays as their buffers."""
+    for group, array in zip(groups, arrays):
+        if copy:
+            ctypes.memmove(array, group.values, ctypes.sizeof(array))
+        group.values = array
+
+
+def _host_setup(conn, fmu_path: str, simulator_kwargs: Dict[str, Any]):
+    """Instantiate the FMU of a worker, or report why it failed."""
+    try:
+        simulator = FMUSimulator(
+            fmu_path=fmu_path, log_enabled=False, **simulator_kwargs
+        )
+        simulator.setup_model()
+        simulator.initialize_fmu()
+        return simulator
+    except Exception:
+        conn.send(("failed", traceback.format_exc()))
+        return None
+
+
+def _host_main(conn, fmu_path: str, simulator_kwargs: Dict[str, Any]) -> None:
+    """Worker process hosting one FMU: set inputs, step and return outputs."""
+    simulator = _host_setup(conn, fmu_path, simulator_kwargs)
+    if simulator is None:
+        return
+    io = simulator.io
+    io.fetch()
+    conn.send(("ready", [bytes(group.values) for group in io.output_groups]))
+
+    fmu = simulator.fmu
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "close":
+            break
+        _, time, step_size, inputs = message
+        try:
+            for group, data in zip(io.input_groups, inputs):
+                if data is not None:
+                    ctypes.memmove(group.values, data, len(data))
+                    group.dirty = True
+            io.flush()
+            fmu.doStep(currentCommunicationPoint=time, communicationStepSize=step_size)
+            io.fetch()
+        except Exception as e:
+            conn.send(("error", _picklable(e)))
+            return
+        conn.send(("outputs", [bytes(group.values) for group in io.output_groups]))
+
+    try:
+        simulator.close()
+    except Exception:
+        pass
+
+
+def _host_main_shm(
+    conn, fmu_path: str, simulator_kwargs: Dict[str, Any], spec: Dict[str, Any]
+) -> None:
+    """Worker process hosting one FMU, with its buffers in a ShmChannel."""
+    simulator = _host_setup(conn, fmu_path, simulator_kwargs)
+    if simulator is None:
+        return
+    channel = ShmChannel.attach(spec)
+    io = simulator.io
+    # fmi3Set/fmi3Get work straight on the shared buffers; the master has
+    # already written the start values of the inputs there
+    _share(io.input_groups, channel.inputs)
+    _share(io.output_groups, channel.outputs)
+    io.fetch()
+    conn.send(("ready", [bytes(group.values) for group in io.output_groups]))
+
+    fmu = simulator.fmu
+    alive = multiprocessing.parent_process().is_alive
+    try:
+        while True:
+            opcode, time, step_size, dirty = channel.receive_command(alive)
+            if opcode != OP_STEP:
+                break
+            try:
+                for i, group in enumerate(io.input_groups):
+                    if dirty >> i & 1:
+                        group.dirty = True
+                io.flush()
+                fmu.doStep(
+                    currentCommunicationPoint=time, communicationStepSize=step_size
+                )
+                io.fetch()
+            except Exception as e:
+                conn.send(("error", _picklable(e)))
+                channel.send_response(STATUS_ERROR, alive=alive)
+                return
+            channel.send_response(STATUS_OK, alive=alive)
+        try:
+            simulator.close()
+        except Exception:
+            pass
+    finally:
+        for group in io.input_groups + io.output_groups:
+            group.values = None
+        channel.close()
+
+
+class ParallelCoSimulation(CoSimulation):
+    """
+    Co-simulation master hosting every FMU in its own worker process.
+
+    SystemC FMUs share one global kernel per process, so each one runs in a
+    spawned worker, which also lets the FMUs step concurrently. The master
+    keeps a mirror of each FMU's type group buffers (the FMU is only loaded,
+    not instantiated, in the master) and applies the same Transfer plans to
+    it. With the "pipe" transport the input buffers travel with each step
+    request; with "shm" the input buffers live in a ShmChannel shared with
+    the worker and only a step command goes through its ring.
+
+    With "jacobi" ordering the steps of a communication point are all sent
+    before any result is awaited, and an FMU's outputs are only collected at
+    its next communication point (the barrier), so a macro step takes about
+    as long as the slowest FMU. "gauss-seidel" waits for each FMU in turn.
+    """
+
+    def __init__(self, *args: Any, transport: str = "pipe", **kwargs: Any):
+        """
+        Args:
+            transport: One of TRANSPORTS; "shm" falls back to "pipe" on
+                machines without x86 store ordering. See CoSimulation for the
+                other arguments
+        """
+        super().__init__(*args, **kwargs)
+        if transport not in TRANSPORTS:
+            raise ValueError(
+                f"Unknown transport {transport}, expected one of {list(TRANSPORTS)}"
+            )
+        if transport == "shm" and not shm_supported():
+            logger.warning(
+                "The shm transport needs x86 store ordering, using pipe on %s",
+                platform.machine(),
+            )
+            transport = "pipe"
+        self.transport = transport
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: List[Any] = []
+        self.connections_to_workers: List[Any] = []
+        self.channels: List[Optional[ShmChannel]] = []
+        self.waiting: List[bool] = []
+
+    def setup(self) -> None:
+        """Start one worker per FMU and wait until they are all instantiated."""
+        try:
+            super().setup()
+            for k, conn in enumerate(self.connections_to_workers):
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    raise RuntimeError(f"Worker of FMU {self.names[k]} died")
+                if message[0] != "ready":
+                    raise RuntimeError(
+                        f"FMU {self.names[k]} failed to start:\n{message[1]}"
+                    )
+                self._copy_outputs(k, message[1])
+                self.waiting[k] = False
+        except BaseException:
+            self.close()
+            raise
+
+    def _instantiate(self, index: int, settings: Dict[str, Any]) -> None:
+        settings = dict(settings)
+        fmu_path = self.simulators[index].fmu_filepath
+        settings.pop("path")
+        settings.update(stop_time=self.stop_time, resolution=self.resolution)
+        parent_conn, child_conn = self.context.Pipe()
+        if self.transport == "shm":
+            io = self.simulators[index].io
+            channel = ShmChannel.create(
+                [(group.var_type, group.size) for group in io.input_groups],
+                [(group.var_type, group.size) for group in io.output_groups],
+            )
+            # The mirror inputs become the shared buffers, start values included
+            _share(io.input_groups, channel.inputs, copy=True)
+            target = _host_main_shm
+            args = (child_conn, fmu_path, settings, channel.spec)
+        else:
+            channel = None
+            target = _host_main
+            args = (child_conn, fmu_path, settings)
+        process = self.context.Process(
+            target=target,
+            args=args,
+            name=f"fmu-host-{self.names[index]}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.processes.append(process)
+        self.connections_to_workers.append(parent_conn)
+        self.channels.append(channel)
+        self.waiting.append(True)
+
+    def _copy_outputs(self, k: int, outputs: List[Any]) -> None:
+        """Copy output buffers (bytes or shared arrays) into the mirror."""
+        for group, data in zip(self.simulators[k].io.output_groups, outputs):
+            ctypes.memmove(group.values, data, ctypes.sizeof(group.values))
+
+    def _receive(self, k: int) -> None:
+        """Wait for the outputs of an FMU and copy them into its mirror."""
+        self.waiting[k] = False
+        channel = self.channels[k]
+        if channel is not None:
+            status = channel.receive_response(alive=self.processes[k].is_alive)
+            if status == STATUS_OK:
+                self._copy_outputs(k, channel.outputs)
+                return
+        try:
+            message = self.connections_to_workers[k].recv()
+        except EOFError:
+            raise RuntimeError(f"Worker of FMU {self.names[k]} died")
+        if message[0] == "error":
+            raise message[1]
+        self._copy_outputs(k, message[1])
+
+    def _begin(self) -> None:
+        for k, waiting in enumerate(self.waiting):
+            if waiting:
+                self._receive(k)
+
+    def _exchange(self, active: List[int]) -> None:
+        if self.ordering == "jacobi":
+            for k in active:
+                if self.waiting[k]:
+                    self._receive(k)
+
+    def _step(self, k: int, time: float, step_size: float) -> None:
+        channel = self.channels[k]
+        if channel is not None:
+            # The inputs are already in place, only flag the groups written
+            dirty = 0
+            for i, group in enumerate(self.simulators[k].io.input_groups):
+                if group.dirty:
+                    dirty |= 1 << i
+                    group.dirty = False
+            channel.send_command(
+                OP_STEP, time, step_size, dirty, alive=self.processes[k].is_alive
+            )
+        else:
+            inputs: List[Optional[bytes]] = []
+            for group in self.simulators[k].io.input_groups:
+                inputs.append(bytes(group.values) if group.dirty else None)
+                group.dirty = False
+            self.connections_to_workers[k].send(("step", time, step_size, inputs))
+        self.waiting[k] = True
+        if self.ordering == "gauss-seidel":
+            self._receive(k)
+
+    def _finish(self) -> None:
+        # Leave every worker idle, so the FMUs are all at the stop time
+        for k, waiting in enumerate(self.waiting):
+            if waiting and self.processes[k].is_alive():
+                self._receive(k)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes, which free their FMU instances, and release
+        the files of the master's mirrors.
+        """
+        for process, conn, channel in zip(
+            self.processes, self.connections_to_workers, self.channels
+        ):
+            try:
+                if channel is not None:
+                    channel.send_command(OP_CLOSE, alive=process.is_alive)
+                else:
+                    conn.send(("close",))
+            except (OSError, ValueError, RuntimeError):
+                pass
+        for process, conn in zip(self.processes, self.connections_to_workers):
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            conn.close()
+        # The mirrors point into the channels, drop them before unlinking
+        while self.simulators:
+            self.simulators.pop().release_files()
+        self.transfers = []
+        for channel in self.channels:
+            if channel is not None:
+                channel.unlink()
+        self.processes = []
+        self.connections_to_workers = []
+        self.channels = []
+        self.waiting = []
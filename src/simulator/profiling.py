@@ -0,0 +1,158 @@
+import json
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional
+
+# Phases of one step of FMUSimulator.run, in loop order
+PHASES = ("schedule", "set", "get", "record", "interrupts", "step")
+(
+    PHASE_SCHEDULE,
+    PHASE_SET,
+    PHASE_GET,
+    PHASE_RECORD,
+    PHASE_INTERRUPTS,
+    PHASE_STEP,
+) = range(len(PHASES))
+
+
+class Histogram:
+    """
+    Log-linear histogram of durations in nanoseconds, HDR style.
+
+    Values below ``2**precision`` get one bucket each; above, every power of
+    two is split into ``2**(precision - 1)`` buckets, so a bucket is never
+    wider than ``2**(1 - precision)`` of its values (under 1.6 % with the
+    default). The bucket array is allocated once, so add() allocates nothing.
+    """
+
+    def __init__(self, precision: int = 7, max_value: int = 1 << 40):
+        """
+        Args:
+            precision: Bits of each value kept exactly
+            max_value: Largest value told apart; longer ones share the last
+                bucket (the exact maximum is still tracked)
+        """
+        self.precision = precision
+        self.half = 1 << (precision - 1)
+        self.counts: List[int] = [0] * (self._index(max_value) + 1)
+        self.last = len(self.counts) - 1
+        self.reset()
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.precision
+        if shift <= 0:
+            return value
+        return (shift << (self.precision - 1)) + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        """Largest value falling into bucket ``index``."""
+        if index < (1 << self.precision):
+            return index
+        shift = (index >> (self.precision - 1)) - 1
+        return ((index - (shift << (self.precision - 1)) + 1) << shift) - 1
+
+    def reset(self) -> None:
+        """Forget every value, keeping the bucket array."""
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value: int) -> None:
+        index = self._index(value)
+        self.counts[index if index < self.last else self.last] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> int:
+        """Value below which ``percent`` % of the values fall, within a bucket."""
+        if self.count == 0:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index == self.last:
+                    # Overflow bucket: its values are only bounded by the max
+                    return self.max
+                return min(self._highest(index), self.max)
+        return self.max
+
+
+class StepProfiler:
+    """
+    Time spent in each phase of the simulation loop, one Histogram per phase.
+
+    The loop calls lap() at the end of each phase: the time since the
+    previous lap goes to that phase, so consecutive phases cover the step
+    without gaps. A phase that did not run in a step (no input change, no
+    interrupt registered) records nothing for it.
+    """
+
+    def __init__(self, precision: int = 7):
+        """
+        Args:
+            precision: See Histogram
+        """
+        self.histograms = [Histogram(precision) for _ in PHASES]
+        self.mark = 0
+
+    def reset(self) -> None:
+        for histogram in self.histograms:
+            histogram.reset()
+
+    def start(self) -> None:
+        """Start timing the first phase."""
+        self.mark = perf_counter_ns()
+
+    def lap(self, phase: int) -> None:
+        """Close ``phase`` (one of the PHASE_* indices) and start the next."""
+        now = perf_counter_ns()
+        self.histograms[phase].add(now - self.mark)
+        self.mark = now
+
+    def report(self) -> Dict[str, Any]:
+        """Count, total, mean, p50, p99 and max of every phase, in ns."""
+        total = sum(histogram.total for histogram in self.histograms)
+        phases = {}
+        for name, histogram in zip(PHASES, self.histograms):
+            count = histogram.count
+            phases[name] = {
+                "count": count,
+                "total_ns": histogram.total,
+                "share": histogram.total / total if total else 0.0,
+                "mean_ns": histogram.total / count if count else 0.0,
+                "p50_ns": histogram.percentile(50),
+                "p99_ns": histogram.percentile(99),
+                "max_ns": histogram.max,
+            }
+        return {"total_ns": total, "phases": phases}
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Return the report as JSON, also written to ``path`` if given."""
+        text = json.dumps(self.report(), indent=2)
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        return text
+
+    def format_table(self) -> str:
+        """Return the report as a fixed-width text table, times in us."""
+        report = self.report()
+        lines = [
+            f"{'phase':<11}{'count':>10}{'total ms':>11}{'share':>8}"
+            f"{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}"
+        ]
+        for name, phase in report["phases"].items():
+            lines.append(
+                f"{name:<11}{phase['count']:>10}"
+                f"{phase['total_ns'] / 1e6:>11.2f}{phase['share']:>8.1%}"
+                f"{phase['mean_ns'] / 1e3:>10.2f}{phase['p50_ns'] / 1e3:>10.2f}"
+                f"{phase['p99_ns'] / 1e3:>10.2f}{phase['max_ns'] / 1e3:>10.2f}"
+            )
+        lines.append(f"{'total':<11}{'':>10}{report['total_ns'] / 1e6:>11.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,407 @@
+import gzip
+import io
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, TextIO
+from simulator.batched_io import FMI3_NUMPY_DTYPES
+
+
+class Recorder:
+    """
+    Sink receiving one row per simulation step from FMUSimulator.run_simulation.
+
+    The simulator calls open() once with the column names and FMI types, then
+    record() at every step and finally close(), whose return value becomes the
+    return value of run_simulation().
+    """
+
+    def open(self, columns: List[str], types: List[str]) -> None:
+        """
+        Prepare the sink for a new run.
+
+        Args:
+            columns: Column names, starting with "Time"
+            types: FMI type of each column ("Float64" for the time column)
+        """
+        self.columns = columns
+        self.types = types
+
+    def record(self, time: float, inputs: List[Any], outputs: List[Any]) -> None:
+        """
+        Record the row of one step.
+
+        The ``inputs`` and ``outputs`` lists are reused by the simulator, so a
+        recorder must copy the values it wants to keep.
+        """
+        raise NotImplementedError
+
+    def close(self) -> Any:
+        """Flush pending rows and return the result of the run."""
+        return None
+
+
+class TeeRecorder(Recorder):
+    """
+    Forwards every row to several recorders.
+
+    close() closes all of them and returns the result of the first one.
+    """
+
+    def __init__(self, *recorders: Recorder):
+        if not recorders:
+            raise ValueError("At least one recorder is required")
+        self.recorders = recorders
+
+    def open(self, columns: List[str], types: List[str]) -> None:
+        super().open(columns, types)
+        for recorder in self.recorders:
+            recorder.open(columns, types)
+
+    def record(self, time: float, inputs: List[Any], outputs: List[Any]) -> None:
+        for recorder in self.recorders:
+            recorder.record(time, inputs, outputs)
+
+    def close(self) -> Any:
+        return [recorder.close() for recorder in self.recorders][0]
+
+
+class CSVRecorder(Recorder):
+    """
+    Streams rows to a CSV file in buffered chunks while the run progresses.
+
+    Memory use is bounded by the chunk size, and rows already flushed survive a
+    crash of the simulation. Paths ending in ".gz" are gzip-compressed unless
+    ``compress`` says otherwise.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        compress: Optional[bool] = None,
+        chunk_rows: int = 1000,
+        stream: Optional[TextIO] = None,
+    ):
+        """
+        Args:
+            path: Output file path
+            compress: Gzip the output; defaults to True for ".gz" paths
+            chunk_rows: Number of rows buffered before they are written out
+            stream: Already open text stream to write to instead of ``path``
+        """
+        if path is None and stream is None:
+            raise ValueError("Either a path or a stream is required")
+        self.path = path
+        self.compress = (
+            compress if compress is not None else bool(path and path.endswith(".gz"))
+        )
+        self.chunk_rows = max(1, chunk_rows)
+        self.stream = stream
+        self._owns_stream = stream is None
+        self._chunk: List[str] = []
+
+    def open(self, columns: List[str], types: List[str]) -> None:
+        super().open(columns, types)
+        if self._owns_stream:
+            if self.compress:
+                self.stream = gzip.open(self.path, "wt", newline="")
+            else:
+                self.stream = open(self.path, "w", newline="")
+        self._chunk = [",".join(columns) + "\n"]
+
+    def record(self, time: float, inputs: List[Any], outputs: List[Any]) -> None:
+        row = [f"{time}"]
+        for value in inputs:
+            row.append(str(value) if value is not None else "")
+        for value in outputs:
+            row.append(str(value))
+        self._chunk.append(",".join(row) + "\n")
+        if len(self._chunk) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows out."""
+        if self._chunk:
+            self.stream.write("".join(self._chunk))
+            self._chunk = []
+        self.stream.flush()
+
+    def close(self) -> Optional[str]:
+        self.flush()
+        if self._owns_stream:
+            self.stream.close()
+        return self.path
+
+
+class StringRecorder(CSVRecorder):
+    """Adapter keeping the original API: the run returns the CSV as a string."""
+
+    def __init__(self, chunk_rows: int = 1000):
+        super().__init__(stream=io.StringIO(), chunk_rows=chunk_rows)
+
+    def open(self, columns: List[str], types: List[str]) -> None:
+        self.stream = io.StringIO()
+        super().open(columns, types)
+
+    def close(self) -> str:
+        self.flush()
+        # The original string output had no trailing newline
+        return self.stream.getvalue().rstrip("\n")
+
+
+class NumpyRecorder(Recorder):
+    """
+    Records every column into a preallocated, typed NumPy array.
+
+    Column dtypes follow the FMI type of each variable and the arrays grow
+    geometrically, so no per-step string is ever built. At the end of the run
+    the columns are returned as a pandas DataFrame indexed by time, or as a
+    dict of arrays, and can be saved as ``.npz`` or one ``.npy`` per column.
+
+    Inputs without a value yet are recorded as NaN for floating point columns
+    and 0 otherwise.
+    """
+
+    def __init__(
+        self,
+        initial_rows: int = 1024,
+        growth: float = 2.0,
+        output: str = "dataframe",
+        path: Optional[str] = None,
+    ):
+        """
+        Args:
+            initial_rows: Initial capacity of each column
+            growth: Capacity multiplier applied when a column is full
+            output: What close() returns: "dataframe" or "arrays"
+            path: Optionally save the columns on close, as a single ``.npz``
+                archive if it ends with ".npz", else as ``.npy`` files in the
+                ``path`` directory
+        """
+        if output not in ("dataframe", "arrays"):
+            raise ValueError(f"Unknown output {output}, expected dataframe or arrays")
+        if growth <= 1.0:
+            raise ValueError("growth must be greater than 1")
+        self.initial_rows = max(1, initial_rows)
+        self.growth = growth
+        self.output = output
+        self.path = path
+        self.size = 0
+
+    def open(self, columns: List[str], types: List[str]) -> None:
+        super().open(columns, types)
+        self.size = 0
+        self.capacity = self.initial_rows
+        self.dtypes = [np.dtype(FMI3_NUMPY_DTYPES.get(t, object)) for t in types]
+        self._arrays = [np.empty(self.capacity, dtype=d) for d in self.dtypes]
+        self._fill = [np.nan if d.kind == "f" else 0 for d in self.dtypes]
+
+    def _grow(self) -> None:
+        self.capacity = int(self.capacity * self.growth) + 1
+        for i, array in enumerate(self._arrays):
+            grown = np.empty(self.capacity, dtype=array.dtype)
+            grown[: self.size] = array[: self.size]
+            self._arrays[i] = grown
+
+    def record(self, time: float, inputs: List[Any], outputs: List[Any]) -> None:
+        if self.size == self.capacity:
+            self._grow()
+        row = self.size
+        arrays = self._arrays
+        arrays[0][row] = time
+        column = 1
+        for value in inputs:
+            arrays[column][row] = value if value is not None else self._fill[column]
+            column += 1
+        for value in outputs:
+            arrays[column][row] = value
+            column += 1
+        self.size = row + 1
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Recorded columns, trimmed to the number of rows (views, no copy)."""
+        return {
+            name: array[: self.size] for name, array in zip(self.columns, self._arrays)
+        }
+
+    def to_dataframe(self):
+        """Return the recorded columns as a pandas DataFrame indexed by time."""
+        # pandas is only needed here, keep it out of the simulator import path
+        import pandas as pd
+
+        arrays = self.arrays
+        time = arrays.pop(self.columns[0])
+        return pd.DataFrame(arrays, index=pd.Index(time, name=self.columns[0]))
+
+    def save_npz(self, path: str) -> str:
+        """Save all columns in a single ``.npz`` archive."""
+        np.savez(path, **self.arrays)
+        return path
+
+    def save_npy(self, directory: str) -> str:
+        """Save each column as ``<directory>/<column>.npy``."""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self.arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        return directory
+
+    def close(self):
+        if self.path:
+            if self.path.endswith(".npz"):
+                self.save_npz(self.path)
+            else:
+                self.save_npy(self.path)
+        if self.output == "arrays":
+            return self.arrays
+        return self.to_dataframe()
+
+
+class SharedColumns:
+    """
+    Typed result columns of several runs in one shared memory block.
+
+    Each column is a ``(runs, capacity)`` array and ``rows[run]`` holds the
+    number of rows written by a run, so worker processes can write their
+    results in place and the parent reads them without any pickling. Create
+    the block with ``SharedColumns.create`` in the parent, hand ``spec`` to the
+    workers and attach to it there with ``SharedColumns.attach``.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        columns: List[str],
+        types: List[str],
+        runs: int,
+        capacity: int,
+    ):
+        self.shm = shm
+        self.columns = columns
+        self.types = types
+        self.runs = runs
+        self.capacity = capacity
+        self.dtypes = [np.dtype(FMI3_NUMPY_DTYPES.get(t, np.float64)) for t in types]
+
+        offset = 0
+        self.rows = np.ndarray((runs,), dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.rows.nbytes
+        self.arrays: Dict[str, np.ndarray] = {}
+        for name, dtype in zip(columns, self.dtypes):
+            offset = -(-offset // 8) * 8  # Keep every column 8-byte aligned
+            array = np.ndarray(
+                (runs, capacity), dtype=dtype, buffer=shm.buf, offset=offset
+            )
+            self.arrays[name] = array
+            offset += array.nbytes
+
+    @staticmethod
+    def size(types: List[str], runs: int, capacity: int) -> int:
+        """Number of bytes needed for the given columns."""
+        size = runs * 8
+        for t in types:
+            size = -(-size // 8) * 8
+            size += (
+                runs
+                * capacity
+                * np.dtype(FMI3_NUMPY_DTYPES.get(t, np.float64)).itemsize
+            )
+        return size
+
+    @classmethod
+    def create(
+        cls, columns: List[str], types: List[str], runs: int, capacity: int
+    ) -> "SharedColumns":
+        """Allocate a new shared block, owned (and unlinked) by the caller."""
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(1, cls.size(types, runs, capacity))
+        )
+        shared = cls(shm, columns, types, runs, capacity)
+        shared.rows[:] = 0
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "SharedColumns":
+        """Attach to a block created elsewhere, from its ``spec``."""
+        shm = shared_memory.SharedMemory(name=spec["name"])
+        return cls(shm, spec["columns"], spec["types"], spec["runs"], spec["capacity"])
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """Picklable description used to attach to the block."""
+        return {
+            "name": self.shm.name,
+            "columns": self.columns,
+            "types": self.types,
+            "runs": self.runs,
+            "capacity": self.capacity,
+        }
+
+    def run_arrays(self, run: int) -> Dict[str, np.ndarray]:
+        """Columns of one run, trimmed to its rows (views, no copy)."""
+        rows = int(self.rows[run])
+        return {name: array[run, :rows] for name, array in self.arrays.items()}
+
+    def close(self) -> None:
+        """Release the arrays and detach from the block."""
+        self.arrays = {}
+        self.rows = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the block; call once, in the process that created it."""
+        self.close()
+        self.shm.unlink()
+
+
+class SharedMemoryRecorder(Recorder):
+    """
+    Writes the rows of one run into a slot of SharedColumns.
+
+    Simulator columns are matched to the shared columns by name; shared
+    columns the run does not produce are filled with NaN for floating point
+    columns and 0 otherwise. close() publishes the row count and returns it.
+    """
+
+    def __init__(self, shared: SharedColumns, run: int):
+        """
+        Args:
+            shared: Shared columns, attached in this process
+            run: Index of the run, i.e. the slot written to
+        """
+        self.shared = shared
+        self.run = run
+        self.size = 0
+
+    def open(self, columns: List[str], types: List[str]) -> None:
+        super().open(columns, types)
+        missing = [name for name in columns if name not in self.shared.arrays]
+        if missing:
+            raise ValueError(f"Columns {missing} are not in the shared block")
+        self.size = 0
+        self._targets = [self.shared.arrays[name][self.run] for name in columns]
+        for name, array in self.shared.arrays.items():
+            if name not in columns:
+                array[self.run] = np.nan if array.dtype.kind == "f" else 0
+        self._fill = [np.nan if t.dtype.kind == "f" else 0 for t in self._targets]
+
+    def record(self, time: float, inputs: List[Any], outputs: List[Any]) -> None:
+        row = self.size
+        if row == self.shared.capacity:
+            raise ValueError(
+                f"Run {self.run} exceeds the {self.shared.capacity} rows allocated"
+            )
+        targets = self._targets
+        targets[0][row] = time
+        column = 1
+        for value in inputs:
+            targets[column][row] = value if value is not None else self._fill[column]
+            column += 1
+        for value in outputs:
+            targets[column][row] = value
+            column += 1
+        self.size = row + 1
+
+    def close(self) -> int:
+        self.shared.rows[self.run] = self.size
+        return self.size
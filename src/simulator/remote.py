@@ -0,0 +1,787 @@
+"""
+Remote FMU workers: a compact binary TCP protocol, the worker daemon and the
+"remote" FMUSimulator backend.
+
+Start a worker on each simulation host (it serves every connection from a
+forked process, so each FMU gets its own SystemC kernel):
+
+    SYSTEMC_FMI_TOKEN=<secret> python -m simulator.remote --port 50931
+
+then select it per simulator, or per FMU of a CoSimulation, with the same
+token in $SYSTEMC_FMI_TOKEN or in the address:
+
+    FMUSimulator(fmu_path, backend="remote", remote="<secret>@simhost:50931")
+
+The worker loads and runs the native code of every FMU a master uploads, so
+whoever can talk to it can run anything on its host with its rights. Each
+connection must first present the shared-secret token, and the worker only
+listens on 127.0.0.1 unless given another ``--host``; only expose it on a
+trusted network.
+"""
+
+import argparse
+import ctypes
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import secrets
+import socket
+import socketserver
+import struct
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fmpy.fmi1 import FMICallException
+from fmpy.fmi3 import fmi3OK, fmi3Warning
+
+from simulator.batched_io import FMI3_CTYPES
+from simulator.ctypes_backend import CTypesFMU3Slave
+from simulator.fmu_cache import FMUCache, hash_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 50931
+
+# Shared-secret token of workers and masters not given one explicitly
+TOKEN_ENV = "SYSTEMC_FMI_TOKEN"
+
+# Longest first frame a worker reads before the master is authenticated
+_MAX_AUTH_FRAME = 1024
+
+# Request opcodes
+OP_LOAD = 1
+OP_UPLOAD = 2
+OP_INSTANTIATE = 3
+OP_ENTER_INITIALIZATION = 4
+OP_EXIT_INITIALIZATION = 5
+OP_SET = 6
+OP_GET = 7
+OP_STEP = 8
+OP_ENTER_EVENT_MODE = 9
+OP_ENTER_STEP_MODE = 10
+OP_UPDATE_DISCRETE_STATES = 11
+OP_TERMINATE = 12
+OP_RESET = 13
+OP_FREE = 14
+OP_AUTH = 15
+
+# Reply status besides the fmi3Status codes: the request raised, the payload
+# holds the message; and OP_LOAD's answer for an FMU the worker does not have
+STATUS_EXCEPTION = -1
+STATUS_MISSING = 1
+
+# Frame headers: opcode or status, then payload length
+REQUEST = struct.Struct("<BI")
+REPLY = struct.Struct("<bI")
+
+# Payload layouts
+TYPE_CODES: Dict[str, int] = {var_type: i for i, var_type in enumerate(FMI3_CTYPES)}
+_TYPES = list(FMI3_CTYPES)
+_VALUES_HEADER = struct.Struct("<BII")  # type code, value references, values
+_INSTANTIATE = struct.Struct("<??")  # eventModeUsed, earlyReturnAllowed
+_INITIALIZATION = struct.Struct("<?dd?d")  # tolerance, start, stop time
+_STEP = struct.Struct("<dd?")
+_STEP_RESULT = struct.Struct("<???d")
+_DISCRETE_STATES = struct.Struct("<?????d")
+_VR_SIZE = 4
+
+
+def split_token(remote: str) -> Tuple[Optional[str], str]:
+    """Split ``"token@host:port"`` into the token (None if absent) and address."""
+    token, _, address = remote.rpartition("@")
+    return token or None, address
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split ``"host:port"`` (or ``"host"``, on DEFAULT_PORT)."""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return port, DEFAULT_PORT
+    return host, int(port)
+
+
+class _Session:
+    """Worker side of one connection: the FMU instance and its requests."""
+
+    def __init__(self, cache: FMUCache, store: str):
+        self.cache = cache
+        self.store = store
+        self.fmu_path: Optional[str] = None
+        self.fmu: Optional[CTypesFMU3Slave] = None
+        self.pin = None  # Keeps the cache entry of the instance from eviction
+        self.handlers: Dict[int, Callable[[bytes], Tuple[int, bytes]]] = {
+            OP_LOAD: self._load,
+            OP_UPLOAD: self._upload,
+            OP_INSTANTIATE: self._instantiate,
+            OP_ENTER_INITIALIZATION: self._enter_initialization,
+            OP_EXIT_INITIALIZATION: self._call("fmi3ExitInitializationMode"),
+            OP_SET: self._set,
+            OP_GET: self._get,
+            OP_STEP: self._step,
+            OP_ENTER_EVENT_MODE: self._call("fmi3EnterEventMode"),
+            OP_ENTER_STEP_MODE: self._call("fmi3EnterStepMode"),
+            OP_UPDATE_DISCRETE_STATES: self._update_discrete_states,
+            OP_TERMINATE: self._call("fmi3Terminate"),
+            OP_RESET: self._call("fmi3Reset"),
+            OP_FREE: self._free,
+        }
+
+    def handle(self, opcode: int, payload: bytes) -> Tuple[int, bytes]:
+        try:
+            handler = self.handlers.get(opcode)
+            if handler is None:
+                raise ValueError(f"Unknown opcode {opcode}")
+            return handler(payload)
+        except FMICallException as e:
+            return e.status, b""
+        except Exception as e:
+            return STATUS_EXCEPTION, f"{type(e).__name__}: {e}".encode()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.store, f"{digest}.fmu")
+
+    def _load(self, payload: bytes) -> Tuple[int, bytes]:
+        path = self._path(payload.decode())
+        if not os.path.isfile(path):
+            return STATUS_MISSING, b""
+        self.fmu_path = path
+        return fmi3OK, b""
+
+    def _upload(self, payload: bytes) -> Tuple[int, bytes]:
+        digest = payload[:64].decode()
+        data = payload[64:]
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError("Uploaded FMU does not match its SHA-256")
+        path = self._path(digest)
+        staging = f"{path}.{os.getpid()}"
+        with open(staging, "wb") as f:
+            f.write(data)
+        os.replace(staging, path)
+        self.fmu_path = path
+        return fmi3OK, b""
+
+    def _instantiate(self, payload: bytes) -> Tuple[int, bytes]:
+        if self.fmu_path is None:
+            raise RuntimeError("No FMU loaded")
+        event_mode_used, early_return_allowed = _INSTANTIATE.unpack_from(payload)
+        model_description, unzipdir, self.pin = self.cache.acquire(self.fmu_path)
+        self.fmu = CTypesFMU3Slave(
+            guid=model_description.guid,
+            unzipDirectory=unzipdir,
+            modelIdentifier=model_description.coSimulation.modelIdentifier,
+            instanceName=payload[_INSTANTIATE.size :].decode(),
+        )
+        self.fmu.instantiate(
+            eventModeUsed=event_mode_used, earlyReturnAllowed=early_return_allowed
+        )
+        return fmi3OK, b""
+
+    def _enter_initialization(self, payload: bytes) -> Tuple[int, bytes]:
+        has_tolerance, tolerance, start, has_stop, stop = _INITIALIZATION.unpack(
+            payload
+        )
+        self.fmu.enterInitializationMode(
+            tolerance=tolerance if has_tolerance else None,
+            startTime=start,
+            stopTime=stop if has_stop else None,
+        )
+        return fmi3OK, b""
+
+    def _call(self, fname: str) -> Callable[[bytes], Tuple[int, bytes]]:
+        def call(payload: bytes) -> Tuple[int, bytes]:
+            return getattr(self.fmu, fname)(self.fmu.component), b""
+
+        return call
+
+    def _set(self, payload: bytes) -> Tuple[int, bytes]:
+        code, nvr, nvalues = _VALUES_HEADER.unpack_from(payload)
+        offset = _VALUES_HEADER.size
+        var_type = _TYPES[code]
+        vrs = (ctypes.c_uint32 * nvr).from_buffer_copy(payload, offset)
+        values = (FMI3_CTYPES[var_type] * nvalues).from_buffer_copy(
+            payload, offset + nvr * _VR_SIZE
+        )
+        function = getattr(self.fmu, f"fmi3Set{var_type}")
+        return function(self.fmu.component, vrs, nvr, values, nvalues), b""
+
+    def _get(self, payload: bytes) -> Tuple[int, bytes]:
+        code, nvr, nvalues = _VALUES_HEADER.unpack_from(payload)
+        var_type = _TYPES[code]
+        vrs = (ctypes.c_uint32 * nvr).from_buffer_copy(payload, _VALUES_HEADER.size)
+        values = (FMI3_CTYPES[var_type] * nvalues)()
+        function = getattr(self.fmu, f"fmi3Get{var_type}")
+        status = function(self.fmu.component, vrs, nvr, values, nvalues)
+        return status, bytes(values)
+
+    def _step(self, payload: bytes) -> Tuple[int, bytes]:
+        time, step_size, no_set_state = _STEP.unpack(payload)
+        result = self.fmu.doStep(time, step_size, no_set_state)
+        return fmi3OK, _STEP_RESULT.pack(*result)
+
+    def _update_discrete_states(self, payload: bytes) -> Tuple[int, bytes]:
+        return fmi3OK, _DISCRETE_STATES.pack(*self.fmu.updateDiscreteStates())
+
+    def _free(self, payload: bytes) -> Tuple[int, bytes]:
+        if self.fmu is not None:
+            self.fmu.freeInstance()
+            self.fmu = None
+        self.cache.release(self.pin)
+        self.pin = None
+        return fmi3OK, b""
+
+    def close(self) -> None:
+        """Free the instance if the master went away without doing so."""
+        if self.fmu is not None and self.fmu.component:
+            try:
+                self.fmu.terminate()
+            except Exception:
+                pass
+            self._free(b"")
+        self.cache.release(self.pin)
+        self.pin = None
+
+
+def _authenticate(sock: socket.socket, token: str, buffer: bytearray) -> bool:
+    """
+    Check the OP_AUTH frame a master must send first.
+
+    Reads into ``buffer`` until the frame is complete, and leaves the
+    requests that follow it there. A wrong token gets an error reply.
+    """
+    authenticated = False
+    while True:
+        if len(buffer) >= REQUEST.size:
+            opcode, length = REQUEST.unpack_from(buffer)
+            if opcode != OP_AUTH or length > _MAX_AUTH_FRAME:
+                break
+            if len(buffer) >= REQUEST.size + length:
+                presented = bytes(buffer[REQUEST.size : REQUEST.size + length])
+                authenticated = hmac.compare_digest(presented, token.encode())
+                break
+        chunk = sock.recv(1 << 16)
+        if not chunk:
+            return False
+        buffer += chunk
+    if not authenticated:
+        message = b"Authentication failed"
+        sock.sendall(REPLY.pack(STATUS_EXCEPTION, len(message)) + message)
+        return False
+    del buffer[: REQUEST.size + length]
+    sock.sendall(REPLY.pack(fmi3OK, 0))
+    return True
+
+
+def serve_connection(
+    sock: socket.socket, cache: FMUCache, store: str, token: str
+) -> None:
+    """
+    Serve the requests of one master until it disconnects.
+
+    The first request must be OP_AUTH with the worker's token, otherwise the
+    connection is closed without handling anything. Every complete request
+    already received is then handled before the replies of the whole batch
+    are sent back, in request order, with one send.
+    """
+    buffer = bytearray()
+    if not _authenticate(sock, token, buffer):
+        logger.warning("Closing an unauthenticated connection")
+        return
+    session = _Session(cache, store)
+    try:
+        while True:
+            replies = bytearray()
+            offset = 0
+            while len(buffer) - offset >= REQUEST.size:
+                opcode, length = REQUEST.unpack_from(buffer, offset)
+                end = offset + REQUEST.size + length
+                if end > len(buffer):
+                    break
+                status, payload = session.handle(
+                    opcode, bytes(buffer[offset + REQUEST.size : end])
+                )
+                replies += REPLY.pack(status, len(payload))
+                replies += payload
+                offset = end
+            del buffer[:offset]
+            if replies:
+                sock.sendall(replies)
+            chunk = sock.recv(1 << 16)
+            if not chunk:
+                break
+            buffer += chunk
+    finally:
+        session.close()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        logger.info("Serving %s:%d", *self.client_address[:2])
+        serve_connection(
+            self.request, self.server.cache, self.server.store, self.server.token
+        )
+
+
+class WorkerServer(socketserver.ForkingTCPServer):
+    """
+    Worker daemon hosting FMUs for remote masters.
+
+    Each connection is served in a forked child, so the FMU instances of
+    different masters (and different SystemC kernels) never share a process,
+    and the child's exit frees everything the FMU left behind. FMUs are
+    uploaded once and kept by SHA-256 next to the worker's FMUCache.
+
+    Masters run their own native code here, so every connection has to
+    present the shared-secret token first (see the module docstring).
+    """
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        cache_dir: Optional[str] = None,
+        token: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            address: ``(host, port)`` to listen on; port 0 picks a free one
+            cache_dir: FMUCache folder, see FMUCache
+            token: Shared secret the masters must present, defaults to
+                $SYSTEMC_FMI_TOKEN
+        """
+        self.token = token or os.environ.get(TOKEN_ENV)
+        if not self.token:
+            raise ValueError(
+                f"The worker needs a shared-secret token, pass one or set ${TOKEN_ENV}"
+            )
+        self.cache = FMUCache(cache_dir)
+        self.store = os.path.join(self.cache.directory, "remote")
+        os.makedirs(self.store, exist_ok=True)
+        super().__init__(address, _Handler)
+
+
+def _serve_loopback(conn, cache_dir: Optional[str], token: str) -> None:
+    with WorkerServer(("127.0.0.1", 0), cache_dir, token) as server:
+        conn.send(server.server_address[1])
+        server.serve_forever()
+
+
+class LoopbackWorker:
+    """
+    Worker daemon on 127.0.0.1, in a local process.
+
+    Stands in for a remote host in tests and single-machine runs: pass
+    ``address`` (``"token@127.0.0.1:port"``) as the ``remote`` argument of
+    FMUSimulator.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, token: Optional[str] = None):
+        """
+        Args:
+            cache_dir: FMUCache folder of the worker, see FMUCache
+            token: Shared secret of the worker, random by default
+        """
+        self.token = token or secrets.token_hex(16)
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_serve_loopback,
+            args=(child_conn, cache_dir, self.token),
+            name="fmu-loopback-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        try:
+            port = parent_conn.recv()
+        except EOFError:
+            self.process.join()
+            raise RuntimeError("Loopback worker failed to start")
+        finally:
+            parent_conn.close()
+        self.address = f"{self.token}@127.0.0.1:{port}"
+
+    def close(self) -> None:
+        """Stop the daemon; connections still open keep their child."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+
+    def __enter__(self) -> "LoopbackWorker":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class RemoteFMU3Slave:
+    """
+    FMI 3.0 Co-Simulation backend forwarding every call to a worker daemon.
+
+    The methods mirror CTypesFMU3Slave, so FMUSimulator, BatchedIO and
+    CoSimulation drive a remote FMU like a local one. The model description
+    is read locally; the FMU file is uploaded only if the worker does not
+    have it yet.
+
+    Requests are pipelined: ``fmi3Set<Type>`` calls are queued and return
+    fmi3OK, and ``doStep`` is sent without waiting (unless the instance uses
+    event mode or early return, whose results the caller needs), so several
+    steps and their inputs travel in one round trip. The first
+    ``fmi3Get<Type>`` after a step sends the queue and fetches every output
+    group read after the previous step at once; the other groups are served
+    from that reply. The statuses of queued requests are checked when their
+    replies arrive, so an FMI error surfaces from a later call, as an
+    FMICallException naming the failed function.
+    """
+
+    def __init__(
+        self,
+        guid: str,
+        unzipDirectory: str,
+        modelIdentifier: str,
+        instanceName: str = None,
+        address: str = f"127.0.0.1:{DEFAULT_PORT}",
+        fmu_path: str = None,
+        max_pending: int = 1024,
+        timeout: Optional[float] = None,
+        token: Optional[str] = None,
+    ):
+        """
+        Args:
+            guid, unzipDirectory, modelIdentifier, instanceName: As for the
+                other backends; the worker reads its own extracted copy
+            address: ``"host:port"`` of the worker, optionally prefixed with
+                its token as ``"token@host:port"``
+            fmu_path: Local FMU file, uploaded if the worker misses it
+            max_pending: Requests in flight before waiting for their replies
+            timeout: Socket timeout in seconds, None to wait forever
+            token: Shared secret of the worker; defaults to the one in
+                ``address``, then to $SYSTEMC_FMI_TOKEN
+        """
+        if fmu_path is None:
+            raise ValueError("The remote backend needs the path of the FMU file")
+        address_token, address = split_token(address)
+        token = token or address_token or os.environ.get(TOKEN_ENV)
+        if not token:
+            raise ValueError(
+                f"No token for the worker {address}: use token@host:port or "
+                f"set ${TOKEN_ENV}"
+            )
+        self.guid = guid
+        self.unzipDirectory = unzipDirectory
+        self.modelIdentifier = modelIdentifier
+        self.instanceName = instanceName if instanceName else modelIdentifier
+        self.address = address
+        self.max_pending = max_pending
+        self.component = None
+        # Flags of the last doStep, once its reply has arrived
+        self.step_result: Tuple[bool, bool, bool, float] = (False, False, False, 0.0)
+
+        self._outbox = bytearray()
+        self._inbox = bytearray()
+        # Function name and reply handler of each request in flight
+        self._pending: List[Tuple[str, Optional[Callable[[int, bytes], None]]]] = []
+        self._error: Optional[Exception] = None
+        # Output reads seen since the last step, and their prefetched replies
+        self._reads: Dict[Tuple[int, bytes, int], None] = {}
+        self._values: Dict[Tuple[int, bytes, int], Tuple[int, bytes]] = {}
+        self._defer_steps = True
+
+        self.sock = socket.create_connection(parse_address(address), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        for var_type, code in TYPE_CODES.items():
+            setattr(self, f"fmi3Set{var_type}", self._setter(code))
+            setattr(self, f"fmi3Get{var_type}", self._getter(code))
+
+        self._call("authenticate", OP_AUTH, token.encode())
+        digest = hash_file(fmu_path)
+        if self._call("load", OP_LOAD, digest.encode()) == STATUS_MISSING:
+            logger.info("Uploading %s to %s", fmu_path, address)
+            with open(fmu_path, "rb") as f:
+                self._call("upload", OP_UPLOAD, digest.encode() + f.read())
+
+    # Transport
+
+    def _send(
+        self,
+        name: str,
+        opcode: int,
+        payload: bytes = b"",
+        handler: Optional[Callable[[int, bytes], None]] = None,
+    ) -> None:
+        """Queue a request; its reply is checked when it arrives."""
+        if opcode != OP_GET:
+            self._values.clear()
+        self._outbox += REQUEST.pack(opcode, len(payload))
+        self._outbox += payload
+        self._pending.append((name, handler))
+        if len(self._pending) >= self.max_pending:
+            self._sync()
+
+    def _flush(self) -> None:
+        if self._outbox:
+            self.sock.sendall(self._outbox)
+            self._outbox.clear()
+
+    def _receive(self, size: int) -> None:
+        while len(self._inbox) < size:
+            chunk = self.sock.recv(1 << 16)
+            if not chunk:
+                raise ConnectionError(f"Remote worker {self.address} disconnected")
+            self._inbox += chunk
+
+    def _sync(self) -> None:
+        """Send the queue and wait for the reply of every request in flight."""
+        self._flush()
+        pending, self._pending = self._pending, []
+        for name, handler in pending:
+            self._receive(REPLY.size)
+            status, length = REPLY.unpack_from(self._inbox)
+            self._receive(REPLY.size + length)
+            payload = bytes(self._inbox[REPLY.size : REPLY.size + length])
+            del self._inbox[: REPLY.size + length]
+            if self._error is not None:
+                continue
+            if status == STATUS_EXCEPTION:
+                self._error = RuntimeError(
+                    f"{name} failed on {self.address}: {payload.decode()}"
+                )
+            elif status > fmi3Warning:
+                self._error = FMICallException(function=name, status=status)
+            elif handler is not None:
+                handler(status, payload)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _call(self, name: str, opcode: int, payload: bytes = b"") -> int:
+        """Send a request and wait for its reply; return its status."""
+        result = []
+        self._send(name, opcode, payload, lambda status, _: result.append(status))
+        self._sync()
+        return result[0]
+
+    def _setter(self, code: int) -> Callable[..., int]:
+        name = f"fmi3Set{_TYPES[code]}"
+
+        def fmi3Set(component, vr, nvr: int, values, nvalues: int) -> int:
+            size = ctypes.sizeof(FMI3_CTYPES[_TYPES[code]]) * nvalues
+            self._send(
+                name,
+                OP_SET,
+                _VALUES_HEADER.pack(code, nvr, nvalues)
+                + ctypes.string_at(vr, nvr * _VR_SIZE)
+                + ctypes.string_at(values, size),
+            )
+            return fmi3OK
+
+        return fmi3Set
+
+    def _prefetch(self, read: Tuple[int, bytes, int]) -> None:
+        """Queue the read of one output group; the reply fills the cache."""
+        code, vrs, nvalues = read
+
+        def store(status: int, data: bytes) -> None:
+            self._values[read] = (status, data)
+
+        self._send(
+            f"fmi3Get{_TYPES[code]}",
+            OP_GET,
+            _VALUES_HEADER.pack(code, len(vrs) // _VR_SIZE, nvalues) + vrs,
+            store,
+        )
+
+    def _getter(self, code: int) -> Callable[..., int]:
+        def fmi3Get(component, vr, nvr: int, values, nvalues: int) -> int:
+            key = (code, ctypes.string_at(vr, nvr * _VR_SIZE), nvalues)
+            if key not in self._values:
+                # Fetch this group and the other ones read after each step
+                self._reads[key] = None
+                for read in self._reads:
+                    if read not in self._values:
+                        self._prefetch(read)
+                self._sync()
+            status, data = self._values[key]
+            ctypes.memmove(values, data, len(data))
+            return status
+
+        return fmi3Get
+
+    # Creation, initialization and destruction
+
+    def instantiate(
+        self,
+        visible=False,
+        loggingOn=False,
+        eventModeUsed=False,
+        earlyReturnAllowed=False,
+        logMessage=None,
+        intermediateUpdate=None,
+    ) -> None:
+        self._call(
+            "fmi3InstantiateCoSimulation",
+            OP_INSTANTIATE,
+            _INSTANTIATE.pack(eventModeUsed, earlyReturnAllowed)
+            + self.instanceName.encode("utf-8"),
+        )
+        # The flags of a deferred step are not known when doStep returns
+        self._defer_steps = not (eventModeUsed or earlyReturnAllowed)
+        self.component = self.instanceName
+
+    def enterInitializationMode(self, tolerance=None, startTime=0.0, stopTime=None):
+        self._call(
+            "fmi3EnterInitializationMode",
+            OP_ENTER_INITIALIZATION,
+            _INITIALIZATION.pack(
+                tolerance is not None,
+                0.0 if tolerance is None else tolerance,
+                startTime,
+                stopTime is not None,
+                0.0 if stopTime is None else stopTime,
+            ),
+        )
+
+    def exitInitializationMode(self):
+        return self._call("fmi3ExitInitializationMode", OP_EXIT_INITIALIZATION)
+
+    def terminate(self):
+        return self._call("fmi3Terminate", OP_TERMINATE)
+
+    def reset(self):
+        return self._call("fmi3Reset", OP_RESET)
+
+    def freeInstance(self):
+        try:
+            self._call("fmi3FreeInstance", OP_FREE)
+        finally:
+            self.component = None
+            self.sock.close()
+
+    # Simulating the FMU
+
+    def _step_done(self, status: int, payload: bytes) -> None:
+        self.step_result = _STEP_RESULT.unpack(payload)
+
+    def doStep(
+        self,
+        currentCommunicationPoint: float,
+        communicationStepSize: float,
+        noSetFMUStatePriorToCurrentPoint: bool = True,
+    ) -> Tuple[bool, bool, bool, float]:
+        self._send(
+            "fmi3DoStep",
+            OP_STEP,
+            _STEP.pack(
+                currentCommunicationPoint,
+                communicationStepSize,
+                noSetFMUStatePriorToCurrentPoint,
+            ),
+            self._step_done,
+        )
+        if not self._defer_steps:
+            self._sync()
+            return self.step_result
+        # Start the worker on the step now, and collect the reply later
+        self._flush()
+        return (
+            False,
+            False,
+            False,
+            currentCommunicationPoint + communicationStepSize,
+        )
+
+    # Event handling
+
+    def enterEventMode(self):
+        return self._call("fmi3EnterEventMode", OP_ENTER_EVENT_MODE)
+
+    def enterStepMode(self):
+        return self._call("fmi3EnterStepMode", OP_ENTER_STEP_MODE)
+
+    def updateDiscreteStates(self) -> Tuple[bool, bool, bool, bool, bool, float]:
+        result = []
+        self._send(
+            "fmi3UpdateDiscreteStates",
+            OP_UPDATE_DISCRETE_STATES,
+            handler=lambda status, payload: result.extend(
+                _DISCRETE_STATES.unpack(payload)
+            ),
+        )
+        self._sync()
+        return tuple(result)
+
+    # Getting and setting single values (outside the hot loop)
+
+    def _set(self, var_type: str, vr: Sequence[int], values: Sequence[Any]) -> None:
+        n = len(vr)
+        getattr(self, f"fmi3Set{var_type}")(
+            self.component,
+            (ctypes.c_uint32 * n)(*vr),
+            n,
+            (FMI3_CTYPES[var_type] * len(values))(*values),
+            len(values),
+        )
+
+    def _get(self, var_type: str, vr: Sequence[int]) -> List[Any]:
+        n = len(vr)
+        values = (FMI3_CTYPES[var_type] * n)()
+        status = getattr(self, f"fmi3Get{var_type}")(
+            self.component, (ctypes.c_uint32 * n)(*vr), n, values, n
+        )
+        if status > fmi3Warning:
+            raise FMICallException(function=f"fmi3Get{var_type}", status=status)
+        return list(values)
+
+    def __getattr__(self, name: str):
+        # setBoolean(...), getUInt8(...), ... like fmpy's typed accessors
+        if name[:3] in ("set", "get") and name[3:] in FMI3_CTYPES:
+            accessor = self._set if name[:3] == "set" else self._get
+            var_type = name[3:]
+            return lambda *args: accessor(var_type, *args)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve FMUs to remote masters. WARNING: the worker runs the "
+        "native code of every uploaded FMU, so anyone holding the token can run "
+        "arbitrary code on this host; only listen on trusted networks."
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Listen address (default 127.0.0.1, local masters only)",
+    )
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Listen port")
+    parser.add_argument(
+        "--token",
+        type=str,
+        default=None,
+        help=f"Shared secret the masters must present (default ${TOKEN_ENV}); "
+        "prefer the variable, command lines are visible to other users",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default=None,
+        help="FMU cache of the worker (default $SYSTEMC_FMI_CACHE or "
+        "~/.cache/systemc-fmi)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not (args.token or os.environ.get(TOKEN_ENV)):
+        parser.error(f"a token is required, pass --token or set ${TOKEN_ENV}")
+
+    with WorkerServer((args.host, args.port), args.cache_dir, args.token) as server:
+        logger.info("FMU worker listening on %s:%d", *server.server_address[:2])
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
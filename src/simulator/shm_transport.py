@@ -0,0 +1,254 @@
+import ctypes
+import os
+import platform
+import time as timer
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from simulator.batched_io import FMI3_CTYPES
+
+# Command ring opcodes
+OP_STEP = 1
+OP_CLOSE = 2
+
+# Response ring status codes
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Head and tail counters each get their own cache line
+_LINE = 64
+_COUNTERS = 4  # command head, command tail, response head, response tail
+_COMMAND_FIELDS = 4  # opcode, time, step size, dirty input group mask
+_RESPONSE_FIELDS = 2  # status, spare
+
+# Machines whose stores other cores see in program order, as the rings need
+ORDERED_MACHINES = ("x86_64", "AMD64")
+
+
+def shm_supported() -> bool:
+    """Whether the rings are safe on this machine, see ShmChannel."""
+    return platform.machine() in ORDERED_MACHINES
+
+
+def available_cpus() -> int:
+    """Number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _align(offset: int, alignment: int = _LINE) -> int:
+    return -(-offset // alignment) * alignment
+
+
+class ShmChannel:
+    """
+    Shared-memory transport between a master and one out-of-process FMU.
+
+    One POSIX shared memory block holds the typed input and output buffers
+    of the FMU's type groups and two single-producer single-consumer rings:
+    step commands from the master and responses from the worker. Both sides
+    get ctypes arrays (``inputs``/``outputs``) and NumPy views over the same
+    bytes, so the FMU's fmi3Set/fmi3Get calls and the master's transfers read
+    and write the block directly, without copies or pickling.
+
+    A ring slot is written before its head counter is published, and each
+    counter is only written by one side; this relies on the in-order stores
+    of x86 (CPython gives no memory fences), so create() refuses other
+    machines (see shm_supported()). Waiting spins for ``spin``
+    polls, then yields the CPU, then sleeps with a growing back-off, so an
+    idle side does not burn a core.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        input_layout: Sequence[Tuple[str, int]],
+        output_layout: Sequence[Tuple[str, int]],
+        capacity: int,
+        spin: Optional[int] = None,
+    ):
+        """
+        Args:
+            shm: Shared memory block, see create() and attach()
+            input_layout: ``(FMI type, size)`` of each input type group
+            output_layout: ``(FMI type, size)`` of each output type group
+            capacity: Number of slots of each ring
+            spin: Busy polls before yielding; defaults to 2000, or 0 on a
+                single CPU where spinning only delays the peer
+        """
+        if spin is None:
+            spin = 2000 if available_cpus() > 1 else 0
+        self.shm = shm
+        self.input_layout = [tuple(group) for group in input_layout]
+        self.output_layout = [tuple(group) for group in output_layout]
+        self.capacity = capacity
+        self.spin = spin
+
+        buf = shm.buf
+        # Counter i is cell i * _LINE // 8; a memoryview polls faster than NumPy
+        self.counters = buf[: _COUNTERS * _LINE].cast("q")
+        offset = _COUNTERS * _LINE
+        self.commands = np.ndarray(
+            (capacity, _COMMAND_FIELDS), dtype=np.float64, buffer=buf, offset=offset
+        )
+        offset = _align(offset + self.commands.nbytes)
+        self.responses = np.ndarray(
+            (capacity, _RESPONSE_FIELDS), dtype=np.float64, buffer=buf, offset=offset
+        )
+        offset = _align(offset + self.responses.nbytes)
+        self.inputs, offset = self._map(self.input_layout, offset)
+        self.outputs, offset = self._map(self.output_layout, offset)
+        self.input_views = [np.ctypeslib.as_array(array) for array in self.inputs]
+        self.output_views = [np.ctypeslib.as_array(array) for array in self.outputs]
+
+    def _map(self, layout: List[Tuple[str, int]], offset: int) -> Tuple[list, int]:
+        arrays = []
+        for var_type, size in layout:
+            array_type = FMI3_CTYPES[var_type] * size
+            arrays.append(array_type.from_buffer(self.shm.buf, offset))
+            offset = _align(offset + max(1, ctypes.sizeof(array_type)), 8)
+        return arrays, offset
+
+    @staticmethod
+    def size(
+        input_layout: Sequence[Tuple[str, int]],
+        output_layout: Sequence[Tuple[str, int]],
+        capacity: int,
+    ) -> int:
+        """Number of bytes needed for the given buffers and ring capacity."""
+        size = _COUNTERS * _LINE
+        size = _align(size + capacity * _COMMAND_FIELDS * 8)
+        size = _align(size + capacity * _RESPONSE_FIELDS * 8)
+        for var_type, count in list(input_layout) + list(output_layout):
+            size = _align(
+                size + max(1, ctypes.sizeof(FMI3_CTYPES[var_type] * count)), 8
+            )
+        return size
+
+    @classmethod
+    def create(
+        cls,
+        input_layout: Sequence[Tuple[str, int]],
+        output_layout: Sequence[Tuple[str, int]],
+        capacity: int = 16,
+    ) -> "ShmChannel":
+        """
+        Allocate a new channel, owned (and unlinked) by the caller.
+
+        Args:
+            input_layout: ``(FMI type, size)`` of each input type group
+            output_layout: ``(FMI type, size)`` of each output type group
+            capacity: Number of slots of each ring
+        """
+        if not shm_supported():
+            raise RuntimeError(
+                f"The shared-memory rings rely on x86 store ordering, "
+                f"{platform.machine()} is not supported"
+            )
+        shm = shared_memory.SharedMemory(
+            create=True, size=cls.size(input_layout, output_layout, capacity)
+        )
+        channel = cls(shm, input_layout, output_layout, capacity)
+        for cell in range(len(channel.counters)):
+            channel.counters[cell] = 0
+        return channel
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "ShmChannel":
+        """Attach to a channel created elsewhere, from its ``spec``."""
+        shm = shared_memory.SharedMemory(name=spec["name"])
+        return cls(shm, spec["inputs"], spec["outputs"], spec["capacity"])
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """Picklable description used to attach to the channel."""
+        return {
+            "name": self.shm.name,
+            "inputs": self.input_layout,
+            "outputs": self.output_layout,
+            "capacity": self.capacity,
+        }
+
+    def _wait(
+        self, cell: int, threshold: int, alive: Optional[Callable[[], bool]]
+    ) -> None:
+        """Wait until counter ``cell`` is above ``threshold``."""
+        counters = self.counters
+        for _ in range(self.spin):
+            if counters[cell] > threshold:
+                return
+        delay = 0.0
+        while counters[cell] <= threshold:
+            if alive is not None and not alive():
+                raise RuntimeError("Peer process of the channel died")
+            if delay == 0.0:
+                os.sched_yield()
+                delay = 1e-6
+            else:
+                timer.sleep(delay)
+                delay = min(delay * 2, 1e-3)
+
+    def _push(self, ring: np.ndarray, head: int, tail: int, values, alive) -> None:
+        counters = self.counters
+        head *= _LINE // 8
+        position = counters[head]
+        # Wait for a free slot: the consumer is less than a ring behind
+        self._wait(tail * _LINE // 8, position - self.capacity, alive)
+        ring[position % self.capacity] = values
+        counters[head] = position + 1
+
+    def _pop(self, ring: np.ndarray, head: int, tail: int, alive) -> np.ndarray:
+        counters = self.counters
+        tail *= _LINE // 8
+        position = counters[tail]
+        self._wait(head * _LINE // 8, position, alive)
+        values = ring[position % self.capacity].copy()
+        counters[tail] = position + 1
+        return values
+
+    # Master side
+
+    def send_command(
+        self,
+        opcode: int,
+        time: float = 0.0,
+        step_size: float = 0.0,
+        dirty: int = 0,
+        alive: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        """Queue a command; ``dirty`` has bit ``i`` set if input group ``i``
+        was written since the previous step."""
+        self._push(self.commands, 0, 1, (opcode, time, step_size, dirty), alive)
+
+    def receive_response(self, alive: Optional[Callable[[], bool]] = None) -> int:
+        """Wait for the next response and return its status."""
+        return int(self._pop(self.responses, 2, 3, alive)[0])
+
+    # Worker side
+
+    def receive_command(
+        self, alive: Optional[Callable[[], bool]] = None
+    ) -> Tuple[int, float, float, int]:
+        """Wait for the next command: ``(opcode, time, step_size, dirty)``."""
+        opcode, time, step_size, dirty = self._pop(self.commands, 0, 1, alive)
+        return int(opcode), float(time), float(step_size), int(dirty)
+
+    def send_response(
+        self, status: int = STATUS_OK, alive: Optional[Callable[[], bool]] = None
+    ) -> None:
+        self._push(self.responses, 2, 3, (status, 0.0), alive)
+
+    def close(self) -> None:
+        """Release the buffers and detach from the block."""
+        self.counters.release()
+        self.counters = self.commands = self.responses = None
+        self.inputs = self.outputs = self.input_views = self.output_views = []
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the block; call once, in the process that created it."""
+        self.close()
+        self.shm.unlink()
@@ -0,0 +1,307 @@
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+# Generator parameters that are durations, given in seconds in stimuli files
+# and converted to integer ticks of the simulation time base
+TIME_PARAMETERS = ("period", "phase", "duration")
+
+
+class SignalGenerator:
+    """
+    Procedural input signal evaluated lazily in integer ticks.
+
+    A generator computes its value at any time in closed form and answers
+    ``next_change(time)``, so it is used by the simulation loop exactly like a
+    compiled InputSchedule but never materializes its change points: memory
+    stays O(1) however long the run is.
+    """
+
+    def reset(self) -> None:
+        """Generators are stateless; kept for API parity with InputSchedule."""
+
+    def value_at(self, time: int) -> Any:
+        """Return the value of the signal at ``time`` (in ticks)."""
+        raise NotImplementedError
+
+    def next_change(self, time: Optional[int] = None) -> Optional[int]:
+        """
+        Return the first change point after ``time``.
+
+        Args:
+            time: Time in ticks, or None for the first change point, which is
+                the start of the simulation
+
+        Returns:
+            The change point in ticks, or None if the signal stays constant
+        """
+        raise NotImplementedError
+
+
+class PWMGenerator(SignalGenerator):
+    """
+    Pulse-width modulated signal.
+
+    Each period starts with a rising edge at ``phase + k * period`` and stays
+    ``high`` for ``duty * period``. ``duty`` is either a constant or a list of
+    duty cycles applied to successive periods, repeated cyclically.
+    """
+
+    def __init__(
+        self,
+        period: int,
+        duty: Union[float, Sequence[float]] = 0.5,
+        phase: int = 0,
+        low: Any = 0,
+        high: Any = 1,
+    ):
+        """
+        Args:
+            period: Period in ticks
+            duty: Fraction of each period spent high, or one per period
+            phase: Time of the first rising edge in ticks
+            low: Value outside the pulses
+            high: Value during the pulses
+        """
+        if period <= 0:
+            raise ValueError(f"Period must be positive, got {period}")
+        duties = list(duty) if isinstance(duty, (list, tuple)) else [duty]
+        if not duties or any(not 0.0 <= d <= 1.0 for d in duties):
+            raise ValueError(f"Duty cycles must be between 0 and 1, got {duty}")
+        self.period = period
+        self.phase = phase
+        self.low = low
+        self.high = high
+        self.high_ticks = [round(d * period) for d in duties]
+        # A signal that is always low or always high never changes
+        self.constant = all(h == 0 for h in self.high_ticks) or all(
+            h == period for h in self.high_ticks
+        )
+
+    def value_at(self, time: int) -> Any:
+        cycle, position = divmod(time - self.phase, self.period)
+        high_ticks = self.high_ticks[cycle % len(self.high_ticks)]
+        return self.high if position < high_ticks else self.low
+
+    def next_change(self, time: Optional[int] = None) -> Optional[int]:
+        if time is None:
+            return 0
+        if self.constant:
+            return None
+        cycle, position = divmod(time - self.phase, self.period)
+        high_ticks = self.high_ticks[cycle % len(self.high_ticks)]
+        if position < high_ticks:
+            return time + high_ticks - position
+        return time + self.period - position
+
+
+class ClockGenerator(PWMGenerator):
+    """Clock: a PWM signal with a constant duty cycle, 50% by default."""
+
+    def __init__(
+        self,
+        period: int,
+        duty: float = 0.5,
+        phase: int = 0,
+        low: Any = 0,
+        high: Any = 1,
+    ):
+        super().__init__(period=period, duty=duty, phase=phase, low=low, high=high)
+
+
+class CounterGenerator(SignalGenerator):
+    """Counter incremented by ``step`` every ``period``, optionally wrapping."""
+
+    def __init__(
+        self,
+        period: int,
+        start: int = 0,
+        step: int = 1,
+        modulo: Optional[int] = None,
+    ):
+        """
+        Args:
+            period: Time between two increments in ticks
+            start: Initial value
+            step: Increment
+            modulo: If set, the value wraps around to ``value % modulo``
+        """
+        if period <= 0:
+            raise ValueError(f"Period must be positive, got {period}")
+        self.period = period
+        self.start = start
+        self.step = step
+        self.modulo = modulo
+
+    def value_at(self, time: int) -> Any:
+        value = self.start + (time // self.period) * self.step
+        return value % self.modulo if self.modulo else value
+
+    def next_change(self, time: Optional[int] = None) -> Optional[int]:
+        if time is None:
+            return 0
+        return (time // self.period + 1) * self.period
+
+
+class RampGenerator(SignalGenerator):
+    """
+    Staircase ramp from ``start`` to ``stop`` over ``duration``.
+
+    The value is updated every ``period`` and holds ``stop`` once the ramp is
+    over.
+    """
+
+    def __init__(
+        self,
+        duration: int,
+        period: int,
+        start: float = 0.0,
+        stop: float = 1.0,
+    ):
+        """
+        Args:
+            duration: Duration of the ramp in ticks
+            period: Time between two updates of the value in ticks
+            start: Value at the start of the ramp
+            stop: Value at the end of the ramp
+        """
+        if duration <= 0 or period <= 0:
+            raise ValueError(
+                f"Duration and period must be positive, got {duration}, {period}"
+            )
+        self.duration = duration
+        self.period = period
+        self.start = start
+        self.stop = stop
+
+    def value_at(self, time: int) -> Any:
+        if time >= self.duration:
+            return self.stop
+        sample = (time // self.period) * self.period
+        return self.start + (self.stop - self.start) * sample / self.duration
+
+    def next_change(self, time: Optional[int] = None) -> Optional[int]:
+        if time is None:
+            return 0
+        if time >= self.duration:
+            return None
+        return min((time // self.period + 1) * self.period, self.duration)
+
+
+def _mix64(x: int) -> int:
+    """SplitMix64 finalizer: a well-distributed 64-bit hash of ``x``."""
+    x = (x + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+class RandomGenerator(SignalGenerator):
+    """
+    Seeded random signal drawing a new value every ``period``.
+
+    Values are a hash of the seed and the period index, so any time can be
+    evaluated directly and a run is reproducible for a given seed. Integer
+    bounds draw integers in ``[low, high]``, float bounds uniform floats in
+    ``[low, high)``.
+    """
+
+    def __init__(self, period: int, low: Any = 0, high: Any = 1, seed: int = 0):
+        """
+        Args:
+            period: Time between two draws in ticks
+            low: Lower bound
+            high: Upper bound
+            seed: Seed of the sequence
+        """
+        if period <= 0:
+            raise ValueError(f"Period must be positive, got {period}")
+        if high < low:
+            raise ValueError(f"Upper bound {high} is below lower bound {low}")
+        self.period = period
+        self.low = low
+        self.high = high
+        self.seed = _mix64(seed)
+        self.integer = isinstance(low, int) and isinstance(high, int)
+
+    def value_at(self, time: int) -> Any:
+        bits = _mix64(self.seed ^ (time // self.period))
+        if self.integer:
+            return self.low + bits % (self.high - self.low + 1)
+        return self.low + (self.high - self.low) * (bits >> 11) / float(1 << 53)
+
+    def next_change(self, time: Optional[int] = None) -> Optional[int]:
+        if time is None:
+            return 0
+        return (time // self.period + 1) * self.period
+
+
+class PatternGenerator(SignalGenerator):
+    """Sequence of values applied one per ``period``, repeated or held."""
+
+    def __init__(self, pattern: Sequence[Any], period: int, repeat: bool = True):
+        """
+        Args:
+            pattern: Values applied in order
+            period: Time each value is applied for in ticks
+            repeat: Restart the pattern at the end, else hold the last value
+        """
+        if period <= 0:
+            raise ValueError(f"Period must be positive, got {period}")
+        if not pattern:
+            raise ValueError("Pattern must not be empty")
+        self.pattern = list(pattern)
+        self.period = period
+        self.repeat = repeat
+
+    def value_at(self, time: int) -> Any:
+        index = time // self.period
+        if self.repeat:
+            return self.pattern[index % len(self.pattern)]
+        return self.pattern[min(index, len(self.pattern) - 1)]
+
+    def next_change(self, time: Optional[int] = None) -> Optional[int]:
+        if time is None:
+            return 0
+        index = time // self.period + 1
+        if not self.repeat and index >= len(self.pattern):
+            return None
+        return index * self.period
+
+
+GENERATORS: Dict[str, type] = {
+    "clock": ClockGenerator,
+    "pwm": PWMGenerator,
+    "counter": CounterGenerator,
+    "ramp": RampGenerator,
+    "random": RandomGenerator,
+    "pattern": PatternGenerator,
+}
+
+
+def create_generator(
+    spec: Dict[str, Any], to_ticks: Callable[[float], int]
+) -> SignalGenerator:
+    """
+    Build a generator from its stimuli file description.
+
+    Args:
+        spec: Dictionary with a ``generator`` key naming one of GENERATORS and
+            the generator parameters, durations being given in seconds
+        to_ticks: Conversion from seconds to ticks of the simulation time base
+
+    Returns:
+        The signal generator
+    """
+    spec = dict(spec)
+    name = spec.pop("generator", None)
+    if name not in GENERATORS:
+        raise ValueError(
+            f"Unknown generator {name}, expected one of {list(GENERATORS)}"
+        )
+    parameters = {
+        key: to_ticks(value) if key in TIME_PARAMETERS else value
+        for key, value in spec.items()
+    }
+    try:
+        return GENERATORS[name](**parameters)
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for generator {name}: {e}")
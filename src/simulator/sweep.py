@@ -0,0 +1,347 @@
+import copy
+import inspect
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import time as timer
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import yaml
+from fmpy import read_model_description
+
+from simulator.fmu_cache import FMUCache
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import SharedColumns, SharedMemoryRecorder
+from simulator.time_base import TimeBase
+
+logger = logging.getLogger(__name__)
+
+
+def apply_override(stimuli: Dict[str, Any], key: str, value: Any) -> None:
+    """
+    Set one entry of a stimuli set.
+
+    Args:
+        stimuli: Stimuli set, modified in place
+        key: Signal name, replacing its whole schedule or generator, or
+            ``<signal>.<parameter>`` to set one generator parameter
+        value: New schedule, generator description or parameter value
+    """
+    signal, _, parameter = key.partition(".")
+    if not parameter:
+        stimuli[signal] = value
+        return
+    if not isinstance(stimuli.get(signal), dict):
+        raise ValueError(f"Cannot set {parameter} of {signal}: no such signal")
+    stimuli[signal][parameter] = value
+
+
+def expand_variants(
+    base: Dict[str, Any],
+    grid: Optional[Dict[str, Sequence[Any]]] = None,
+    variants: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    List the overrides of a sweep.
+
+    Args:
+        base: Base stimuli set
+        grid: Override key to the values it takes; every combination is run
+        variants: Explicit list of override dictionaries, run after the grid
+
+    Returns:
+        One override dictionary per run (``{}`` runs the base stimuli as is)
+    """
+    overrides: List[Dict[str, Any]] = []
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[key] for key in keys)):
+            overrides.append(dict(zip(keys, values)))
+    if variants:
+        overrides.extend(variants)
+    if not overrides:
+        overrides.append({})
+    for override in overrides:
+        # Fail in the parent, not in a worker
+        stimuli = copy.deepcopy(base)
+        for key, value in override.items():
+            apply_override(stimuli, key, value)
+    return overrides
+
+
+def row_capacity(
+    stop_time: float,
+    step_size: float,
+    output_interval: Optional[float] = None,
+    resolution: Union[str, float] = "SC_PS",
+) -> int:
+    """Number of rows a run records on its fixed step or output grid."""
+    time_base = TimeBase(resolution)
+    stop_ticks = time_base.to_ticks(stop_time)
+    grid_ticks = time_base.to_ticks(output_interval or step_size)
+    return max(1, -(-stop_ticks // grid_ticks))
+
+
+# State of a sweep worker process
+_cpu_slots = None
+_attached: Dict[str, SharedColumns] = {}
+
+
+def _init_worker(cpu_slots) -> None:
+    global _cpu_slots
+    _cpu_slots = cpu_slots
+
+
+def _claim_cpu() -> Optional[int]:
+    """Pin this worker to a CPU no other running job uses."""
+    if _cpu_slots is None or not hasattr(os, "sched_setaffinity"):
+        return None
+    with _cpu_slots.get_lock():
+        for slot, cpu in enumerate(_cpu_slots):
+            if cpu >= 0:
+                _cpu_slots[slot] = -1 - cpu
+                break
+        else:
+            return None
+    os.sched_setaffinity(0, {cpu})
+    return slot
+
+
+def _release_cpu(slot: Optional[int]) -> None:
+    if slot is not None:
+        with _cpu_slots.get_lock():
+            _cpu_slots[slot] = -1 - _cpu_slots[slot]
+
+
+def _variant_main(conn, cpu_slots, *args: Any) -> None:
+    """Sweep worker process: run one variant, see _run_variant()."""
+    _init_worker(cpu_slots)
+    try:
+        result = _run_variant(*args)
+    except BaseException as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        conn.send(("error", e))
+        return
+    conn.send(("done", result))
+
+
+def _run_variant(
+    fmu_path: str,
+    simulator_kwargs: Dict[str, Any],
+    stimuli: Dict[str, Any],
+    spec: Dict[str, Any],
+    run: int,
+) -> Dict[str, Any]:
+    """Run one sweep variant and write its columns into the shared block."""
+    slot = _claim_cpu()
+    try:
+        shared = _attached.get(spec["name"])
+        if shared is None:
+            shared = _attached[spec["name"]] = SharedColumns.attach(spec)
+        start = timer.perf_counter()
+        simulator = FMUSimulator(
+            fmu_path=fmu_path, **{"log_enabled": False, **simulator_kwargs}
+        )
+        simulator.setup_model()
+        simulator.initialize_fmu()
+        simulator.set_stimuli(
+            {k: v for k, v in stimuli.items() if k.lower() != "interrupt"}
+        )
+        rows = simulator.run_simulation(recorder=SharedMemoryRecorder(shared, run))
+        return {
+            "run": run,
+            "rows": rows,
+            "elapsed": timer.perf_counter() - start,
+            "pid": os.getpid(),
+        }
+    finally:
+        _release_cpu(slot)
+
+
+class SweepResults:
+    """
+    Results of a sweep, held in shared memory until release().
+
+    ``overrides[i]`` describes run ``i`` and ``arrays(i)`` returns its columns
+    as views on the shared block, without copies.
+    """
+
+    def __init__(
+        self,
+        shared: SharedColumns,
+        overrides: List[Dict[str, Any]],
+        stats: List[Dict[str, Any]],
+        elapsed: float,
+    ):
+        self.shared = shared
+        self.overrides = overrides
+        self.stats = stats
+        self.elapsed = elapsed
+
+    def __len__(self) -> int:
+        return len(self.overrides)
+
+    def arrays(self, run: int) -> Dict[str, np.ndarray]:
+        """Recorded columns of a run (views, valid until release())."""
+        return self.shared.run_arrays(run)
+
+    def to_dataframe(self, run: int):
+        """Copy the columns of a run into a pandas DataFrame indexed by time."""
+        # pandas is only needed here, keep it out of the simulator import path
+        import pandas as pd
+
+        arrays = {name: array.copy() for name, array in self.arrays(run).items()}
+        time = arrays.pop("Time")
+        return pd.DataFrame(arrays, index=pd.Index(time, name="Time"))
+
+    def release(self) -> None:
+        """Free the shared memory block."""
+        if self.shared is not None:
+            self.shared.unlink()
+            self.shared = None
+
+    def __enter__(self) -> "SweepResults":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+
+def run_sweep(
+    fmu_path: str,
+    stimuli: Union[str, Dict[str, Any]],
+    grid: Optional[Dict[str, Sequence[Any]]] = None,
+    variants: Optional[List[Dict[str, Any]]] = None,
+    max_workers: Optional[int] = None,
+    cpus: Optional[Sequence[int]] = None,
+    max_rows: Optional[int] = None,
+    **simulator_kwargs: Any,
+) -> SweepResults:
+    """
+    Run variants of a stimuli set in parallel worker processes.
+
+    Each run is a fresh process (the SystemC kernel cannot be elaborated twice
+    in one process) pinned to its own CPU, and writes its result columns
+    straight into a shared memory block, so nothing but a few counters is
+    pickled back. INTERRUPT entries are ignored; evaluate them over the
+    results with ``simulator.interrupts.evaluate_trace``.
+
+    Args:
+        fmu_path: Path to the FMU file
+        stimuli: Base stimuli set, or path to a stimuli YAML file
+        grid: Override key to values, see expand_variants()
+        variants: Explicit list of overrides, see expand_variants()
+        max_workers: Number of worker processes, defaults to the number of CPUs
+        cpus: CPUs the workers are pinned to, defaults to the CPUs available
+        max_rows: Row capacity of each run; defaults to the number of fixed
+            steps (or output grid points), set it for event-driven sweeps
+        **simulator_kwargs: FMUSimulator arguments (stop_time, step_size, ...)
+
+    Returns:
+        The SweepResults, to be released once read
+    """
+    if isinstance(stimuli, str):
+        with open(stimuli, "r") as f:
+            stimuli = yaml.safe_load(f)
+    fmu_path = os.path.abspath(fmu_path)
+    overrides = expand_variants(stimuli, grid, variants)
+
+    if cpus is None:
+        if hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = list(range(os.cpu_count() or 1))
+    max_workers = min(max_workers or len(cpus), len(overrides))
+
+    # Columns come from the model description, without instantiating the FMU
+    cache = simulator_kwargs.get("cache", False)
+    if cache:
+        model_description, _ = (FMUCache() if cache is True else cache).get(fmu_path)
+    else:
+        model_description = read_model_description(fmu_path)
+    variables = model_description.modelVariables
+    inputs = [v for v in variables if v.causality == "input"]
+    outputs = [v for v in variables if v.causality == "output"]
+    columns = ["Time"] + [v.name for v in inputs + outputs]
+    types = ["Float64"] + [v.type for v in inputs + outputs]
+
+    parameters = inspect.signature(FMUSimulator).parameters
+    settings = {
+        name: p.default for name, p in parameters.items() if p.default is not p.empty
+    }
+    settings.update(simulator_kwargs)
+    capacity = max_rows or row_capacity(
+        settings["stop_time"],
+        settings["step_size"],
+        settings["output_interval"],
+        settings["resolution"],
+    )
+
+    shared = SharedColumns.create(columns, types, len(overrides), capacity)
+    context = multiprocessing.get_context("spawn")
+    cpu_slots = context.Array("i", list(cpus))
+    stats: List[Dict[str, Any]] = [{} for _ in overrides]
+    start = timer.perf_counter()
+    # One spawned process per run, as the SystemC kernel cannot be elaborated
+    # twice; ProcessPoolExecutor only recycles workers from Python 3.11 on
+    running: Dict[Any, Tuple[int, Any]] = {}  # reader: (run, process)
+    pending = iter(enumerate(overrides))
+    try:
+        while True:
+            while len(running) < max_workers:
+                item = next(pending, None)
+                if item is None:
+                    break
+                run, override = item
+                variant = copy.deepcopy(stimuli)
+                for key, value in override.items():
+                    apply_override(variant, key, value)
+                reader, writer = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_variant_main,
+                    args=(
+                        writer,
+                        cpu_slots,
+                        fmu_path,
+                        simulator_kwargs,
+                        variant,
+                        shared.spec,
+                        run,
+                    ),
+                    name=f"sweep-run-{run}",
+                    daemon=True,
+                )
+                process.start()
+                writer.close()
+                running[reader] = (run, process)
+            if not running:
+                break
+
+            for reader in wait(list(running)):
+                run, process = running.pop(reader)
+                try:
+                    kind, value = reader.recv()
+                except EOFError:
+                    kind, value = "error", RuntimeError(f"Worker of run {run} died")
+                reader.close()
+                process.join()
+                if kind != "done":
+                    raise value
+                stats[run] = value
+    except BaseException:
+        for reader, (_, process) in running.items():
+            process.kill()
+            process.join()
+            reader.close()
+        shared.unlink()
+        raise
+    elapsed = timer.perf_counter() - start
+    logger.info("Sweep of %d runs done in %.3f s", len(overrides), elapsed)
+    return SweepResults(shared, overrides, stats, elapsed)
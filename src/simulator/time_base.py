@@ -0,0 +1,103 @@
+import math
+from typing import Iterable, Union
+
+# SystemC time units (as used in the DefaultExperiment "resolution" field)
+# and the number of ticks per second of each
+SC_TIME_UNITS = {
+    "SC_FS": 10**15,
+    "SC_PS": 10**12,
+    "SC_NS": 10**9,
+    "SC_US": 10**6,
+    "SC_MS": 10**3,
+    "SC_SEC": 1,
+}
+
+
+class TimeBase:
+    """
+    Integer tick time base of the simulation master.
+
+    Simulation time is kept as an integer number of ticks of ``resolution``,
+    so it never drifts and schedule points compare exactly. Values are
+    converted to seconds only at the FMI boundary and in output files.
+    """
+
+    def __init__(self, resolution: Union[str, float] = "SC_PS"):
+        """
+        Args:
+            resolution: Duration of one tick, either a SystemC time unit name
+                such as "SC_NS" or a duration in seconds
+        """
+        if isinstance(resolution, str):
+            unit = resolution.strip().upper()
+            if unit not in SC_TIME_UNITS:
+                raise ValueError(
+                    f"Unknown resolution {resolution}, expected one of "
+                    f"{list(SC_TIME_UNITS)} or a duration in seconds"
+                )
+            self.ticks_per_second: Union[int, float] = SC_TIME_UNITS[unit]
+        else:
+            if resolution <= 0:
+                raise ValueError(f"Resolution must be positive, got {resolution}")
+            self.ticks_per_second = 1.0 / resolution
+        self.resolution = resolution
+
+    def to_ticks(self, seconds: float, exact: bool = True) -> int:
+        """
+        Convert a time in seconds to a number of ticks.
+
+        Args:
+            seconds: Time to convert
+            exact: If True, raise unless the time is a whole number of ticks
+                (up to floating point error); if False, round to the nearest
+                tick, for times reported by the FMU
+
+        Returns:
+            The number of ticks
+        """
+        scaled = seconds * self.ticks_per_second
+        ticks = round(scaled)
+        if exact and not math.isclose(scaled, ticks, rel_tol=1e-9, abs_tol=1e-9):
+            raise ValueError(
+                f"Time {seconds} s is not a whole number of {self.resolution} "
+                f"ticks, use a finer resolution"
+            )
+        return ticks
+
+    def to_seconds(self, ticks: int) -> float:
+        """Convert a number of ticks to seconds."""
+        return ticks / self.ticks_per_second
+
+
+def resolution_for(times: Iterable[float], resolution: str = "SC_NS") -> str:
+    """
+    Return the coarsest SystemC unit in which every time is a whole number
+    of ticks.
+
+    Args:
+        times: Times in seconds (step size, stop time, stimuli change points)
+        resolution: Coarsest unit to consider, e.g. the resolution of the
+            config's DefaultExperiment
+
+    Returns:
+        ``resolution`` or the first finer SystemC unit that fits every time
+
+    Raises:
+        ValueError: If a time is not a whole number of SC_FS
+    """
+    units = sorted(SC_TIME_UNITS, key=SC_TIME_UNITS.get)
+    start = resolution.strip().upper()
+    if start not in SC_TIME_UNITS:
+        raise ValueError(
+            f"Unknown resolution {resolution}, expected one of {list(SC_TIME_UNITS)}"
+        )
+    times = [t for t in times if t is not None]
+    for unit in units[units.index(start) :]:
+        time_base = TimeBase(unit)
+        try:
+            for t in times:
+                time_base.to_ticks(t)
+        except ValueError:
+            continue
+        return unit
+    raise ValueError(f"The times {times} are not whole numbers of {units[-1]}")
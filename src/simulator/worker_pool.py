@@ -0,0 +1,412 @@
+import collections
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time as timer
+import traceback
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional
+
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder
+
+logger = logging.getLogger(__name__)
+
+# What a job returns: the CSV string or the dict of typed NumPy columns
+JOB_OUTPUTS = ("csv", "arrays")
+
+
+def _worker_main(conn, fmu_path: str, simulator_kwargs: Dict[str, Any]) -> None:
+    """Worker process: instantiate the FMU once, then serve jobs until stopped."""
+    try:
+        simulator = FMUSimulator(
+            fmu_path=fmu_path, log_enabled=False, **simulator_kwargs
+        )
+        simulator.setup_model()
+        simulator.initialize_fmu()
+    except Exception:
+        conn.send(("failed", traceback.format_exc()))
+        return
+    conn.send(("ready", os.getpid()))
+
+    fresh = True
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "stop":
+            break
+        if message[0] == "ping":
+            conn.send(("pong",))
+            continue
+
+        _, job_id, stimuli, output = message
+        start = timer.perf_counter()
+        try:
+            # The instance is reused: fmi3Reset instead of a new elaboration
+            if not fresh:
+                simulator.reset()
+            fresh = False
+            simulator.input_schedules = {}
+            simulator.set_stimuli(
+                {k: v for k, v in stimuli.items() if k.lower() != "interrupt"}
+            )
+            recorder = NumpyRecorder(output="arrays") if output == "arrays" else None
+            result = simulator.run(recorder)
+        except Exception as e:
+            try:
+                pickle.dumps(e)
+            except Exception:
+                e = RuntimeError(f"{type(e).__name__}: {e}")
+            conn.send(("error", job_id, e))
+            # The instance may be in an error state, let the pool replace us
+            return
+        conn.send(("done", job_id, result, timer.perf_counter() - start))
+
+    try:
+        simulator.close()
+    except Exception:
+        pass
+
+
+class _Worker:
+    """Parent-side handle of a worker process."""
+
+    def __init__(self, index: int, process, conn, failed_starts: int = 0):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.job: Optional[tuple] = None  # (job_id, future, start) or ("ping",)
+        self.deadline: Optional[float] = None
+        # Replacements in a row that died before getting ready
+        self.failed_starts = failed_starts
+        self.error: Optional[str] = None  # Traceback sent by a failed start
+
+
+class WarmWorkerPool:
+    """
+    Pool of long-lived worker processes, each holding an instantiated FMU.
+
+    Every worker pays for the interpreter start, the imports and the SystemC
+    elaboration once, then serves jobs from its pipe and resets the FMU with
+    fmi3Reset between jobs, so a small job costs milliseconds. This needs an
+    FMU generated with a working fmi3Reset.
+
+    A manager thread dispatches jobs to idle workers and watches them:
+
+    - a job running longer than ``job_timeout`` gets its worker killed and
+      replaced, and its future fails with TimeoutError;
+    - a worker that dies, fails a job or does not answer a health check ping
+      within ``ping_timeout`` is replaced as well;
+    - a replacement that fails to start (or is not ready within
+      ``start_timeout``) is started again up to ``start_retries`` times in a
+      row, then the pool is broken: queued jobs fail and submit() raises.
+
+    ``stats()`` reports jobs, failures, busy time and throughput per worker.
+    """
+
+    def __init__(
+        self,
+        fmu_path: str,
+        workers: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        health_interval: float = 5.0,
+        ping_timeout: float = 5.0,
+        start_timeout: float = 120.0,
+        start_retries: int = 3,
+        **simulator_kwargs: Any,
+    ):
+        """
+        Args:
+            fmu_path: Path to the FMU file
+            workers: Number of worker processes, defaults to the number of CPUs
+            job_timeout: Maximum duration of a job in seconds, None for no limit
+            health_interval: Seconds between two pings of the idle workers
+            ping_timeout: Seconds a worker has to answer a ping
+            start_timeout: Seconds a worker has to get ready
+            start_retries: Failed starts in a row of a replacement worker
+                before the pool gives up
+            **simulator_kwargs: FMUSimulator arguments (stop_time, step_size, ...)
+        """
+        self.fmu_path = os.path.abspath(fmu_path)
+        self.simulator_kwargs = simulator_kwargs
+        self.job_timeout = job_timeout
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.start_timeout = start_timeout
+        self.start_retries = start_retries
+        self.context = multiprocessing.get_context("spawn")
+
+        self._lock = threading.Lock()
+        self._pending: collections.deque = collections.deque()
+        self._job_ids = itertools.count()
+        self._wake_r, self._wake_w = self.context.Pipe(duplex=False)
+        self._closing = False
+        self._error: Optional[Exception] = None  # Set once the pool is broken
+        self._stats: List[Dict[str, Any]] = []
+        self.workers: List[_Worker] = []
+        for index in range(workers or os.cpu_count() or 1):
+            self._stats.append(
+                {
+                    "jobs": 0,
+                    "failed": 0,
+                    "timeouts": 0,
+                    "restarts": -1,
+                    "busy_time": 0.0,
+                }
+            )
+            self.workers.append(self._spawn(index))
+
+        # Wait for every worker to be ready, so broken setups fail here
+        deadline = timer.monotonic() + start_timeout
+        for worker in self.workers:
+            remaining = deadline - timer.monotonic()
+            if remaining <= 0 or not worker.conn.poll(remaining):
+                self._shutdown_workers()
+                raise TimeoutError("Worker pool did not start in time")
+            message = worker.conn.recv()
+            if message[0] != "ready":
+                self._shutdown_workers()
+                raise RuntimeError(f"Worker failed to start:\n{message[1]}")
+            worker.ready = True
+
+        self._next_health = timer.monotonic() + health_interval
+        self._manager = threading.Thread(
+            target=self._manage, name="warm-worker-pool", daemon=True
+        )
+        self._manager.start()
+
+    def _spawn(self, index: int, failed_starts: int = 0) -> _Worker:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(child_conn, self.fmu_path, self.simulator_kwargs),
+            name=f"fmu-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        with self._lock:
+            stats = self._stats[index]
+            stats["restarts"] += 1
+            stats["pid"] = process.pid
+        return _Worker(index, process, parent_conn, failed_starts)
+
+    # Public API
+
+    def submit(self, stimuli: Dict[str, Any], output: str = "csv") -> Future:
+        """
+        Queue a simulation job.
+
+        Args:
+            stimuli: Stimuli set, see FMUSimulator.set_stimuli()
+            output: "csv" for the CSV string, "arrays" for NumPy columns
+
+        Returns:
+            Future resolved with the result of the run
+        """
+        if output not in JOB_OUTPUTS:
+            raise ValueError(
+                f"Unknown output {output}, expected one of {list(JOB_OUTPUTS)}"
+            )
+        future: Future = Future()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("Worker pool is closed")
+            if self._error is not None:
+                raise self._error
+            self._pending.append((next(self._job_ids), future, stimuli, output))
+        self._wake_w.send_bytes(b"")
+        return future
+
+    def map(self, stimuli_sets: List[Dict[str, Any]], output: str = "csv") -> List[Any]:
+        """Run several stimuli sets and return their results in order."""
+        futures = [self.submit(stimuli, output) for stimuli in stimuli_sets]
+        return [future.result() for future in futures]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-worker counters, with throughput in jobs per busy second."""
+        with self._lock:
+            stats = [dict(s) for s in self._stats]
+        for s in stats:
+            s["throughput"] = s["jobs"] / s["busy_time"] if s["busy_time"] else 0.0
+        return stats
+
+    def close(self) -> None:
+        """Finish the running jobs, cancel the queued ones and stop the workers."""
+        with self._lock:
+            self._closing = True
+            pending = list(self._pending)
+            self._pending.clear()
+        for _, future, _, _ in pending:
+            future.set_exception(RuntimeError("Worker pool closed"))
+        self._wake_w.send_bytes(b"")
+        self._manager.join()
+        self._shutdown_workers()
+
+    def __enter__(self) -> "WarmWorkerPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # Manager thread
+
+    def _manage(self) -> None:
+        while True:
+            self._dispatch()
+            busy = [w for w in self.workers if w.job is not None]
+            if self._closing and not busy:
+                return
+
+            now = timer.monotonic()
+            deadlines = [w.deadline for w in self.workers if w.deadline is not None]
+            wake_at = min(deadlines + [self._next_health])
+            waitables = [self._wake_r]
+            for worker in self.workers:
+                waitables += [worker.conn, worker.process.sentinel]
+            ready = wait(waitables, timeout=max(0.0, wake_at - now))
+
+            if self._wake_r in ready:
+                while self._wake_r.poll():
+                    self._wake_r.recv_bytes()
+            for worker in list(self.workers):
+                if worker.conn in ready or worker.process.sentinel in ready:
+                    self._receive(worker)
+
+            now = timer.monotonic()
+            for worker in list(self.workers):
+                if worker.deadline is not None and now >= worker.deadline:
+                    if not worker.ready:
+                        error = TimeoutError(
+                            f"Worker not ready within {self.start_timeout} s"
+                        )
+                    elif worker.job[0] == "ping":
+                        error = TimeoutError(
+                            f"Worker did not answer a health check ping within "
+                            f"{self.ping_timeout} s"
+                        )
+                    else:
+                        error = TimeoutError("Job timed out")
+                    self._replace(worker, error, "timeouts")
+            if now >= self._next_health and not self._closing:
+                self._ping_idle(now)
+                self._next_health = now + self.health_interval
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            for worker in self.workers:
+                if not self._pending:
+                    return
+                if not worker.ready or worker.job is not None:
+                    continue
+                job_id, future, stimuli, output = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                worker.job = (job_id, future, timer.perf_counter())
+                worker.deadline = (
+                    timer.monotonic() + self.job_timeout if self.job_timeout else None
+                )
+                worker.conn.send(("run", job_id, stimuli, output))
+
+    def _ping_idle(self, now: float) -> None:
+        for worker in self.workers:
+            if worker.ready and worker.job is None:
+                worker.job = ("ping",)
+                worker.deadline = now + self.ping_timeout
+                worker.conn.send(("ping",))
+
+    def _receive(self, worker: _Worker) -> None:
+        try:
+            while worker.conn.poll():
+                message = worker.conn.recv()
+                self._handle(worker, message)
+        except (EOFError, OSError):
+            pass
+        if worker in self.workers and not worker.process.is_alive():
+            self._replace(worker, RuntimeError("Worker process died"), "failed")
+
+    def _handle(self, worker: _Worker, message: tuple) -> None:
+        kind = message[0]
+        if kind == "ready":
+            worker.ready = True
+            worker.deadline = None
+        elif kind == "pong":
+            worker.job = None
+            worker.deadline = None
+        elif kind in ("done", "error"):
+            _, future, start = worker.job
+            worker.job = None
+            worker.deadline = None
+            with self._lock:
+                stats = self._stats[worker.index]
+                stats["busy_time"] += timer.perf_counter() - start
+                stats["jobs" if kind == "done" else "failed"] += 1
+            if kind == "done":
+                future.set_result(message[2])
+            else:
+                future.set_exception(message[2])
+                # The worker exits after a failed job
+                self._replace(worker, message[2], "failed")
+        elif kind == "failed":
+            logger.error("Worker %d failed to start:\n%s", worker.index, message[1])
+            worker.error = message[1]
+
+    def _replace(self, worker: _Worker, error: Exception, counter: str) -> None:
+        """Kill a worker, fail its job and start a replacement."""
+        if worker.job is not None and worker.job[0] != "ping":
+            _, future, start = worker.job
+            future.set_exception(error)
+            with self._lock:
+                stats = self._stats[worker.index]
+                stats["busy_time"] += timer.perf_counter() - start
+                stats[counter] += 1
+        logger.warning("Replacing worker %d: %s", worker.index, error)
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        position = self.workers.index(worker)
+        failed_starts = 0 if worker.ready else worker.failed_starts + 1
+        if failed_starts > self.start_retries:
+            self._break(
+                RuntimeError(
+                    f"Worker {worker.index} failed to start {failed_starts} times "
+                    f"in a row: {worker.error or error}"
+                )
+            )
+        if self._closing or self._error is not None:
+            self.workers.pop(position)
+        else:
+            replacement = self._spawn(worker.index, failed_starts)
+            replacement.deadline = timer.monotonic() + self.start_timeout
+            self.workers[position] = replacement
+
+    def _break(self, error: Exception) -> None:
+        """Stop replacing workers and fail the queued and future jobs."""
+        logger.error("Worker pool broken: %s", error)
+        with self._lock:
+            self._error = error
+            pending = list(self._pending)
+            self._pending.clear()
+        for _, future, _, _ in pending:
+            future.set_exception(error)
+
+    def _shutdown_workers(self) -> None:
+        for worker in self.workers:
+            try:
+                worker.conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+        self.workers = []
@@ -5,4 +5,7 @@ void ADDER_DOUBLE::operate() {
         wait();
         result.write(op1.read() + op2.read());
     }
-}
\ No newline at end of file
+}
+
+// Called by fmi3Reset; the only state is the result port, reset by the FMU
+void ADDER_DOUBLE::fmi_reset() {}
\ No newline at end of file
@@ -9,6 +9,7 @@ SC_MODULE(ADDER_DOUBLE) {
     sc_out<double> result;
 
     void operate();
+    void fmi_reset();
 
     SC_CTOR(ADDER_DOUBLE) {
         SC_THREAD(operate);
@@ -9,6 +9,7 @@ SC_MODULE(ADDER_INT) {
     sc_out<int> result;
 
     void operate();
+    void fmi_reset();
 
     SC_CTOR(ADDER_INT) {
         SC_THREAD(operate);
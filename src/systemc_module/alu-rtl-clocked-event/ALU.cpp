@@ -52,4 +52,11 @@ void ALU::operate() {
             
         wait();
     }
+}
+
+// Called by fmi3Reset; the ports are reset by the FMU
+void ALU::fmi_reset() {
+    data1 = 0;
+    data2 = 0;
+    result = 0;
 }
\ No newline at end of file
@@ -14,6 +14,7 @@ SC_MODULE(ALU) {
     sc_uint<5> result;
 
     void operate();
+    void fmi_reset();
 
     SC_CTOR(ALU) {
         SC_THREAD(operate);
@@ -51,4 +51,10 @@ void ALU::operate() {
 
         wait();
     }
+}
+
+// Called by fmi3Reset: run operate() again in the next step, as at the start
+// of the simulation, even if the inputs keep their values
+void ALU::fmi_reset() {
+    reset_event.notify(SC_ZERO_TIME);
 }
\ No newline at end of file
@@ -12,12 +12,14 @@ SC_MODULE(ALU)
 
     sc_uint<4> data1, data2;
     sc_uint<5> result;
+    sc_event reset_event;
 
     void operate();
+    void fmi_reset();
      
 	SC_CTOR(ALU)
 	{
 		SC_THREAD(operate);
-		sensitive << OPCODE << OP1 << OP2;
+		sensitive << OPCODE << OP1 << OP2 << reset_event;
 	}
 };
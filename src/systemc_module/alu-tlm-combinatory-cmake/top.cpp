@@ -24,4 +24,8 @@ alu_data_t Top::send_data(const alu_data_t &data) {
     // std::cout << "Transaction completed" << std::endl;
     // std::cout << "result = " << result.result << std::endl;
     return result;
-}
\ No newline at end of file
+}
+
+// Called by fmi3Reset; every transaction carries all its operands, so there
+// is no state to clear
+void Top::fmi_reset() {}
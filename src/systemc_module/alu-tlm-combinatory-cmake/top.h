@@ -13,6 +13,7 @@ class Top : public sc_core::sc_module {
     Top(sc_core::sc_module_name name);
     ~Top();
     alu_data_t send_data(const alu_data_t &data);
+    void fmi_reset();
 
   private:
     Initiator *init;
@@ -0,0 +1,43 @@
+import os
+import shutil
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+# The packages live in src and are imported the way main.py imports them
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+FAKE_FMU_DIR = os.path.join(os.path.dirname(__file__), "fake_fmu")
+
+
+@pytest.fixture(scope="session")
+def adder_fmu(tmp_path_factory) -> str:
+    """Path of the Adder FMU built from tests/fake_fmu with the C compiler."""
+    from fmpy import platform_tuple
+
+    compiler = shutil.which("cc") or shutil.which("gcc")
+    if compiler is None or not sys.platform.startswith("linux"):
+        pytest.skip("Building the fake FMU needs a C compiler on Linux")
+    directory = tmp_path_factory.mktemp("fake_fmu")
+    library = directory / "Adder.so"
+    subprocess.run(
+        [
+            compiler,
+            "-shared",
+            "-fPIC",
+            "-O2",
+            "-o",
+            str(library),
+            os.path.join(FAKE_FMU_DIR, "adder.c"),
+        ],
+        check=True,
+    )
+    fmu_path = directory / "Adder.fmu"
+    with zipfile.ZipFile(fmu_path, "w") as fmu:
+        fmu.write(
+            os.path.join(FAKE_FMU_DIR, "modelDescription.xml"), "modelDescription.xml"
+        )
+        fmu.write(library, f"binaries/{platform_tuple}/Adder.so")
+    return str(fmu_path)
@@ -0,0 +1,173 @@
+/*
+ * Adder FMU standing in for a generated SystemC FMU in the tests.
+ *
+ * Each doStep sets out = a + b and big = out > 4 from the inputs set before
+ * it. $FAKE_DELAY_NS makes every step sleep that long.
+ */
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <time.h>
+
+typedef struct {
+    int32_t a, b, out;
+    bool big, clk;
+    double time, delay_ns;
+} Instance;
+
+const char* fmi3GetVersion(void) { return "3.0"; }
+
+void* fmi3InstantiateCoSimulation(const char* name, const char* token,
+    const char* resources, bool visible, bool logging, bool event_mode,
+    bool early_return, const unsigned* required, size_t n_required,
+    void* environment, void* log, void* intermediate_update) {
+    Instance* instance = calloc(1, sizeof(Instance));
+    const char* delay = getenv("FAKE_DELAY_NS");
+    if (delay) instance->delay_ns = atof(delay);
+    return instance;
+}
+
+void fmi3FreeInstance(void* instance) { free(instance); }
+
+int fmi3EnterInitializationMode(void* instance, bool has_tolerance,
+    double tolerance, double start, bool has_stop, double stop) { return 0; }
+int fmi3ExitInitializationMode(void* instance) { return 0; }
+int fmi3Terminate(void* instance) { return 0; }
+
+int fmi3Reset(void* p) {
+    Instance* i = p;
+    i->a = i->b = i->out = 0;
+    i->big = i->clk = false;
+    i->time = 0;
+    return 0;
+}
+
+int fmi3DoStep(void* p, double current, double step, bool no_set_state,
+    bool* event, bool* terminate, bool* early_return, double* last) {
+    Instance* i = p;
+    i->out = i->a + i->b;
+    i->big = i->out > 4;
+    i->time = current + step;
+    *event = *terminate = *early_return = false;
+    *last = current + step;
+    if (i->delay_ns > 0) {
+        struct timespec delay = {(time_t)(i->delay_ns / 1e9),
+                                 (long)((int64_t)i->delay_ns % 1000000000)};
+        nanosleep(&delay, NULL);
+    }
+    return 0;
+}
+
+int fmi3SetInt32(void* p, const unsigned* vr, size_t n, const int32_t* v, size_t nv) {
+    Instance* i = p;
+    for (size_t k = 0; k < n; k++) {
+        if (vr[k] == 1) i->a = v[k];
+        else if (vr[k] == 2) i->b = v[k];
+        else return 3;
+    }
+    return 0;
+}
+
+int fmi3GetInt32(void* p, const unsigned* vr, size_t n, int32_t* v, size_t nv) {
+    Instance* i = p;
+    for (size_t k = 0; k < n; k++) {
+        if (vr[k] == 1) v[k] = i->a;
+        else if (vr[k] == 2) v[k] = i->b;
+        else if (vr[k] == 3) v[k] = i->out;
+        else return 3;
+    }
+    return 0;
+}
+
+int fmi3SetBoolean(void* p, const unsigned* vr, size_t n, const bool* v, size_t nv) {
+    Instance* i = p;
+    for (size_t k = 0; k < n; k++) {
+        if (vr[k] == 5) i->clk = v[k];
+        else return 3;
+    }
+    return 0;
+}
+
+int fmi3GetBoolean(void* p, const unsigned* vr, size_t n, bool* v, size_t nv) {
+    Instance* i = p;
+    for (size_t k = 0; k < n; k++) {
+        if (vr[k] == 4) v[k] = i->big;
+        else if (vr[k] == 5) v[k] = i->clk;
+        else return 3;
+    }
+    return 0;
+}
+
+int fmi3GetFloat64(void* p, const unsigned* vr, size_t n, double* v, size_t nv) {
+    Instance* i = p;
+    for (size_t k = 0; k < n; k++) {
+        if (vr[k] == 0) v[k] = i->time;
+        else return 3;
+    }
+    return 0;
+}
+
+/* Loaded by fmpy but never called by the simulator */
+int fmi3ActivateModelPartition() { return 0; }
+int fmi3CompletedIntegratorStep() { return 0; }
+int fmi3DeserializeFMUState() { return 0; }
+int fmi3EnterConfigurationMode() { return 0; }
+int fmi3EnterContinuousTimeMode() { return 0; }
+int fmi3EnterEventMode() { return 0; }
+int fmi3EnterStepMode() { return 0; }
+int fmi3EvaluateDiscreteStates() { return 0; }
+int fmi3ExitConfigurationMode() { return 0; }
+int fmi3FreeFMUState() { return 0; }
+int fmi3GetAdjointDerivative() { return 0; }
+int fmi3GetBinary() { return 0; }
+int fmi3GetClock() { return 0; }
+int fmi3GetContinuousStateDerivatives() { return 0; }
+int fmi3GetContinuousStates() { return 0; }
+int fmi3GetDirectionalDerivative() { return 0; }
+int fmi3GetEventIndicators() { return 0; }
+int fmi3GetFMUState() { return 0; }
+int fmi3GetFloat32() { return 0; }
+int fmi3GetInt16() { return 0; }
+int fmi3GetInt64() { return 0; }
+int fmi3GetInt8() { return 0; }
+int fmi3GetIntervalDecimal() { return 0; }
+int fmi3GetIntervalFraction() { return 0; }
+int fmi3GetNominalsOfContinuousStates() { return 0; }
+int fmi3GetNumberOfContinuousStates() { return 0; }
+int fmi3GetNumberOfEventIndicators() { return 0; }
+int fmi3GetNumberOfVariableDependencies() { return 0; }
+int fmi3GetOutputDerivatives() { return 0; }
+int fmi3GetShiftDecimal() { return 0; }
+int fmi3GetShiftFraction() { return 0; }
+int fmi3GetString() { return 0; }
+int fmi3GetUInt16() { return 0; }
+int fmi3GetUInt32() { return 0; }
+int fmi3GetUInt64() { return 0; }
+int fmi3GetUInt8() { return 0; }
+int fmi3GetVariableDependencies() { return 0; }
+int fmi3InstantiateModelExchange() { return 0; }
+int fmi3InstantiateScheduledExecution() { return 0; }
+int fmi3SerializeFMUState() { return 0; }
+int fmi3SerializedFMUStateSize() { return 0; }
+int fmi3SetBinary() { return 0; }
+int fmi3SetClock() { return 0; }
+int fmi3SetContinuousStates() { return 0; }
+int fmi3SetDebugLogging() { return 0; }
+int fmi3SetFMUState() { return 0; }
+int fmi3SetFloat32() { return 0; }
+int fmi3SetFloat64() { return 0; }
+int fmi3SetInt16() { return 0; }
+int fmi3SetInt64() { return 0; }
+int fmi3SetInt8() { return 0; }
+int fmi3SetIntervalDecimal() { return 0; }
+int fmi3SetIntervalFraction() { return 0; }
+int fmi3SetShiftDecimal() { return 0; }
+int fmi3SetShiftFraction() { return 0; }
+int fmi3SetString() { return 0; }
+int fmi3SetTime() { return 0; }
+int fmi3SetUInt16() { return 0; }
+int fmi3SetUInt32() { return 0; }
+int fmi3SetUInt64() { return 0; }
+int fmi3SetUInt8() { return 0; }
+int fmi3UpdateDiscreteStates() { return 0; }
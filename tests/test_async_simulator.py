@@ -0,0 +1,114 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from simulator.async_simulator import AsyncFMUSimulator
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder
+
+STIMULI = {"a": {0.0: 5, 2e-9: 0, 4e-9: 5, 6e-9: 0, 8e-9: 5}, "b": {0.0: 1}}
+SETTINGS = {"stop_time": 10e-9, "step_size": 1e-9, "resolution": "SC_NS"}
+POSEDGES = [1e-9, 5e-9, 9e-9]
+NEGEDGES = [3e-9, 7e-9]
+
+
+@pytest.fixture
+def expected(adder_fmu):
+    """Columns of one blocking run."""
+    simulator = FMUSimulator(fmu_path=adder_fmu, log_enabled=False, **SETTINGS)
+    simulator.setup_model()
+    simulator.initialize_fmu()
+    simulator.set_stimuli(STIMULI)
+    arrays = simulator.run(NumpyRecorder(output="arrays"))
+    simulator.close()
+    return arrays
+
+
+def concat(chunks):
+    return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+
+def assert_columns_equal(actual, expected):
+    assert list(actual) == list(expected)
+    for name in expected:
+        np.testing.assert_array_equal(actual[name], expected[name], err_msg=name)
+
+
+async def simulate(adder_fmu, advance, process=False):
+    """Run ``advance(simulator)`` and return its result and the interrupts."""
+    events = []
+    async with AsyncFMUSimulator(adder_fmu, process=process, **SETTINGS) as simulator:
+        await simulator.set_stimuli(STIMULI)
+        if not process:
+            for edge in ("posedge", "negedge"):
+                await simulator.register_interrupt(
+                    edge,
+                    {"variable": "big", "value": edge},
+                    lambda event: events.append((event.name, round(event.time, 12))),
+                )
+        result = await advance(simulator)
+    return result, events
+
+
+def fired(events, edge):
+    return [time for name, time in events if name == edge]
+
+
+async def step_all(simulator):
+    chunks = []
+    while True:
+        chunk = await simulator.step(1)
+        if chunk is None:
+            return chunks
+        chunks.append(chunk)
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_run_matches_the_blocking_run(adder_fmu, expected):
+    arrays, events = asyncio.run(simulate(adder_fmu, lambda s: s.run()))
+    assert_columns_equal(arrays, expected)
+    assert fired(events, "posedge") == POSEDGES
+    assert fired(events, "negedge") == NEGEDGES
+
+
+def test_single_steps_fire_every_edge(adder_fmu, expected):
+    chunks, events = asyncio.run(simulate(adder_fmu, step_all))
+    assert len(chunks) == 10
+    assert_columns_equal(concat(chunks), expected)
+    assert fired(events, "posedge") == POSEDGES
+    assert fired(events, "negedge") == NEGEDGES
+
+
+def test_chunks_keep_edges_on_their_boundaries(adder_fmu, expected):
+    # Chunks start at 0, 3, 6 and 9 ns: the edges at 3 and 9 ns are on them
+    chunks, events = asyncio.run(
+        simulate(adder_fmu, lambda s: collect(s.chunks(chunk_steps=3, prefetch=2)))
+    )
+    assert [len(chunk["Time"]) for chunk in chunks] == [3, 3, 3, 1]
+    assert_columns_equal(concat(chunks), expected)
+    assert fired(events, "posedge") == POSEDGES
+    assert fired(events, "negedge") == NEGEDGES
+
+
+def test_rows_in_a_worker_process(adder_fmu, expected):
+    rows, _ = asyncio.run(
+        simulate(adder_fmu, lambda s: collect(s.rows(chunk_steps=4)), process=True)
+    )
+    assert rows == list(zip(*(column.tolist() for column in expected.values())))
+
+
+def test_reset_runs_again_from_the_start(adder_fmu, expected):
+    async def twice(simulator):
+        await simulator.run()
+        assert await simulator.step() is None
+        await simulator.reset()
+        assert await simulator.current_time() == 0.0
+        return await simulator.run()
+
+    arrays, events = asyncio.run(simulate(adder_fmu, twice))
+    assert_columns_equal(arrays, expected)
+    assert fired(events, "posedge") == POSEDGES * 2
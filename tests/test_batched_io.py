@@ -0,0 +1,124 @@
+import pytest
+from fmpy.fmi1 import FMICallException
+from fmpy.fmi3 import fmi3Error, fmi3OK
+
+from simulator.batched_io import BatchedIO, parse_start
+
+VARIABLE_INFO = {
+    "a": {"type": "Int32", "start": "3"},
+    "en": {"type": "Boolean", "start": "false"},
+    "b": {"type": "Int32", "start": None},
+    "x": {"type": "Float64", "start": "0.5"},
+    "out": {"type": "Int32", "start": None},
+    "flag": {"type": "Boolean", "start": None},
+}
+VRS = {name: vr for vr, name in enumerate(VARIABLE_INFO)}
+
+
+class FakeFMU:
+    """Records the batched calls and serves outputs from a dict by VR."""
+
+    def __init__(self):
+        self.component = object()
+        self.calls = []
+        self.state = {}
+        self.status = fmi3OK
+        for var_type in ("Int32", "Boolean", "Float64"):
+            setattr(self, f"fmi3Set{var_type}", self._setter(var_type))
+            setattr(self, f"fmi3Get{var_type}", self._getter(var_type))
+
+    def _setter(self, var_type):
+        def set_values(component, vrs, n_vrs, values, n_values):
+            assert component is self.component
+            self.calls.append((f"set{var_type}", list(vrs), list(values)))
+            self.state.update(zip(vrs, values))
+            return self.status
+
+        return set_values
+
+    def _getter(self, var_type):
+        def get_values(component, vrs, n_vrs, values, n_values):
+            self.calls.append((f"get{var_type}", list(vrs)))
+            for i, vr in enumerate(vrs):
+                values[i] = self.state.get(vr, 0)
+            return self.status
+
+        return get_values
+
+
+@pytest.fixture
+def io():
+    io = BatchedIO(VARIABLE_INFO, VRS, ["a", "en", "b", "x"], ["out", "flag"])
+    fmu = FakeFMU()
+    io.bind(fmu)
+    return io, fmu
+
+
+def test_groups_by_type_in_first_seen_order(io):
+    io, _ = io
+    assert [g.var_type for g in io.input_groups] == ["Int32", "Boolean", "Float64"]
+    int_group = io.input_groups[0]
+    assert int_group.names == ["a", "b"]
+    assert int_group.positions == [0, 2]
+    assert list(int_group.vrs) == [VRS["a"], VRS["b"]]
+    assert [g.names for g in io.output_groups] == [["out"], ["flag"]]
+
+
+def test_start_values_fill_the_buffers(io):
+    io, _ = io
+    assert list(io.input_groups[0].values) == [3, 0]
+    assert list(io.input_groups[1].values) == [False]
+    assert list(io.input_groups[2].values) == [0.5]
+
+
+def test_bind_marks_every_input_group_dirty(io):
+    io, fmu = io
+    io.flush()
+    assert [call[0] for call in fmu.calls] == ["setInt32", "setBoolean", "setFloat64"]
+    fmu.calls.clear()
+    io.flush()
+    assert fmu.calls == []
+
+
+def test_write_sends_only_the_changed_group(io):
+    io, fmu = io
+    io.flush()
+    fmu.calls.clear()
+    io.write(2, 7.0)  # b, cast to int
+    io.flush()
+    assert fmu.calls == [("setInt32", [VRS["a"], VRS["b"]], [3, 7])]
+
+
+def test_read_fills_outputs_in_place(io):
+    io, fmu = io
+    fmu.state = {VRS["out"]: 42, VRS["flag"]: True}
+    out = [None, None]
+    assert io.read(out) is out
+    assert out == [42, True]
+
+
+def test_fetch_fills_only_the_buffers(io):
+    io, fmu = io
+    fmu.state = {VRS["out"]: 9}
+    io.fetch()
+    assert list(io.output_groups[0].values) == [9]
+
+
+def test_error_status_raises(io):
+    io, fmu = io
+    fmu.status = fmi3Error
+    with pytest.raises(FMICallException):
+        io.flush()
+
+
+def test_unsupported_type():
+    info = {"s": {"type": "String", "start": None}}
+    with pytest.raises(ValueError, match="Unsupported variable type"):
+        BatchedIO(info, {"s": 0}, ["s"], [])
+
+
+def test_parse_start():
+    assert parse_start("Boolean", "true") is True
+    assert parse_start("Float32", "1.5") == 1.5
+    assert parse_start("UInt8", "4") == 4
+    assert parse_start("String", "abc") == "abc"
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from fmpy import extract, read_model_description
+from fmpy.fmi1 import FMICallException
+from fmpy.fmi3 import FMU3Slave
+
+from simulator.batched_io import BatchedIO
+from simulator.ctypes_backend import CTypesFMU3Slave
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder
+
+BACKEND_CLASSES = {"fmpy": FMU3Slave, "ctypes": CTypesFMU3Slave}
+
+
+@pytest.fixture
+def slaves(adder_fmu, tmp_path):
+    """One instantiated, initialized test FMU per backend."""
+    description = read_model_description(adder_fmu)
+    slaves = {}
+    for name, cls in BACKEND_CLASSES.items():
+        slave = cls(
+            guid=description.guid,
+            unzipDirectory=extract(adder_fmu, str(tmp_path / name)),
+            modelIdentifier=description.coSimulation.modelIdentifier,
+            instanceName=name,
+        )
+        slave.instantiate()
+        slave.enterInitializationMode()
+        slave.exitInitializationMode()
+        slaves[name] = slave
+    yield slaves
+    for slave in slaves.values():
+        slave.terminate()
+        slave.freeInstance()
+
+
+def trajectory(slave):
+    """Set, step and get through the typed accessors."""
+    results = []
+    for step, (a, b, clk) in enumerate([(1, 2, True), (4, 0, False), (-3, 9, True)]):
+        slave.setInt32([1, 2], [a, b])
+        slave.setBoolean([5], [clk])
+        results.append(slave.doStep(step * 1e-9, 1e-9))
+        results.append(slave.getInt32([1, 2, 3]))
+        results.append(slave.getBoolean([4, 5]))
+        results.append(slave.getFloat64([0]))
+    return results
+
+
+def test_accessors_and_steps_match_fmpy(slaves):
+    expected = trajectory(slaves["fmpy"])
+    assert trajectory(slaves["ctypes"]) == expected
+    assert expected[1:4] == [[1, 2, 3], [False, True], [1e-9]]
+
+
+def test_batched_io_matches_fmpy(adder_fmu, slaves):
+    simulator = FMUSimulator(fmu_path=adder_fmu, log_enabled=False)
+    simulator.setup_model()
+    results = {}
+    for name, slave in slaves.items():
+        io = BatchedIO(
+            simulator.variable_info, simulator.vrs, ["a", "b", "clk"], ["out", "big"]
+        )
+        io.bind(slave)
+        rows = []
+        for step in range(4):
+            io.write(io.input_index["a"], step)
+            io.write(io.input_index["b"], 2)
+            io.write(io.input_index["clk"], step % 2 == 1)
+            io.flush()
+            slave.doStep(step * 1e-9, 1e-9)
+            rows.append(io.read([None] * len(io.outputs)))
+        results[name] = rows
+    assert results["ctypes"] == results["fmpy"]
+    assert results["fmpy"][-1] == [5, True]
+
+
+def test_errors_match_fmpy(slaves):
+    for slave in slaves.values():
+        with pytest.raises(FMICallException) as error:
+            slave.getInt32([99])
+        assert "fmi3GetInt32" in str(error.value)
+
+
+def test_simulator_runs_match(adder_fmu):
+    stimuli = {
+        "a": {0.0: 1, 3e-9: 4, 6e-9: -2},
+        "b": {0.0: 0, 2e-9: 3},
+        "clk": {"type": "clock", "period": 2e-9},
+    }
+    results = {}
+    for backend in BACKEND_CLASSES:
+        simulator = FMUSimulator(
+            fmu_path=adder_fmu,
+            stop_time=10e-9,
+            step_size=1e-9,
+            resolution="SC_NS",
+            log_enabled=False,
+            backend=backend,
+        )
+        simulator.setup_model()
+        simulator.initialize_fmu()
+        simulator.set_stimuli(stimuli)
+        runs = list(
+            simulator.run_vectors(
+                [stimuli, stimuli], lambda: NumpyRecorder(output="arrays")
+            )
+        )
+        # The second run follows an fmi3Reset
+        results[backend] = runs
+    for fmpy_run, ctypes_run in zip(results["fmpy"], results["ctypes"]):
+        assert list(ctypes_run) == list(fmpy_run)
+        for name in fmpy_run:
+            np.testing.assert_array_equal(ctypes_run[name], fmpy_run[name])
+    np.testing.assert_array_equal(results["fmpy"][0]["out"], results["fmpy"][1]["out"])
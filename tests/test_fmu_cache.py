@@ -0,0 +1,65 @@
+import os
+import zipfile
+
+import pytest
+
+from simulator import fmu_cache
+from simulator.fmu_cache import FMUCache
+
+MODEL_DESCRIPTION = """<?xml version="1.0" encoding="UTF-8"?>
+<fmiModelDescription fmiVersion="3.0" modelName="{name}"
+    instantiationToken="{{{name}}}">
+  <CoSimulation modelIdentifier="{name}"/>
+  <ModelVariables>
+    <Float64 name="time" valueReference="0" causality="independent"
+        variability="continuous"/>
+  </ModelVariables>
+  <ModelStructure/>
+</fmiModelDescription>
+"""
+
+
+def make_fmu(directory, name, payload_size=1000):
+    path = os.path.join(directory, f"{name}.fmu")
+    with zipfile.ZipFile(path, "w") as fmu:
+        fmu.writestr("modelDescription.xml", MODEL_DESCRIPTION.format(name=name))
+        fmu.writestr("binaries/payload", b"\0" * payload_size)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FMUCache(str(tmp_path / "cache"), max_bytes=3000)
+
+
+def test_get_reuses_the_entry(tmp_path, cache):
+    fmu_path = make_fmu(tmp_path, "A")
+    description, unzipdir = cache.get(fmu_path)
+    assert description.modelName == "A"
+    assert os.path.isfile(os.path.join(unzipdir, "binaries", "payload"))
+    assert cache.get(fmu_path)[1] == unzipdir
+    assert len(list(cache.entries())) == 1
+
+
+def test_eviction_drops_the_least_recently_used(tmp_path, cache):
+    first, _ = os.path.split(cache.get(make_fmu(tmp_path, "A", 2000))[1])
+    cache.get(make_fmu(tmp_path, "B", 2000))
+    assert not os.path.exists(first)
+    assert len(list(cache.entries())) == 1
+
+
+@pytest.mark.skipif(fmu_cache.fcntl is None, reason="No file locking")
+def test_eviction_skips_pinned_entries(tmp_path, cache):
+    _, unzipdir, pin = cache.acquire(make_fmu(tmp_path, "A", 2000))
+    cache.get(make_fmu(tmp_path, "B", 2000))
+    # Over the limit, but the instance using A keeps its files
+    assert os.path.isfile(os.path.join(unzipdir, "binaries", "payload"))
+    assert len(list(cache.entries())) == 2
+
+    cache.clear()
+    assert [key for key, _, _ in cache.entries()] == [
+        os.path.basename(os.path.dirname(unzipdir))
+    ]
+    cache.release(pin)
+    cache.clear()
+    assert list(cache.entries()) == []
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import StringRecorder
+
+# big = a + b > 4 goes high one step after each change of a to 5
+STIMULI = {"a": {0.0: 5, 2e-9: 0, 4e-9: 5, 6e-9: 0, 8e-9: 5}}
+POSEDGES = [1e-9, 5e-9, 9e-9]
+NEGEDGES = [3e-9, 7e-9]
+
+# Interrupts seen by this process, or by a fork child before it reports
+events = []
+
+
+class EventsRecorder(StringRecorder):
+    """Returns the interrupts fired during the run instead of the CSV."""
+
+    def close(self):
+        super().close()
+        return list(events)
+
+
+def make_simulator(fmu_path, stop_time=10e-9):
+    simulator = FMUSimulator(
+        fmu_path=fmu_path,
+        stop_time=stop_time,
+        step_size=1e-9,
+        resolution="SC_NS",
+        log_enabled=False,
+    )
+    simulator.setup_model()
+    simulator.initialize_fmu()
+    simulator.set_stimuli(STIMULI)
+    for edge in ("posedge", "negedge"):
+        simulator.register_interrupt(
+            edge,
+            {"variable": "big", "value": edge},
+            lambda event: events.append((event.name, round(event.time, 12))),
+        )
+    return simulator
+
+
+def fired(edge):
+    return [time for name, time in events if name == edge]
+
+
+@pytest.fixture
+def simulator(adder_fmu):
+    events.clear()
+    simulator = make_simulator(adder_fmu)
+    yield simulator
+    simulator.close()
+
+
+def test_continuous_run_fires_every_edge(simulator):
+    simulator.run()
+    assert fired("posedge") == POSEDGES
+    assert fired("negedge") == NEGEDGES
+
+
+@pytest.mark.parametrize("split_steps", [1, 3])
+def test_resumed_segments_fire_like_one_run(simulator, split_steps):
+    stop = 0
+    while simulator.current_time < simulator.stop_time - 1e-12:
+        stop += split_steps
+        start = None if stop == split_steps else simulator.current_time
+        simulator.run(start_time=start, stop_time=min(stop, 10) * 1e-9)
+    assert fired("posedge") == POSEDGES
+    assert fired("negedge") == NEGEDGES
+
+
+def test_reset_forgets_the_previous_level(simulator):
+    simulator.run(stop_time=2e-9)
+    simulator.reset()
+    events.clear()
+    simulator.run()
+    assert fired("posedge") == POSEDGES
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Needs os.fork")
+def test_fork_children_keep_the_edge_state(simulator):
+    # The prefix ends with big high: the negedge at 3 ns crosses the fork point
+    simulator.run(stop_time=3e-9)
+    prefix = list(events)
+    results = simulator.fork([{}, {"a": {4e-9: 0}}], recorder_factory=EventsRecorder)
+    assert prefix == [("posedge", 1e-9)]
+    assert results[0] == prefix + [
+        ("negedge", 3e-9),
+        ("posedge", 5e-9),
+        ("negedge", 7e-9),
+        ("posedge", 9e-9),
+    ]
+    assert results[1] == prefix + [("negedge", 3e-9)]
@@ -0,0 +1,69 @@
+import random
+from bisect import bisect_right
+
+import pytest
+
+from simulator.input_schedule import InputSchedule, InputTimeline
+
+
+def reference_value(schedule, time):
+    """Plain bisection over the sorted schedule, no cursor."""
+    times = sorted(schedule)
+    index = bisect_right(times, time) - 1
+    return schedule[times[index]] if index >= 0 else None
+
+
+SCHEDULE = {0: 1, 5: 2, 6: 3, 20: 4}
+
+
+def test_value_at_before_start_is_none():
+    assert InputSchedule({3: 1}).value_at(2) is None
+
+
+def test_value_at_steps_through_segments():
+    schedule = InputSchedule(SCHEDULE)
+    values = [schedule.value_at(t) for t in range(25)]
+    assert values == [reference_value(SCHEDULE, t) for t in range(25)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_cursor_matches_bisect_on_random_walks(seed):
+    rng = random.Random(seed)
+    raw = {rng.randrange(1000): rng.randrange(100) for _ in range(50)}
+    schedule = InputSchedule(raw)
+    time = 0
+    for _ in range(2000):
+        # Mostly small forward steps, with jumps both ways
+        time = max(0, time + rng.choice([0, 1, 1, 2, 3, 40, -7, -300]))
+        assert schedule.value_at(time) == reference_value(raw, time)
+
+
+def test_reset_rewinds_cursor():
+    schedule = InputSchedule(SCHEDULE)
+    assert schedule.value_at(21) == 4
+    schedule.reset()
+    assert schedule.cursor == -1
+    assert schedule.value_at(0) == 1
+
+
+def test_next_change():
+    schedule = InputSchedule(SCHEDULE)
+    assert schedule.next_change(None) == 0
+    assert schedule.next_change(0) == 5
+    assert schedule.next_change(5.5) == 6
+    assert schedule.next_change(20) is None
+    assert InputSchedule({}).next_change(None) is None
+
+
+def test_timeline_reports_change_points_of_all_sources():
+    timeline = InputTimeline([InputSchedule({0: 0, 4: 1}), InputSchedule({2: 0})])
+    changed = [t for t in range(8) if timeline.advance(t)]
+    assert changed == [0, 2, 4]
+    assert timeline.next_change_time() is None
+
+
+def test_timeline_reset():
+    timeline = InputTimeline([InputSchedule({1: 0, 3: 1})])
+    assert timeline.advance(10)
+    timeline.reset()
+    assert timeline.next_change_time() == 1
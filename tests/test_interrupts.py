@@ -0,0 +1,198 @@
+import numpy as np
+import pytest
+
+from simulator.batched_io import BatchedIO
+from simulator.fmu_simulator import FMUSimulator
+from simulator.interrupts import compile_condition, evaluate_trace
+from simulator.recorders import NumpyRecorder
+
+CONDITIONS = {
+    "ZERO": {"value": "posedge"},
+    "CARRY": {"value": "anyedge"},
+    "FALL": {"variable": "ZERO", "value": "negedge"},
+    "RESULT": {"value": 2},
+    "RANGE": {"variable": "RESULT", "min": 1, "max": 3},
+    "MASK": {"variable": "RESULT", "mask": 0b110, "value": 0b010},
+    "BOTH": {
+        "all": [{"variable": "ZERO", "value": True}, {"variable": "RESULT", "max": 1}]
+    },
+    "EITHER": {
+        "any": [
+            {"variable": "CARRY", "value": "posedge"},
+            {"variable": "RESULT", "value": 3},
+        ]
+    },
+}
+
+
+def random_trace(seed, steps=500):
+    rng = np.random.default_rng(seed)
+    return {
+        "Time": np.arange(steps) * 1e-9,
+        "ZERO": rng.integers(0, 2, steps).astype(bool),
+        "CARRY": rng.integers(0, 2, steps).astype(bool),
+        "RESULT": rng.integers(0, 5, steps).astype(np.int32),
+    }
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_online_check_matches_offline_evaluate(seed):
+    trace = random_trace(seed)
+    names = ["ZERO", "CARRY", "RESULT"]
+    offline = evaluate_trace(CONDITIONS, trace)
+    for name, condition in CONDITIONS.items():
+        predicate = compile_condition(condition, name, names.index)
+        predicate.reset()
+        online = [
+            time
+            for step, time in enumerate(trace["Time"])
+            if predicate.check([trace[column][step] for column in names])
+        ]
+        np.testing.assert_array_equal(online, offline[name], err_msg=name)
+
+
+def test_combinations_feed_every_child_each_step():
+    # The edge in the second child must see the sample where the first fails
+    predicate = compile_condition(
+        {"all": [{"variable": "A", "value": 1}, {"variable": "B", "value": "posedge"}]},
+        "X",
+        ["A", "B"].index,
+    )
+    assert [predicate.check(v) for v in ([1, 0], [0, 1], [1, 1])] == [False] * 3
+
+
+def test_reset_forgets_previous_sample():
+    predicate = compile_condition({"value": "posedge"}, "A", ["A"].index)
+    assert not predicate.check([0])
+    assert predicate.check([1])
+    predicate.reset()
+    assert not predicate.check([1])
+
+
+@pytest.mark.parametrize(
+    "edge, fired",
+    [
+        ("posedge", [8, 11]),
+        ("negedge", [10]),
+        ("anyedge", [8, 10, 11]),
+    ],
+)
+def test_edges_are_exact_zero_one_transitions(edge, fired):
+    # 0->5, 5->1, 1->2, 2->0 and -1->0 are not edges, as in the original check
+    samples = [0, 5, 1, 2, 0, 0, 3, 0, 1, 1, 0, 1, -1, 0]
+    predicate = compile_condition({"value": edge}, "A", ["A"].index)
+    online = [step for step, value in enumerate(samples) if predicate.check([value])]
+    assert online == fired
+    offline = predicate.evaluate([np.array(samples, dtype=np.int32)])
+    assert list(np.flatnonzero(offline)) == fired
+
+
+@pytest.mark.parametrize("dtype", [bool, np.uint8, np.float64])
+def test_edges_of_boolean_and_float_outputs(dtype):
+    samples = np.array([0, 1, 1, 0, 1], dtype=dtype)
+    predicate = compile_condition({"value": "posedge"}, "A", ["A"].index)
+    assert [predicate.check([value]) for value in samples] == [
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert list(np.flatnonzero(predicate.evaluate([samples]))) == [1, 4]
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [{}, {"value": "sideways", "mask": None}, {"all": []}, {"min": None, "max": None}],
+)
+def test_invalid_conditions(condition):
+    with pytest.raises((ValueError, TypeError)):
+        compile_condition(condition, "A", ["A"].index)
+
+
+def test_missing_trace_column():
+    with pytest.raises(ValueError, match="not found in the trace"):
+        evaluate_trace({"NOPE": {"value": 1}}, random_trace(0))
+
+
+def make_simulator():
+    simulator = FMUSimulator(fmu_path="none.fmu", log_enabled=False, cache=False)
+    variable_info = {
+        "CLK": {"type": "Boolean", "start": "false", "causality": "input"},
+        "OP1": {"type": "Int32", "start": "4", "causality": "input"},
+        "RESULT": {"type": "Int32", "start": None, "causality": "output"},
+        "STATE": {"type": "Int32", "start": "0", "causality": "local"},
+    }
+    simulator.variable_info = variable_info
+    simulator.io = BatchedIO(
+        variable_info,
+        {n: i for i, n in enumerate(variable_info)},
+        ["CLK", "OP1"],
+        ["RESULT"],
+    )
+    return simulator
+
+
+def test_interrupt_on_input_sees_written_value():
+    simulator = make_simulator()
+    simulator.register_interrupt("CLK", {"value": "posedge"})
+    simulator.register_interrupt("OP1", {"value": 4})
+    assert simulator.check_interrupts([0]) == ["OP1"]
+    simulator.io.write(0, True)
+    simulator.io.write(1, 5)
+    assert simulator.check_interrupts([0]) == ["CLK"]
+
+
+def test_interrupt_on_local_variable_raises():
+    simulator = make_simulator()
+    with pytest.raises(ValueError, match="input and output"):
+        simulator.register_interrupt("STATE", {"value": 1})
+
+
+def test_offline_evaluation_matches_the_simulator_firings(adder_fmu):
+    conditions = {
+        "BIG_UP": {"variable": "big", "value": "posedge"},
+        "BIG_DOWN": {"variable": "big", "value": "negedge"},
+        "OUT": {"variable": "out", "value": 3},
+        "OUT_RANGE": {"variable": "out", "min": 2, "max": 5},
+        "OUT_MASK": {"variable": "out", "mask": 0b11, "value": 0b01},
+        "A_EDGE": {"variable": "a", "value": "anyedge"},
+        "EITHER": {
+            "any": [
+                {"variable": "b", "value": "posedge"},
+                {"variable": "out", "value": 0},
+            ]
+        },
+        "BOTH": {
+            "all": [
+                {"variable": "big", "value": True},
+                {"variable": "a", "value": "negedge"},
+            ]
+        },
+    }
+    rng = np.random.default_rng(0)
+    stimuli = {
+        "a": {i * 1e-9: int(v) for i, v in enumerate(rng.integers(0, 2, 200))},
+        "b": {i * 3e-9: int(v) for i, v in enumerate(rng.integers(0, 6, 67))},
+    }
+    fired = {name: [] for name in conditions}
+    simulator = FMUSimulator(
+        fmu_path=adder_fmu,
+        stop_time=200e-9,
+        step_size=1e-9,
+        resolution="SC_NS",
+        log_enabled=False,
+    )
+    simulator.setup_model()
+    simulator.initialize_fmu()
+    simulator.set_stimuli(stimuli)
+    for name, condition in conditions.items():
+        simulator.register_interrupt(
+            name, condition, lambda event: fired[event.name].append(event.time)
+        )
+    trace = simulator.run_simulation(NumpyRecorder(output="arrays"))
+
+    offline = evaluate_trace(conditions, trace)
+    for name in conditions:
+        assert len(fired[name]) > 0, name
+        np.testing.assert_array_equal(fired[name], offline[name], err_msg=name)
@@ -0,0 +1,150 @@
+import os
+import threading
+
+import pytest
+
+from simulator.isr_dispatch import HandlerRegistry, InterruptDispatcher, InterruptEvent
+
+
+def event(step):
+    return InterruptEvent(name="irq", time=step * 1e-9, step=step)
+
+
+class Gate:
+    """Handler that blocks the dispatcher thread until opened."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.opened = threading.Event()
+
+    def __call__(self, event):
+        self.entered.set()
+        assert self.opened.wait(10)
+
+
+@pytest.fixture
+def delivered():
+    return []
+
+
+def blocked_dispatcher(**kwargs):
+    """Thread dispatcher whose thread is stuck in a handler."""
+    dispatcher = InterruptDispatcher("thread", **kwargs)
+    dispatcher.start()
+    gate = Gate()
+    dispatcher.dispatch(gate, event(0))
+    assert gate.entered.wait(10)
+    return dispatcher, gate
+
+
+def test_sync_mode_calls_handlers_inline(delivered):
+    dispatcher = InterruptDispatcher()
+    dispatcher.start()
+    assert dispatcher.worker is None
+    assert dispatcher.dispatch(delivered.append, event(1))
+    assert delivered == [event(1)]
+    assert dispatcher.stats() == {
+        "dispatched": 1,
+        "handled": 1,
+        "failed": 0,
+        "dropped": 0,
+        "depth": 0,
+        "max_depth": 0,
+    }
+
+
+def test_legacy_handlers_are_called_without_the_event(delivered):
+    class Legacy:
+        def __call__(self):
+            delivered.append("object")
+
+    def legacy(*, option=None):
+        delivered.append("keyword-only")
+
+    dispatcher = InterruptDispatcher()
+    dispatcher.dispatch(lambda: delivered.append("lambda"), event(1))
+    dispatcher.dispatch(Legacy(), event(2))
+    dispatcher.dispatch(legacy, event(3))
+    dispatcher.dispatch(lambda *args: delivered.append(args), event(4))
+    assert delivered == ["lambda", "object", "keyword-only", (event(4),)]
+    assert dispatcher.handled == 4
+
+
+def test_non_blocking_queue_drops_and_counts(delivered):
+    dispatcher, gate = blocked_dispatcher(maxsize=2, blocking=False)
+    results = [dispatcher.dispatch(delivered.append, event(i)) for i in range(1, 6)]
+    assert results == [True, True, False, False, False]
+    assert dispatcher.depth == 2
+    gate.opened.set()
+    dispatcher.stop()
+    assert delivered == [event(1), event(2)]
+    stats = dispatcher.stats()
+    assert (stats["dispatched"], stats["handled"], stats["dropped"]) == (3, 3, 3)
+    assert stats["max_depth"] == 2
+
+
+def test_blocking_queue_waits_for_room(delivered):
+    dispatcher, gate = blocked_dispatcher(maxsize=1)
+    dispatcher.dispatch(delivered.append, event(1))
+    producer = threading.Thread(
+        target=lambda: [dispatcher.dispatch(delivered.append, event(i)) for i in (2, 3)]
+    )
+    producer.start()
+    # The queue is full, so the producer is held back instead of dropping
+    producer.join(0.2)
+    assert producer.is_alive()
+    gate.opened.set()
+    producer.join(10)
+    dispatcher.stop()
+    assert delivered == [event(1), event(2), event(3)]
+    assert (dispatcher.dropped, dispatcher.dispatched) == (0, 4)
+
+
+def test_stop_delivers_the_queued_events(delivered):
+    dispatcher, gate = blocked_dispatcher(maxsize=16)
+    for i in range(1, 11):
+        dispatcher.dispatch(delivered.append, event(i))
+    stopper = threading.Thread(target=dispatcher.stop)
+    stopper.start()
+    gate.opened.set()
+    stopper.join(10)
+    assert delivered == [event(i) for i in range(1, 11)]
+    assert dispatcher.handled == 11
+    assert dispatcher.worker is None and dispatcher.depth == 0
+
+
+def test_failing_handlers(caplog):
+    def fail(event):
+        raise KeyError(event.step)
+
+    dispatcher = InterruptDispatcher()
+    with pytest.raises(KeyError):
+        dispatcher.dispatch(fail, event(1))
+    assert dispatcher.failed == 1
+
+    # The dispatcher thread logs the failure and serves the next events
+    with InterruptDispatcher("thread") as dispatcher:
+        dispatcher.dispatch(fail, event(2))
+        dispatcher.dispatch(lambda: None, event(3))
+    assert (dispatcher.failed, dispatcher.handled) == (1, 1)
+    assert "Interrupt handler for irq failed" in caplog.text
+
+
+def test_bad_settings():
+    with pytest.raises(ValueError, match="Unknown dispatch mode"):
+        InterruptDispatcher("process")
+    with pytest.raises(ValueError, match="at least 1"):
+        InterruptDispatcher("thread", maxsize=0)
+
+
+def test_registry_resolves_names_and_dotted_paths():
+    registry = HandlerRegistry()
+    handler = registry.register("on_irq", print)
+    assert registry.resolve("on_irq") is handler
+    assert registry.resolve("os.path.join") is os.path.join
+    with pytest.raises(ValueError, match="Unknown interrupt handler"):
+        registry.resolve("missing")
+    with pytest.raises(ValueError, match="Cannot import"):
+        registry.resolve("os.path.missing")
+    with pytest.raises(ValueError, match="not callable"):
+        registry.register("value", 1)
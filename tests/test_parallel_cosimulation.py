@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from simulator.fmu_cache import FMUCache
+from simulator.parallel_cosimulation import TRANSPORTS, ParallelCoSimulation
+from simulator.recorders import NumpyRecorder
+
+
+def make_master(adder_fmu, transport, **settings):
+    fmus = {
+        name: {"path": adder_fmu, "step_size": 1e-9, **settings}
+        for name in ("first", "second")
+    }
+    return ParallelCoSimulation(
+        fmus=fmus,
+        connections=[["first.out", "second.a"]],
+        stop_time=4e-9,
+        resolution="SC_NS",
+        stimuli={"first.a": {0.0: 1}, "first.b": {0.0: 2}, "second.b": {0.0: 10}},
+        transport=transport,
+        ordering="gauss-seidel",
+    )
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+def test_close_deletes_the_extracted_mirrors(adder_fmu, transport):
+    master = make_master(adder_fmu, transport)
+    master.setup()
+    unzipdirs = [simulator.unzipdir for simulator in master.simulators]
+    try:
+        arrays = master.run(NumpyRecorder(output="arrays"))
+    finally:
+        master.close()
+    assert list(arrays["second.out"])[1:] == [13, 13, 13]
+    assert not any(os.path.exists(unzipdir) for unzipdir in unzipdirs)
+
+
+def test_close_unpins_the_cache_entries(adder_fmu, tmp_path):
+    cache = FMUCache(str(tmp_path / "cache"))
+    master = make_master(adder_fmu, "pipe", cache=cache)
+    master.setup()
+    pins = [simulator.cache_pin for simulator in master.simulators]
+    master.close()
+    assert all(pin is not None and pin.closed for pin in pins)
+    cache.clear()
+    assert list(cache.entries()) == []
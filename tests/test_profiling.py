@@ -0,0 +1,78 @@
+import json
+import random
+
+import pytest
+
+from simulator.profiling import PHASE_GET, PHASES, Histogram, StepProfiler
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def test_small_values_are_exact():
+    histogram = Histogram(precision=7)
+    for value in range(100):
+        histogram.add(value)
+    assert histogram.percentile(50) == 49
+    assert histogram.percentile(100) == 99
+
+
+@pytest.mark.parametrize("percent", [1, 50, 90, 99, 99.9, 100])
+def test_percentile_within_bucket_precision(percent):
+    rng = random.Random(1)
+    values = [int(rng.lognormvariate(9, 2)) for _ in range(20000)]
+    histogram = Histogram(precision=7)
+    for value in values:
+        histogram.add(value)
+    exact = exact_percentile(values, percent)
+    approx = histogram.percentile(percent)
+    assert exact <= approx <= exact * (1 + 2 ** (1 - 7))
+
+
+def test_bucket_bounds_round_trip():
+    histogram = Histogram(precision=5)
+    for value in range(1, 1 << 16):
+        index = histogram._index(value)
+        assert histogram._highest(index) >= value
+        assert histogram._index(histogram._highest(index)) == index
+
+
+def test_overflow_keeps_exact_max():
+    histogram = Histogram(precision=7, max_value=1000)
+    histogram.add(10**9)
+    assert histogram.counts[-1] == 1
+    assert histogram.max == 10**9
+    assert histogram.percentile(100) == 10**9
+
+
+def test_reset_and_empty():
+    histogram = Histogram()
+    assert histogram.percentile(99) == 0
+    histogram.add(5)
+    histogram.reset()
+    assert (histogram.count, histogram.total, histogram.max) == (0, 0, 0)
+    assert sum(histogram.counts) == 0
+
+
+def test_profiler_report():
+    profiler = StepProfiler()
+    profiler.histograms[PHASE_GET].add(300)
+    profiler.histograms[PHASE_GET].add(100)
+    report = profiler.report()
+    assert list(report["phases"]) == list(PHASES)
+    assert report["total_ns"] == 400
+    get = report["phases"]["get"]
+    assert (get["count"], get["mean_ns"], get["share"]) == (2, 200.0, 1.0)
+    assert json.loads(profiler.to_json()) == report
+    assert profiler.format_table().splitlines()[0].startswith("phase")
+
+
+def test_lap_charges_the_closed_phase():
+    profiler = StepProfiler()
+    profiler.start()
+    profiler.lap(PHASE_GET)
+    assert profiler.histograms[PHASE_GET].count == 1
+    assert sum(h.count for h in profiler.histograms) == 1
@@ -0,0 +1,193 @@
+import csv
+import gzip
+import io
+
+import numpy as np
+import pytest
+
+from simulator.batched_io import FMI3_NUMPY_DTYPES
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import CSVRecorder, NumpyRecorder, StringRecorder
+
+COLUMNS = ["Time", "a", "clk", "out", "big", "level"]
+TYPES = ["Float64", "Int32", "Boolean", "Int32", "Boolean", "Float64"]
+ROWS = [
+    (i * 1e-9, [i if i > 1 else None, i % 2 == 0], [2 * i, i > 3, i / 3])
+    for i in range(7)
+]
+
+
+def baseline_csv(columns, rows):
+    """CSV string as built by the original run_simulation()."""
+    inputs = len(rows[0][1])
+    csv_data = [
+        "Time,"
+        + ",".join(columns[1 : 1 + inputs])
+        + ","
+        + ",".join(columns[1 + inputs :])
+    ]
+    for time, input_values, output_values in rows:
+        row_values = [f"{time}"]
+        for value in input_values:
+            row_values.append(str(value) if value is not None else "")
+        for value in output_values:
+            row_values.append(str(value))
+        csv_data.append(",".join(row_values))
+    return "\n".join(csv_data)
+
+
+def record(recorder, rows=ROWS):
+    recorder.open(COLUMNS, TYPES)
+    for time, inputs, outputs in rows:
+        recorder.record(time, inputs, outputs)
+    return recorder.close()
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, 1000])
+def test_string_recorder_matches_the_baseline_format(chunk_rows):
+    assert record(StringRecorder(chunk_rows=chunk_rows)) == baseline_csv(COLUMNS, ROWS)
+
+
+def test_string_recorder_starts_over_on_each_run():
+    recorder = StringRecorder()
+    record(recorder)
+    assert record(recorder, ROWS[:2]) == baseline_csv(COLUMNS, ROWS[:2])
+
+
+def test_string_recorder_output_of_a_run(adder_fmu):
+    simulator = FMUSimulator(
+        fmu_path=adder_fmu,
+        stop_time=4e-9,
+        step_size=1e-9,
+        resolution="SC_NS",
+        log_enabled=False,
+    )
+    simulator.setup_model()
+    simulator.initialize_fmu()
+    simulator.set_stimuli({"b": {0.0: 2, 2e-9: 3}})
+    assert simulator.run_simulation() == (
+        "Time,b,out,big\n"
+        "0.0,2,0,False\n"
+        "1e-09,2,2,False\n"
+        "2e-09,3,2,False\n"
+        "3e-09,3,3,False"
+    )
+
+
+def read_rows(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+def test_csv_recorder_flushes_in_chunks(tmp_path):
+    path = str(tmp_path / "run.csv")
+    recorder = CSVRecorder(path, chunk_rows=3)
+    recorder.open(COLUMNS, TYPES)
+    for time, inputs, outputs in ROWS[:4]:
+        recorder.record(time, inputs, outputs)
+    # The header and the first two rows made a chunk, the next two are buffered
+    with open(path) as f:
+        assert len(read_rows(f.read())) == 3
+    for time, inputs, outputs in ROWS[4:]:
+        recorder.record(time, inputs, outputs)
+    assert recorder.close() == path
+    with open(path) as f:
+        text = f.read()
+    assert text == baseline_csv(COLUMNS, ROWS) + "\n"
+
+
+@pytest.mark.parametrize("chunk_rows", [2, 1000])
+def test_csv_recorder_gzip_reads_back_the_same_rows(tmp_path, chunk_rows):
+    plain = record(CSVRecorder(str(tmp_path / "run.csv"), chunk_rows=chunk_rows))
+    compressed = record(
+        CSVRecorder(str(tmp_path / "run.csv.gz"), chunk_rows=chunk_rows)
+    )
+    with open(plain) as f:
+        expected = read_rows(f.read())
+    with gzip.open(compressed, "rt") as f:
+        assert read_rows(f.read()) == expected
+    assert len(expected) == len(ROWS) + 1
+
+
+def test_csv_recorder_compress_overrides_the_extension(tmp_path):
+    path = record(CSVRecorder(str(tmp_path / "run.gz"), compress=False))
+    with open(path) as f:
+        assert f.read() == baseline_csv(COLUMNS, ROWS) + "\n"
+    path = record(CSVRecorder(str(tmp_path / "run.csv"), compress=True))
+    with gzip.open(path, "rt") as f:
+        assert f.read() == baseline_csv(COLUMNS, ROWS) + "\n"
+
+
+def test_csv_recorder_needs_a_path_or_a_stream():
+    with pytest.raises(ValueError, match="path or a stream"):
+        CSVRecorder()
+
+
+def test_numpy_recorder_grows_past_the_initial_capacity():
+    recorder = NumpyRecorder(initial_rows=2, growth=1.5, output="arrays")
+    rows = [(i * 1e-9, [i, True], [2 * i, False, i / 4]) for i in range(50)]
+    arrays = record(recorder, rows)
+    assert recorder.capacity >= 50 > recorder.initial_rows
+    assert list(arrays["Time"]) == [time for time, _, _ in rows]
+    assert list(arrays["a"]) == list(range(50))
+    assert list(arrays["out"]) == [2 * i for i in range(50)]
+    assert list(arrays["level"]) == [i / 4 for i in range(50)]
+
+
+def test_numpy_recorder_column_dtypes_follow_the_fmi_types():
+    types = list(FMI3_NUMPY_DTYPES) + ["String"]
+    columns = ["Time"] + [f"x{i}" for i in range(len(types) - 1)]
+    recorder = NumpyRecorder(output="arrays")
+    recorder.open(columns, ["Float64"] + types[1:])
+    recorder.record(0.0, [], [1] * (len(types) - 2) + ["text"])
+    arrays = recorder.close()
+    expected = [np.dtype(np.float64)]
+    expected += [np.dtype(FMI3_NUMPY_DTYPES[t]) for t in types[1:-1]]
+    expected += [np.dtype(object)]
+    assert [arrays[name].dtype for name in columns] == expected
+    assert arrays[columns[-1]][0] == "text"
+
+
+def test_numpy_recorder_fills_unset_inputs():
+    arrays = record(NumpyRecorder(output="arrays"))
+    # The Int32 input a has no value in the first two rows
+    assert list(arrays["a"][:3]) == [0, 0, 2]
+    recorder = NumpyRecorder(output="arrays")
+    recorder.open(["Time", "x", "y"], ["Float64", "Float64", "Float32"])
+    recorder.record(0.0, [None, None], [])
+    recorder.record(1e-9, [0.5, 1.5], [])
+    arrays = recorder.close()
+    assert np.isnan(arrays["x"][0]) and np.isnan(arrays["y"][0])
+    assert (arrays["x"][1], arrays["y"][1]) == (0.5, 1.5)
+
+
+def test_numpy_recorder_dataframe_output():
+    frame = record(NumpyRecorder())
+    assert frame.index.name == "Time"
+    assert list(frame.index) == [time for time, _, _ in ROWS]
+    assert list(frame.columns) == COLUMNS[1:]
+    assert list(frame["out"]) == [2 * i for i in range(len(ROWS))]
+    assert frame["big"].dtype == np.bool_
+
+
+@pytest.mark.parametrize("name", ["run.npz", "columns"])
+def test_numpy_recorder_saves_on_close(tmp_path, name):
+    path = str(tmp_path / name)
+    arrays = record(NumpyRecorder(output="arrays", path=path))
+    if name.endswith(".npz"):
+        with np.load(path) as saved:
+            assert sorted(saved.files) == sorted(COLUMNS)
+            saved = {column: saved[column] for column in COLUMNS}
+    else:
+        saved = {
+            column: np.load(tmp_path / name / f"{column}.npy") for column in COLUMNS
+        }
+    for column in COLUMNS:
+        np.testing.assert_array_equal(saved[column], arrays[column])
+        assert saved[column].dtype == arrays[column].dtype
+
+
+def test_numpy_recorder_rejects_bad_arguments():
+    with pytest.raises(ValueError, match="Unknown output"):
+        NumpyRecorder(output="csv")
+    with pytest.raises(ValueError, match="growth"):
+        NumpyRecorder(growth=1.0)
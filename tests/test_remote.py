@@ -0,0 +1,215 @@
+import socket
+import threading
+
+import pytest
+from fmpy import read_model_description
+
+from simulator import remote
+from simulator.fmu_cache import FMUCache
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder
+from simulator.remote import (
+    OP_AUTH,
+    OP_GET,
+    OP_LOAD,
+    OP_SET,
+    REPLY,
+    REQUEST,
+    STATUS_EXCEPTION,
+    RemoteFMU3Slave,
+    serve_connection,
+)
+
+TOKEN = "secret"
+
+
+def frame(opcode, payload=b""):
+    return REQUEST.pack(opcode, len(payload)) + payload
+
+
+def read_replies(sock, count):
+    data = b""
+    replies = []
+    while len(replies) < count:
+        chunk = sock.recv(1 << 16)
+        if not chunk:
+            break
+        data += chunk
+        while len(data) >= REPLY.size:
+            status, length = REPLY.unpack_from(data)
+            if len(data) < REPLY.size + length:
+                break
+            replies.append((status, data[REPLY.size : REPLY.size + length]))
+            data = data[REPLY.size + length :]
+    return replies
+
+
+class FakeSession:
+    """Echoes each payload reversed, with the opcode as status."""
+
+    sessions = []
+
+    def __init__(self, cache, store):
+        self.requests = []
+        self.closed = False
+        FakeSession.sessions.append(self)
+
+    def handle(self, opcode, payload):
+        self.requests.append((opcode, payload))
+        return opcode, payload[::-1]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_worker(monkeypatch, tmp_path):
+    """Client end of a socket pair served by serve_connection and FakeSession."""
+    monkeypatch.setattr(remote, "_Session", FakeSession)
+    FakeSession.sessions = []
+    client, server = socket.socketpair()
+    cache = FMUCache(str(tmp_path / "cache"))
+
+    def serve():
+        with server:
+            serve_connection(server, cache, str(tmp_path), TOKEN)
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    yield client
+    client.close()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+
+def test_frames_round_trip_in_request_order(fake_worker):
+    # The token and two requests in one send, then a request in two pieces
+    fake_worker.sendall(
+        frame(OP_AUTH, TOKEN.encode()) + frame(OP_SET, b"abc") + frame(OP_GET)
+    )
+    assert read_replies(fake_worker, 3) == [(0, b""), (OP_SET, b"cba"), (OP_GET, b"")]
+    request = frame(OP_LOAD, b"x" * 100)
+    fake_worker.sendall(request[:7])
+    fake_worker.sendall(request[7:])
+    assert read_replies(fake_worker, 1) == [(OP_LOAD, b"x" * 100)]
+    fake_worker.shutdown(socket.SHUT_WR)
+    assert read_replies(fake_worker, 1) == []
+
+    (session,) = FakeSession.sessions
+    assert session.requests == [(OP_SET, b"abc"), (OP_GET, b""), (OP_LOAD, b"x" * 100)]
+    assert session.closed
+
+
+@pytest.mark.parametrize(
+    "first",
+    [frame(OP_AUTH, b"wrong"), frame(OP_AUTH), frame(OP_LOAD, b"digest")],
+    ids=["wrong-token", "empty-token", "no-auth"],
+)
+def test_unauthenticated_connections_are_closed(fake_worker, first):
+    fake_worker.sendall(first + frame(OP_SET, b"abc"))
+    assert read_replies(fake_worker, 2) == [
+        (STATUS_EXCEPTION, b"Authentication failed")
+    ]
+    assert FakeSession.sessions == []
+
+
+class CountingSocket:
+    """Counts the sends of a client socket."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.sends = 0
+
+    def sendall(self, data):
+        self.sends += 1
+        self.sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+@pytest.fixture
+def worker_address(tmp_path):
+    """Address of a worker serving one TCP connection from a thread."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    cache = FMUCache(str(tmp_path / "worker"))
+
+    def serve():
+        sock, _ = listener.accept()
+        with sock:
+            serve_connection(sock, cache, str(tmp_path), TOKEN)
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    yield "127.0.0.1:%d" % listener.getsockname()[1]
+    thread.join(timeout=10)
+    listener.close()
+    assert not thread.is_alive()
+
+
+def connect(adder_fmu, address):
+    description = read_model_description(adder_fmu)
+    return RemoteFMU3Slave(
+        guid=description.guid,
+        unzipDirectory=None,
+        modelIdentifier="Adder",
+        address=address,
+        fmu_path=adder_fmu,
+    )
+
+
+def test_client_rejects_a_wrong_token(adder_fmu, worker_address):
+    with pytest.raises(RuntimeError, match="Authentication failed"):
+        connect(adder_fmu, f"wrong@{worker_address}")
+
+
+def test_get_prefetches_every_group_read_after_a_step(adder_fmu, worker_address):
+    fmu = connect(adder_fmu, f"{TOKEN}@{worker_address}")
+    try:
+        fmu.instantiate()
+        fmu.enterInitializationMode()
+        fmu.exitInitializationMode()
+        fmu.setInt32([1, 2], [2, 3])
+        fmu.doStep(0.0, 1e-9)
+        assert fmu.getInt32([3]) == [5]
+        assert fmu.getBoolean([4]) == [True]
+
+        # Deferred steps and sets go out with the next read, which now
+        # fetches both groups read after the previous step, in that order
+        fmu.sock = counting = CountingSocket(fmu.sock)
+        fmu.setInt32([1], [-1])
+        fmu.doStep(1e-9, 1e-9)
+        fmu.setInt32([2], [1])
+        fmu.doStep(2e-9, 1e-9)
+        sends = counting.sends
+        assert fmu.getBoolean([4]) == [False]
+        assert fmu.getInt32([3]) == [0]
+        assert fmu.getFloat64([0]) == [pytest.approx(3e-9)]
+        # One send for both prefetched groups, one for the new group
+        assert counting.sends == sends + 2
+        fmu.terminate()
+    finally:
+        fmu.freeInstance()
+
+
+def test_remote_backend_matches_the_local_run(adder_fmu, worker_address):
+    stimuli = {"a": {0.0: 1, 2e-9: 4}, "b": {0.0: 0, 3e-9: 2}, "clk": {0.0: True}}
+    results = []
+    for backend in ("fmpy", "remote"):
+        simulator = FMUSimulator(
+            fmu_path=adder_fmu,
+            stop_time=5e-9,
+            step_size=1e-9,
+            resolution="SC_NS",
+            log_enabled=False,
+            backend=backend,
+            remote=f"{TOKEN}@{worker_address}",
+        )
+        simulator.setup_model()
+        simulator.initialize_fmu()
+        simulator.set_stimuli(stimuli)
+        results.append(simulator.run_simulation(NumpyRecorder(output="arrays")))
+    local, served = results
+    assert list(served) == list(local)
+    for name in local:
+        assert list(served[name]) == list(local[name])
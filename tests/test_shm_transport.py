@@ -0,0 +1,102 @@
+import multiprocessing
+
+import pytest
+
+from simulator.shm_transport import (
+    OP_CLOSE,
+    OP_STEP,
+    STATUS_OK,
+    ShmChannel,
+    shm_supported,
+)
+
+pytestmark = pytest.mark.skipif(not shm_supported(), reason="Needs x86 ordering")
+
+
+def echo_worker(spec):
+    """Double the Int32 inputs into the outputs and answer with the mask."""
+    channel = ShmChannel.attach(spec)
+    try:
+        while True:
+            opcode, time, step_size, dirty = channel.receive_command()
+            if opcode != OP_STEP:
+                break
+            channel.output_views[0][:] = channel.input_views[0] * 2
+            channel.outputs[1][0] = time + step_size
+            channel.send_response(dirty)
+    finally:
+        channel.close()
+
+
+@pytest.fixture
+def channel():
+    channel = ShmChannel.create([("Int32", 3)], [("Int32", 3), ("Float64", 1)], 4)
+    yield channel
+    channel.unlink()
+
+
+def test_commands_arrive_in_order_across_wraparound(channel):
+    sent = []
+    received = []
+    for lap in range(5):
+        # Fill the ring, then drain it: positions wrap every 4 commands
+        for i in range(channel.capacity):
+            command = (OP_STEP, float(len(sent)), 1e-9, lap * 10 + i)
+            channel.send_command(*command)
+            sent.append(command)
+        while len(received) < len(sent):
+            received.append(channel.receive_command())
+    assert [command[3] for command in received] == [
+        lap * 10 + i for lap in range(5) for i in range(4)
+    ]
+    assert received == sent
+
+
+def test_full_ring_detects_a_dead_peer(channel):
+    channel.spin = 0
+    for _ in range(channel.capacity):
+        channel.send_command(OP_STEP, alive=lambda: False)
+    with pytest.raises(RuntimeError, match="Peer process of the channel died"):
+        channel.send_command(OP_STEP, alive=lambda: False)
+
+
+def test_attached_worker_shares_buffers_and_rings(channel):
+    context = multiprocessing.get_context("spawn")
+    worker = context.Process(target=echo_worker, args=(channel.spec,), daemon=True)
+    worker.start()
+    try:
+        for step in range(12):
+            channel.input_views[0][:] = [step, -step, 7]
+            channel.send_command(OP_STEP, step * 1e-9, 1e-9, 1, alive=worker.is_alive)
+            assert channel.receive_response(alive=worker.is_alive) == 1
+            assert list(channel.output_views[0]) == [2 * step, -2 * step, 14]
+            assert channel.outputs[1][0] == pytest.approx((step + 1) * 1e-9)
+
+        # Pipelined: a ring's worth of commands before any response
+        for dirty in range(channel.capacity):
+            channel.send_command(OP_STEP, dirty=dirty, alive=worker.is_alive)
+        statuses = [
+            channel.receive_response(alive=worker.is_alive)
+            for _ in range(channel.capacity)
+        ]
+        assert statuses == list(range(channel.capacity))
+        assert statuses[0] == STATUS_OK
+
+        channel.send_command(OP_CLOSE, alive=worker.is_alive)
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    finally:
+        if worker.is_alive():
+            worker.kill()
+            worker.join()
+
+
+def test_receive_detects_a_dead_worker(channel):
+    context = multiprocessing.get_context("spawn")
+    worker = context.Process(target=echo_worker, args=(channel.spec,), daemon=True)
+    worker.start()
+    worker.kill()
+    worker.join()
+    channel.send_command(OP_STEP, alive=worker.is_alive)
+    with pytest.raises(RuntimeError, match="Peer process of the channel died"):
+        channel.receive_response(alive=worker.is_alive)
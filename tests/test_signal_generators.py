@@ -0,0 +1,115 @@
+import pytest
+
+from simulator.signal_generators import (
+    ClockGenerator,
+    CounterGenerator,
+    PatternGenerator,
+    PWMGenerator,
+    RampGenerator,
+    RandomGenerator,
+    create_generator,
+)
+from simulator.time_base import TimeBase
+
+
+def changes(generator, stop):
+    """Change points up to ``stop``, following next_change()."""
+    points = []
+    time = generator.next_change(None)
+    while time is not None and time <= stop:
+        points.append(time)
+        time = generator.next_change(time)
+    return points
+
+
+def assert_consistent(generator, stop):
+    """The value only changes at the points next_change() reports."""
+    points = set(changes(generator, stop))
+    for time in range(1, stop + 1):
+        if generator.value_at(time) != generator.value_at(time - 1):
+            assert time in points, time
+
+
+def test_clock_values_and_edges():
+    clock = ClockGenerator(period=10, phase=5)
+    assert [clock.value_at(t) for t in (0, 4, 5, 9, 10, 14, 15)] == [
+        0,
+        0,
+        1,
+        1,
+        0,
+        0,
+        1,
+    ]
+    assert changes(clock, 30) == [0, 5, 10, 15, 20, 25, 30]
+    assert_consistent(clock, 50)
+
+
+def test_pwm_duty_sequence():
+    pwm = PWMGenerator(period=10, duty=[0.2, 0.7])
+    assert [pwm.value_at(t) for t in (0, 2, 10, 16, 17)] == [1, 0, 1, 1, 0]
+    assert_consistent(pwm, 60)
+
+
+@pytest.mark.parametrize("duty", [0.0, 1.0])
+def test_constant_pwm_never_changes(duty):
+    assert PWMGenerator(period=10, duty=duty).next_change(0) is None
+
+
+def test_counter_wraps():
+    counter = CounterGenerator(period=4, start=1, step=2, modulo=5)
+    assert [counter.value_at(t) for t in (0, 4, 8, 12)] == [1, 3, 0, 2]
+    assert changes(counter, 12) == [0, 4, 8, 12]
+
+
+def test_ramp_holds_stop():
+    ramp = RampGenerator(duration=10, period=4, start=0.0, stop=1.0)
+    assert [ramp.value_at(t) for t in (0, 4, 8, 10, 100)] == [0.0, 0.4, 0.8, 1.0, 1.0]
+    assert changes(ramp, 100) == [0, 4, 8, 10]
+    assert_consistent(ramp, 20)
+
+
+def test_random_is_reproducible_and_bounded():
+    first = RandomGenerator(period=3, low=-2, high=2, seed=7)
+    second = RandomGenerator(period=3, low=-2, high=2, seed=7)
+    values = [first.value_at(t) for t in range(300)]
+    assert values == [second.value_at(t) for t in range(300)]
+    assert set(values) <= {-2, -1, 0, 1, 2}
+    assert_consistent(first, 300)
+
+
+def test_pattern_repeat_and_hold():
+    assert [PatternGenerator([1, 2], 5).value_at(t) for t in (0, 5, 10)] == [1, 2, 1]
+    held = PatternGenerator([1, 2], 5, repeat=False)
+    assert held.value_at(100) == 2
+    assert changes(held, 100) == [0, 5]
+
+
+@pytest.mark.parametrize(
+    "cls, kwargs",
+    [
+        (ClockGenerator, {"period": 0}),
+        (CounterGenerator, {"period": -1}),
+        (RampGenerator, {"duration": 0, "period": 1}),
+        (PatternGenerator, {"pattern": [], "period": 1}),
+    ],
+)
+def test_invalid_parameters(cls, kwargs):
+    with pytest.raises(ValueError):
+        cls(**kwargs)
+
+
+def test_create_generator_converts_durations():
+    generator = create_generator(
+        {"generator": "clock", "period": 0.1e-9, "phase": 0.05e-9},
+        TimeBase("SC_PS").to_ticks,
+    )
+    assert (generator.period, generator.phase) == (100, 50)
+
+
+def test_create_generator_errors():
+    to_ticks = TimeBase("SC_PS").to_ticks
+    with pytest.raises(ValueError, match="Unknown generator"):
+        create_generator({"generator": "sine"}, to_ticks)
+    with pytest.raises(ValueError, match="Invalid parameters"):
+        create_generator({"generator": "counter", "period": 1e-9, "x": 1}, to_ticks)
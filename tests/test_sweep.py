@@ -0,0 +1,153 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from simulator.fmu_simulator import FMUSimulator
+from simulator.recorders import NumpyRecorder, SharedColumns, SharedMemoryRecorder
+from simulator.sweep import apply_override, expand_variants, row_capacity, run_sweep
+
+BASE = {"a": {0.0: 1}, "clk": {"type": "clock", "period": 2e-9}}
+
+
+def test_apply_override():
+    stimuli = {"a": {0.0: 1}, "clk": {"type": "clock", "period": 2e-9}}
+    apply_override(stimuli, "a", {0.0: 3})
+    apply_override(stimuli, "clk.period", 4e-9)
+    apply_override(stimuli, "b", {0.0: 2})
+    assert stimuli == {
+        "a": {0.0: 3},
+        "clk": {"type": "clock", "period": 4e-9},
+        "b": {0.0: 2},
+    }
+    with pytest.raises(ValueError, match="no such signal"):
+        apply_override(stimuli, "missing.period", 1e-9)
+
+
+def test_expand_variants():
+    assert expand_variants(BASE) == [{}]
+    overrides = expand_variants(
+        BASE,
+        grid={"a": [{0.0: 2}, {0.0: 3}], "clk.period": [1e-9, 2e-9]},
+        variants=[{"b": {0.0: 1}}],
+    )
+    assert overrides == [
+        {"a": {0.0: 2}, "clk.period": 1e-9},
+        {"a": {0.0: 2}, "clk.period": 2e-9},
+        {"a": {0.0: 3}, "clk.period": 1e-9},
+        {"a": {0.0: 3}, "clk.period": 2e-9},
+        {"b": {0.0: 1}},
+    ]
+    # The base set is left untouched
+    assert BASE == {"a": {0.0: 1}, "clk": {"type": "clock", "period": 2e-9}}
+
+
+def test_expand_variants_rejects_bad_keys_up_front():
+    with pytest.raises(ValueError, match="no such signal"):
+        expand_variants(BASE, grid={"missing.period": [1e-9]})
+
+
+def test_row_capacity():
+    assert row_capacity(10e-9, 1e-9, resolution="SC_NS") == 10
+    assert row_capacity(10e-9, 1e-9, 3e-9, resolution="SC_NS") == 4
+
+
+def write_run(spec, run):
+    shared = SharedColumns.attach(spec)
+    recorder = SharedMemoryRecorder(shared, run)
+    recorder.open(["Time", "a", "out"], ["Float64", "Int32", "Int32"])
+    for step in range(3):
+        recorder.record(step * 1e-9, [run], [run + step])
+    recorder.close()
+    shared.close()
+
+
+@pytest.fixture
+def shared():
+    shared = SharedColumns.create(
+        ["Time", "a", "out", "big"], ["Float64", "Int32", "Int32", "Boolean"], 2, 4
+    )
+    yield shared
+    shared.unlink()
+
+
+def test_shared_columns_layout(shared):
+    assert [shared.arrays[name].dtype for name in shared.columns] == [
+        np.float64,
+        np.int32,
+        np.int32,
+        np.bool_,
+    ]
+    assert all(array.shape == (2, 4) for array in shared.arrays.values())
+    assert shared.shm.size >= SharedColumns.size(shared.types, 2, 4)
+    assert list(shared.rows) == [0, 0]
+
+
+def test_shared_memory_recorder_writes_from_another_process(shared):
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(target=write_run, args=(shared.spec, 1))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    arrays = shared.run_arrays(1)
+    assert list(arrays["Time"]) == [0.0, 1e-9, 2e-9]
+    assert list(arrays["a"]) == [1, 1, 1]
+    assert list(arrays["out"]) == [1, 2, 3]
+    # Columns the run does not produce are filled
+    assert list(arrays["big"]) == [False] * 3
+    assert all(len(array) == 0 for array in shared.run_arrays(0).values())
+
+
+def test_shared_memory_recorder_fills_unset_inputs_and_checks_capacity(shared):
+    recorder = SharedMemoryRecorder(shared, 0)
+    recorder.open(["Time", "out"], ["Float64", "Int32"])
+    for step in range(4):
+        recorder.record(step * 1e-9, [], [step])
+    with pytest.raises(ValueError, match="exceeds the 4 rows"):
+        recorder.record(4e-9, [], [4])
+    assert recorder.close() == 4
+    assert list(shared.run_arrays(0)["out"]) == [0, 1, 2, 3]
+
+    recorder = SharedMemoryRecorder(shared, 1)
+    with pytest.raises(ValueError, match=r"\['missing'\]"):
+        recorder.open(["Time", "missing"], ["Float64", "Float64"])
+
+
+def test_run_sweep_matches_single_runs(adder_fmu):
+    settings = dict(
+        stop_time=5e-9, step_size=1e-9, resolution="SC_NS", log_enabled=False
+    )
+    stimuli = {"a": {0.0: 1}, "b": {0.0: 0, 2e-9: 2}}
+    grid = {"a": [{0.0: 1}, {0.0: 3}]}
+    with run_sweep(adder_fmu, stimuli, grid=grid, max_workers=2, **settings) as results:
+        assert len(results) == 2
+        assert [stats["rows"] for stats in results.stats] == [5, 5]
+        assert len({stats["pid"] for stats in results.stats}) == 2
+        swept = [
+            {name: array.copy() for name, array in results.arrays(run).items()}
+            for run in range(len(results))
+        ]
+
+    for override, arrays in zip(expand_variants(stimuli, grid), swept):
+        simulator = FMUSimulator(fmu_path=adder_fmu, **settings)
+        simulator.setup_model()
+        simulator.initialize_fmu()
+        simulator.set_stimuli({**stimuli, **override})
+        expected = simulator.run_simulation(NumpyRecorder())
+        for name, array in expected.items():
+            np.testing.assert_array_equal(arrays[name], array)
+
+
+def test_run_sweep_raises_the_error_of_a_run(adder_fmu):
+    # Only the worker finds out that "out" is not an input
+    with pytest.raises(ValueError, match="out is not an input"):
+        run_sweep(
+            adder_fmu,
+            {"a": {0.0: 1}},
+            variants=[{}, {"out": {0.0: 1}}],
+            stop_time=2e-9,
+            step_size=1e-9,
+            resolution="SC_NS",
+            log_enabled=False,
+        )
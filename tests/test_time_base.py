@@ -0,0 +1,98 @@
+import pytest
+
+from simulator.fmu_simulator import FMUSimulator, stimuli_times
+from simulator.time_base import TimeBase, resolution_for
+
+
+def test_unit_conversions():
+    time_base = TimeBase("SC_PS")
+    assert time_base.to_ticks(0.1e-9) == 100
+    assert time_base.to_ticks(5.0) == 5 * 10**12
+    assert time_base.to_seconds(250) == pytest.approx(0.25e-9)
+
+
+def test_seconds_resolution():
+    time_base = TimeBase(0.5e-9)
+    assert time_base.to_ticks(2e-9) == 4
+
+
+def test_non_integral_time_raises():
+    with pytest.raises(ValueError, match="not a whole number of SC_NS"):
+        TimeBase("SC_NS").to_ticks(0.5e-9)
+
+
+def test_rounding_allowed_when_not_exact():
+    assert TimeBase("SC_NS").to_ticks(1.4e-9, exact=False) == 1
+
+
+@pytest.mark.parametrize("resolution", ["SC_XS", -1.0])
+def test_invalid_resolution(resolution):
+    with pytest.raises(ValueError):
+        TimeBase(resolution)
+
+
+def test_resolution_for_keeps_a_coarse_enough_unit():
+    assert resolution_for([1e-9, 5e-9], "SC_NS") == "SC_NS"
+    assert resolution_for([2.0, None], "SC_SEC") == "SC_SEC"
+
+
+def test_resolution_for_refines():
+    assert resolution_for([0.05e-9, 1e-9], "SC_NS") == "SC_PS"
+    assert resolution_for([1e-15], "SC_NS") == "SC_FS"
+
+
+def test_resolution_for_fails_below_femtoseconds():
+    with pytest.raises(ValueError):
+        resolution_for([1e-16], "SC_NS")
+
+
+def test_stimuli_times_include_legacy_clock_phase():
+    times = stimuli_times(
+        {
+            "CLK": {"period": 0.1e-9},
+            "EN": {"generator": "ramp", "period": 2e-9, "duration": 0.3e-9},
+            "OP1": {0.0: 1, 0.5e-9: 0},
+        }
+    )
+    assert sorted(times) == pytest.approx(
+        sorted([0.1e-9, 0.05e-9, 2e-9, 0.3e-9, 0.0, 0.5e-9])
+    )
+
+
+def make_simulator(resolution):
+    simulator = FMUSimulator(
+        fmu_path="none.fmu",
+        step_size=1e-9,
+        resolution=resolution,
+        log_enabled=False,
+        cache=False,
+    )
+    simulator.variable_info = {
+        "OP1": {"causality": "input", "type": "Int32", "start": 0}
+    }
+    return simulator
+
+
+def test_schedule_below_resolution_raises():
+    simulator = make_simulator("SC_NS")
+    with pytest.raises(ValueError, match="not a whole number"):
+        simulator.set_input_schedule("OP1", {0.0: 1, 0.5e-9: 0})
+
+
+def test_schedule_tick_collision_raises():
+    simulator = make_simulator("SC_NS")
+    with pytest.raises(ValueError, match="same SC_NS tick"):
+        simulator.set_input_schedule("OP1", {1e-9: 1, 1.0000000000001e-9: 0})
+
+
+def test_schedule_on_fine_resolution():
+    simulator = make_simulator("SC_PS")
+    simulator.set_input_schedule("OP1", {0.0: 1, 0.5e-9: 0})
+    assert simulator.input_schedules["OP1"].times == [0, 500]
+
+
+def test_step_size_below_resolution_raises():
+    with pytest.raises(ValueError):
+        FMUSimulator(
+            fmu_path="none.fmu", step_size=0.05e-9, resolution="SC_NS", cache=False
+        )
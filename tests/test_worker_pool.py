@@ -0,0 +1,114 @@
+import os
+import shutil
+import signal
+import time
+
+import pytest
+
+from simulator.worker_pool import WarmWorkerPool
+
+SETTINGS = dict(stop_time=4e-9, step_size=1e-9, resolution="SC_NS")
+
+
+def wait_for(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the pool"
+        time.sleep(0.01)
+
+
+def restarts(pool):
+    return pool.stats()[0]["restarts"]
+
+
+def break_error(pool):
+    """Error failing a job queued on a pool that is about to break."""
+    try:
+        future = pool.submit({"a": {0.0: 1}})
+    except RuntimeError as e:
+        return e
+    return future.exception(timeout=30)
+
+
+@pytest.fixture
+def make_pool(adder_fmu):
+    pools = []
+
+    def make_pool(fmu_path=adder_fmu, **kwargs):
+        pool = WarmWorkerPool(fmu_path, workers=1, **{**SETTINGS, **kwargs})
+        pools.append(pool)
+        return pool
+
+    yield make_pool
+    for pool in pools:
+        pool.close()
+
+
+def test_jobs_reuse_the_warm_instance(make_pool):
+    pool = make_pool()
+    results = pool.map([{"a": {0.0: 1}}, {"a": {0.0: 2}, "b": {0.0: 3}}], "arrays")
+    assert list(results[0]["out"]) == [0, 1, 1, 1]
+    assert list(results[1]["out"]) == [0, 5, 5, 5]
+    stats = pool.stats()[0]
+    assert (stats["jobs"], stats["failed"], stats["restarts"]) == (2, 0, 0)
+
+
+def test_failed_job_replaces_the_worker(make_pool):
+    pool = make_pool()
+    pid = pool.stats()[0]["pid"]
+    with pytest.raises(ValueError, match="out is not an input"):
+        pool.submit({"out": {0.0: 1}}).result()
+    wait_for(lambda: pool.stats()[0]["pid"] != pid)
+    assert pool.submit({"a": {0.0: 1}}).result().startswith("Time,")
+    stats = pool.stats()[0]
+    assert (stats["jobs"], stats["failed"], stats["restarts"]) == (1, 1, 1)
+
+
+def test_job_timeout_replaces_the_worker(make_pool, monkeypatch):
+    # Every step sleeps 100 ms, so a 4 step job takes 0.4 s
+    monkeypatch.setenv("FAKE_DELAY_NS", "100000000")
+    pool = make_pool(job_timeout=0.2)
+    with pytest.raises(TimeoutError, match="Job timed out"):
+        pool.submit({"a": {0.0: 1}}).result()
+    wait_for(lambda: restarts(pool) == 1)
+    assert pool.stats()[0]["timeouts"] == 1
+
+
+def test_dead_worker_is_replaced(make_pool):
+    pool = make_pool()
+    os.kill(pool.stats()[0]["pid"], signal.SIGKILL)
+    wait_for(lambda: restarts(pool) == 1)
+    assert pool.submit({"a": {0.0: 1}}).result().startswith("Time,")
+
+
+def test_ping_timeout_replaces_a_hung_worker(make_pool, caplog):
+    pool = make_pool(health_interval=0.05, ping_timeout=0.2)
+    os.kill(pool.stats()[0]["pid"], signal.SIGSTOP)
+    wait_for(lambda: restarts(pool) == 1)
+    assert "did not answer a health check ping" in caplog.text
+    assert pool.submit({"a": {0.0: 1}}).result().startswith("Time,")
+
+
+def test_replacements_that_fail_to_start_break_the_pool(make_pool, adder_fmu, tmp_path):
+    fmu_path = shutil.copy(adder_fmu, tmp_path / "Adder.fmu")
+    pool = make_pool(fmu_path, start_retries=1)
+    os.remove(fmu_path)
+    os.kill(pool.stats()[0]["pid"], signal.SIGKILL)
+    wait_for(lambda: restarts(pool) == 1)
+    error = break_error(pool)
+    assert isinstance(error, RuntimeError)
+    assert "failed to start 2 times in a row" in str(error)
+    with pytest.raises(RuntimeError, match="FMU file not found"):
+        pool.submit({"a": {0.0: 1}})
+    assert restarts(pool) == 2
+
+
+def test_replacement_start_timeout(make_pool):
+    pool = make_pool(start_retries=0)
+    # No process gets ready this fast
+    pool.start_timeout = 0.001
+    os.kill(pool.stats()[0]["pid"], signal.SIGKILL)
+    wait_for(lambda: restarts(pool) == 1)
+    error = break_error(pool)
+    assert isinstance(error, RuntimeError)
+    assert "not ready within 0.001 s" in str(error)